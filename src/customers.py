@@ -3,6 +3,11 @@ from tkinter import messagebox as message
 from tkinter.ttk import *
 
 from src import database
+from src import export
+from src import repository
+from src import search
+from src import sequences
+from src import workers
 from src.utils import *
 
 
@@ -29,6 +34,12 @@ class Customer:
         return int(self.CustomerID)
 
 
+def CreateCustomer(Record):
+    """Returns a new Customer object using the attributes of a row read from the database"""
+
+    return Customer(Record[0], Record[1], Record[2], Record[3], Record[4])
+
+
 class CustomerManager(Toplevel):
     """Creates an instance of the InventoryManager interface as a subclass of the Tkinter Toplevel widget"""
 
@@ -44,24 +55,31 @@ class CustomerManager(Toplevel):
         """Sets application title"""
         self.title('Customer Management')
 
-        """Calls class defined functions to connect to database, set up interface and customers"""
-        self.LoadDatabase()
+        """Runs the database work of the interface on worker threads, no customers are shown until they are read"""
+        self.Worker = workers.Worker(self)
+        self.Customers = database.Records()
+
+        """Calls class defined functions to set up interface then connect to database to load the customers"""
         self.LoadInterface()
-        self.LoadCustomers(self.Customers)
+        self.LoadDatabase()
 
         """Starts the main loop for the application"""
         self.mainloop()
 
     def LoadDatabase(self):
-        """Called to create connection to Database type specified in the configuration file and reads data"""
+        """Called to get the customers from the shared repository, which reads the database only once
+
+        The customers are read on a worker thread and loaded once they arrive, replacing any earlier read running"""
 
-        self.Customers = []
+        """Creates Customer object for each row found in Database, shared with every other open interface"""
+        self.Worker.Submit(lambda: repository.Shared.Load('Customers', CreateCustomer), self.CustomersLoaded,
+                           Key='Load')
 
-        """Creates Customer object for each row found in Database and places object in new Customers array"""
-        Records = database.Connect('Customers').Read()
-        for Record in Records:
-            NewCustomer = Customer(Record[0], Record[1], Record[2], Record[3], Record[4])
-            self.Customers.append(NewCustomer)
+    def CustomersLoaded(self, Data):
+        """Called on the interface's thread with the customers once they have been read"""
+
+        self.Customers = Data
+        self.LoadCustomers(self.Customers)
 
     def LoadInterface(self):
         """Called to set up the core interface widgets for the application"""
@@ -83,6 +101,8 @@ class CustomerManager(Toplevel):
         self.DeleteButton.grid(row=2, column=0)
         self.RefreshButton = Button(self.ButtonWidgets, text='Refresh', command=self.RefreshCustomers)
         self.RefreshButton.grid(row=3, column=0)
+        self.ExportButton = Button(self.ButtonWidgets, text='Export', command=self.ExportCustomers)
+        self.ExportButton.grid(row=4, column=0)
 
         """Creates and packs the LabelFrame widget onto the TopFrame frame using the pack geometry manager"""
         self.SearchWidgets = LabelFrame(self.TopFrame, text='Search:')
@@ -107,8 +127,8 @@ class CustomerManager(Toplevel):
         self.BottomFrame = LabelFrame(self, text='Customers')
         self.BottomFrame.pack(fill=BOTH, expand=TRUE)
 
-        """Creates and packs Treeview widget onto the BottomFrame frame, binds functions and hides headings"""
-        self.CustomerTreeview = Treeview(self.BottomFrame, height=20)
+        """Creates and packs a virtual Treeview widget onto the BottomFrame frame, binds functions and hides headings"""
+        self.CustomerTreeview = VirtualTreeview(self.BottomFrame, height=20)
         self.CustomerTreeview.pack(side=LEFT, expand=TRUE, fill=BOTH)
         self.CustomerTreeview.bind('<Button-1>', self.ClickTree)
         self.CustomerTreeview['show'] = 'headings'
@@ -128,44 +148,42 @@ class CustomerManager(Toplevel):
             self.CustomerTreeview.heading(self.Attributes[self.Headers.index(Header)], text=Header, anchor=W)
             self.CustomerTreeview.column(self.Attributes[self.Headers.index(Header)], width=160, minwidth=160)
 
+        """Creates the sort engine used when a Treeview header is clicked"""
+        self.Sorter = Sorter()
+
         """Used to place the window at the center of the screen"""
         ConfigureInterface(self)
 
     def LoadCustomers(self, Data):
         """Called to load the Treeview widget with the data in list specified in the parameter"""
 
-        """Calls function to remote all of the items already existing in the Treeview widget"""
-        self.ResetCustomers()
+        """Only the rows in view are made, their values are swapped in as the Treeview is scrolled"""
+        self.CustomerTreeview.Load(Data)
 
-        """Inserts a new item at index i with values specified as long as there is an item in the Data parameter"""
-        if Data:
-            i = 0
-            for Record in Data:
-                self.CustomerTreeview.insert('', END, text=i, values=(Record.GetAttributes()))
-                i += 1
-
-            """Sets the current selected item as the first value which will also trigger the TreeviewSelect function"""
-            self.CustomerTreeview.selection_set(self.CustomerTreeview.get_children()[0])
+        """Sets the current selected customer as the first one"""
+        self.CustomerTreeview.Select(0)
 
     def SaveCustomers(self, Data):
         """Called to save the data stored in the class defined Data list in the database"""
 
-        database.Connect('Customers').Save(Data)
+        """Only the records changed since the last save are written, unless a plain list replaces the whole table
+
+        The changes are taken straight away then written on the worker thread, in the order the saves were made"""
+        if isinstance(Data, database.Records):
+            Changes = repository.Shared.Changes('Customers', Data)
+            self.Worker.Submit(lambda: repository.Shared.Write('Customers', Changes), Write=True)
+        else:
+            self.Worker.Submit(lambda: database.Connect('Customers').Save(Data), Write=True)
 
     def ResetCustomers(self):
         """Called to remove all the items already stored inside the Treeview widget"""
 
-        self.CustomerTreeChildren = self.CustomerTreeview.get_children()
-        for Child in self.CustomerTreeChildren:
-            self.CustomerTreeview.delete(Child)
+        self.CustomerTreeview.Load([])
 
     def GetSelectedCustomer(self):
         """Returns the values for the item dictionary which is currently selected in the Treeview"""
 
-        self.Selected = self.CustomerTreeview.selection()
-        for Customer in self.Selected:
-            self.SelectedIndex = self.CustomerTreeview.item(Customer)
-            self.SelectedRecord = self.SelectedIndex['values']
+        self.SelectedRecord = self.CustomerTreeview.SelectedValues()
         return self.SelectedRecord
 
     def DeleteCustomer(self):
@@ -175,19 +193,19 @@ class CustomerManager(Toplevel):
         Confirm = message.askquestion('Remove', 'Remove customer from list?', icon='warning', parent=self)
         if Confirm == message.YES:
 
-            """Definite iteration through Customer array looking for selected customer"""
-            for DataItem in self.Customers:
-                if int(DataItem.CustomerID) == int(self.GetSelectedCustomer()[0]):
-                    """Removes item from Data list as well as Treeview when match is found"""
-                    self.Customers.remove(DataItem)
-                    self.CustomerTreeview.delete(self.Selected[0])
+            """Looks up the selected customer by its ID"""
+            DataItem = self.Customers.Get(self.GetSelectedCustomer()[0])
+            if DataItem:
+                """Removes item from Data list as well as Treeview when found"""
+                self.Customers.remove(DataItem)
+                self.CustomerTreeview.Forget(DataItem)
+                sequences.Release('Customers', DataItem.CustomerID)
 
             """Calls the class defined method to save Customers information now that an item has been removed"""
             self.SaveCustomers(self.Customers)
 
             """As long as there is at least one result, set the first option in the Treeview widget"""
-            if self.Customers:
-                self.CustomerTreeview.selection_set(self.CustomerTreeview.get_children()[0])
+            self.CustomerTreeview.Select(0)
 
     def Search(self, Event):
         """Called when the SearchEntry is edited using the <KeyRelease> binding"""
@@ -196,31 +214,28 @@ class CustomerManager(Toplevel):
         self.Query = self.SearchEntry.get()
         self.Attribute = self.SearchVariable.get()
 
-        """Creates a new array to store the results of the search attempt"""
-        self.Results = []
-
-        """Definite iteration checking each item in the Data array with input specified in the Entry and OptionsMenu"""
-        for DataItem in self.Customers:
-            if str(self.Query).lower() in \
-                    str(DataItem.GetAttributes()[(self.SearchOptions.index(self.Attribute))]).lower():
-                """Append the Item object to the results array if the condition is met"""
-                self.Results.append(DataItem)
+        """Uses the shared search index to find matches for the query, kept in the current sort order"""
+        Index = search.Shared(self.Customers)
+        self.Results = self.Sorter.Sort(Index.Find(self.SearchOptions.index(self.Attribute), self.Query))
 
-        """Calls the function to load the Treeview widget with the Results list"""
+        """Calls the function to load the Treeview widget with the Results list, selecting the first result"""
         self.LoadCustomers(self.Results)
 
-        """As long as there is at least one result, set the first option in the Treeview widget"""
-        if self.Results:
-            self.CustomerTreeview.selection_set(self.CustomerTreeview.get_children()[0])
-
     def ClickTree(self, Event):
         """Called to change the Treeview to a different sort type, activated by clicking header using Event parameter"""
 
         """Function is called for every click on Treeview so checks whether click region is header"""
         self.ClickedRegion = self.CustomerTreeview.identify('region', Event.x, Event.y)
         if self.ClickedRegion == 'heading':
-            """Calls function to load the customers with a sorted list"""
-            self.LoadCustomers(SortTree(Event, self.CustomerTreeview, self.Customers))
+            """Sorts by the clicked column, or reverses it if clicked again, then loads the customers with the sorted list"""
+            self.Sorter.Click(ColumnIndex(Event, self.CustomerTreeview))
+            self.Sorter.Indicate(self.CustomerTreeview, self.Headers)
+            self.LoadCustomers(self.Sorter.Sort(self.Customers))
+
+    def ExportCustomers(self):
+        """Called when the Export button is pressed, allows user to export the customers to .csv file"""
+
+        export.ExportView(self, 'Customers', 'customers')
 
     def RefreshCustomers(self):
         """Called when the Refresh button is pressed, used to save and refresh the customers"""
@@ -242,6 +257,9 @@ class NewCustomer(Toplevel):
         """Sets the window title of the new TopLevel instance"""
         self.title('New Customer')
 
+        """Allocates the ID of the new customer on a worker thread, as it is a write to the database"""
+        self.Worker = workers.Worker(self)
+
         """Calls class defined functions to set up interface"""
         self.LoadInterface()
 
@@ -278,10 +296,12 @@ class NewCustomer(Toplevel):
         self.FinishedButton = Button(self.MainFrame, text='Finished', command=self.Finished)
         self.FinishedButton.grid(row=6, columnspan=2, pady=5)
 
-        """As the ID entry should be unique, it is auto-generated based on the customers existing in the data"""
-        self.IDEntry.insert(0, self.GenerateID())
+        """As the ID entry should be unique, it is given out by the allocator of the customers and shown once it arrives,
+        the customer cannot be finished until then"""
+        self.FinishedButton['state'] = DISABLED
+        self.Worker.Submit(self.GenerateID, self.IDGenerated, Write=True)
 
-        """Sets entry in first index to disabled state after it's loaded so it cannot be edited by the user"""
+        """Sets entry in first index to disabled state so it cannot be edited by the user"""
         self.IDEntry.configure(state=DISABLED)
 
         """Binds the return key to call the Finished function"""
@@ -291,21 +311,17 @@ class NewCustomer(Toplevel):
         ConfigureInterface(self)
 
     def GenerateID(self):
-        """Returns the unique ID the new item should be stored as, checks through inventory"""
-
-        """Definite iteration through Data list checking if generated ID already exists"""
-        GeneratedID = 1
-        for DataItem in self.master.Customers:
+        """Returns the unique ID the new customer should be stored as, given out by the allocator of the customers"""
 
-            """If generated ID does not exist for this customer, it is available so return the generated number"""
-            if int(DataItem.CustomerID) is not int(GeneratedID):
-                return GeneratedID
+        return sequences.Allocate('Customers')
 
-            """Else add one to generated ID and reiterate"""
-            GeneratedID += 1
+    def IDGenerated(self, ID):
+        """Called on the interface's thread with the ID given out for the new customer, shown in the ID entry"""
 
-        """Final number should be available as it will be the final generated ID plus one"""
-        return GeneratedID
+        self.IDEntry.configure(state=NORMAL)
+        self.IDEntry.insert(0, ID)
+        self.IDEntry.configure(state=DISABLED)
+        self.FinishedButton['state'] = NORMAL
 
     def ValidFields(self):
         """Returns whether it is possible to create valid customer object"""
@@ -321,6 +337,10 @@ class NewCustomer(Toplevel):
     def Finished(self):
         """Called when the user presses the Finished button, used to save the new Customer"""
 
+        """The customer cannot be added until its ID has been given out"""
+        if not self.IDEntry.get():
+            return
+
         """Creates a new list and places all the entries previously specified for easy usage"""
         self.Entries = [self.IDEntry, self.FirstnameEntry, self.SurnameEntry, self.ContactEntry, self.AddressEntry]
 
@@ -439,9 +459,9 @@ class EditCustomer(Toplevel):
             self.NewCustomer = Customer(self.Input[0], self.Input[1], self.Input[2], self.Input[3], self.Input[4])
 
             """Replaces existing customer object with new customer object"""
-            for CustomerRecord in self.master.Customers:
-                if int(CustomerRecord.CustomerID) == int(self.IDEntry.get()):
-                    self.master.Customers[self.master.Customers.index(CustomerRecord)] = self.NewCustomer
+            CustomerRecord = self.master.Customers.Get(self.IDEntry.get())
+            if CustomerRecord:
+                self.master.Customers[self.master.Customers.Position(CustomerRecord)] = self.NewCustomer
 
             """Calls the class defined method to save customer data now that a customer has been added"""
             self.master.SaveCustomers(self.master.Customers)
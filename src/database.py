@@ -1,15 +1,281 @@
+import array
+import bisect
+import collections
+import copy
 import csv
 import enum
+import functools
+import io
+import itertools
+import mmap
+import os
 import sqlite3
-from tkinter import messagebox as message
+import threading
+import time
+import weakref
 
 from src import settings
 
 try:
     import pymysql
 except ImportError:
+    pymysql = None
     print("Failed to import will be unable to use remote database setting.")
 
+"""Dictionary stores each table name as well as each attribute and corresponding data type, the first being the ID"""
+Tables = {
+    'Orders': [['OrderID', 'integer'], ['Date', 'text'], ['CustomerID', 'integer']],
+    'OrdersItem': [['OrderID', 'integer'], ['ItemID', 'integer'], ['Quantity', 'integer']],
+    'Inventory': [['ItemID', 'integer'], ['Brand', 'text'], ['Type', 'text'], ['Name', 'text'],
+                  ['Price', 'real'], ['Stock', 'integer']],
+    'Customers': [['CustomerID', 'integer'], ['Firstname', 'text'], ['Surname', 'text'],
+                  ['Contact', 'text'], ['Address', 'text']],
+    'Sequences': [['Name', 'text'], ['Value', 'integer']],
+    'Reservations': [['OrderID', 'integer'], ['ItemID', 'integer'], ['Quantity', 'integer'], ['Expires', 'real']]}
+
+"""Number of leading attributes identifying a record for tables where the first attribute alone is not unique"""
+Identifiers = {'OrdersItem': 2, 'Reservations': 2}
+
+"""Attributes making up the primary key of each table of a SQL database, order lines are indexed instead as an order
+may list the same item more than once"""
+PrimaryKeys = {'Orders': ['OrderID'], 'Inventory': ['ItemID'], 'Customers': ['CustomerID'], 'Sequences': ['Name'],
+               'Reservations': ['OrderID', 'ItemID']}
+
+"""Secondary indexes of a SQL database by name, each on the table and attribute records are looked up by"""
+TableIndexes = {'OrdersItemOrder': ('OrdersItem', 'OrderID'), 'OrdersItemItem': ('OrdersItem', 'ItemID'),
+                'OrdersCustomer': ('Orders', 'CustomerID')}
+
+
+class Positions:
+    """Creates an index of the position of each object in the list in parameter by identity, so an object can be found
+    without comparing it against every other
+
+    Positions from the first one changed onwards are worked out again when next needed, so appending costs only the
+    positions appended. The list is indexed again if it was reordered without being told"""
+
+    def __init__(self, Data):
+        self.Data = Data
+        self.Index = {}
+        self.Stale = 0
+
+    def Find(self, Record):
+        """Returns the position of the object in parameter, raising ValueError if it is not in the list"""
+
+        for Start in (None, self.Stale, 0):
+            if Start is not None:
+                for Position in range(Start, len(self.Data)):
+                    self.Index[id(self.Data[Position])] = Position
+                self.Stale = len(self.Data)
+            Position = self.Index.get(id(Record))
+            if Position is not None and Position < min(self.Stale, len(self.Data)) and self.Data[Position] is Record:
+                return Position
+        raise ValueError('Record is not in the list')
+
+    def Changed(self, Index):
+        """Called before the list is changed at Index, an integer or slice, so positions from there are found again"""
+
+        if isinstance(Index, slice):
+            Index = min(range(*Index.indices(len(self.Data))), default=len(self.Data))
+        elif Index < 0:
+            Index += len(self.Data)
+        self.Stale = max(0, min(self.Stale, Index))
+
+    def Forget(self, Record):
+        """Called once the object in parameter has been removed from the list"""
+
+        self.Index.pop(id(Record), None)
+
+
+class Records(list):
+    """Creates a list of records indexed by ID which remembers those inserted, updated or deleted since last flushed"""
+
+    def __init__(self, Data=()):
+        """Parameters are passed onto the List class, the initial records are indexed but not counted as changes"""
+        super().__init__(Data)
+
+        """Dictionary mapping each ID to its record, giving constant time lookups, and the position of each record"""
+        self.Index = {}
+        for Record in self:
+            self.Index[Record.GetID()] = Record
+        self.Positions = Positions(self)
+        self.Clean()
+
+        """Objects such as search indexes which are told about every record added, removed or modified"""
+        self.Observers = []
+
+    def Get(self, ID):
+        """Returns the record with the ID in parameter, or None if there is no such record"""
+
+        return self.Index.get(int(ID))
+
+    def Clean(self):
+        """Forgets all tracked changes, called once they have been written to the database"""
+
+        self.Inserted = {}
+        self.Updated = {}
+        self.Deleted = set()
+
+        """Attributes of each updated record as last written, where known, so only those edited are written"""
+        self.Originals = {}
+
+    def Changed(self):
+        """Returns whether there are any changes waiting to be written"""
+
+        return bool(self.Inserted or self.Updated or self.Deleted)
+
+    def Detach(self):
+        """Returns a Records holding only the tracked changes, which are then forgotten here, so they can be written on
+        another thread while the records carry on being edited"""
+
+        Changes = Records()
+        Changes.Inserted, Changes.Updated, Changes.Deleted = self.Inserted, self.Updated, self.Deleted
+        Changes.Originals = self.Originals
+        self.Clean()
+        return Changes
+
+    def Edited(self, Record):
+        """Returns the positions of the attributes of the updated record in parameter edited since it was last
+        written, every attribute after its ID when the attributes it was written with are not known"""
+
+        Attributes = tuple(Record.GetAttributes())
+        Original = self.Originals.get(Record.GetID())
+        if Original is None:
+            return list(range(1, len(Attributes)))
+        return [Position for Position in range(1, len(Attributes)) if Attributes[Position] != Original[Position]]
+
+    def Added(self, Record):
+        """Tracks the record in parameter as inserted, or as updated if it replaces a deleted record"""
+
+        ID = Record.GetID()
+        self.Index[ID] = Record
+        if ID in self.Deleted:
+            self.Deleted.discard(ID)
+            self.Updated[ID] = Record
+        else:
+            self.Inserted[ID] = Record
+        for Observer in self.Observers:
+            Observer.Add(Record)
+
+    def Removed(self, Record):
+        """Tracks the record in parameter as deleted, or forgets it entirely if it was never written"""
+
+        ID = Record.GetID()
+        if self.Index.get(ID) is Record:
+            del self.Index[ID]
+        if ID in self.Inserted:
+            del self.Inserted[ID]
+        else:
+            self.Updated.pop(ID, None)
+            self.Originals.pop(ID, None)
+            self.Deleted.add(ID)
+        for Observer in self.Observers:
+            Observer.Remove(Record)
+
+    def Modified(self, Record, Original=None):
+        """Tracks the record in parameter as updated, also called when a record's attributes are edited in place
+
+        Original is the record it replaces, kept the first time so only the attributes edited are written. A record
+        edited in place has no Original, so every attribute is written"""
+
+        ID = Record.GetID()
+        self.Index[ID] = Record
+        if ID in self.Inserted:
+            self.Inserted[ID] = Record
+        else:
+            if Original is None:
+                self.Originals.pop(ID, None)
+            elif ID not in self.Updated:
+                self.Originals[ID] = tuple(Original.GetAttributes())
+            self.Updated[ID] = Record
+        for Observer in self.Observers:
+            Observer.Remove(Record)
+            Observer.Add(Record)
+
+    def Position(self, Record):
+        """Returns the position of the record in parameter, compared by identity rather than equality"""
+
+        return self.Positions.Find(Record)
+
+    def append(self, Record):
+        self.Positions.Changed(len(self))
+        super().append(Record)
+        self.Added(Record)
+
+    def insert(self, Index, Record):
+        self.Positions.Changed(Index)
+        super().insert(Index, Record)
+        self.Added(Record)
+
+    def extend(self, Data):
+        Data = list(Data)
+        self.Positions.Changed(len(self))
+        super().extend(Data)
+        for Record in Data:
+            self.Added(Record)
+
+    def __iadd__(self, Data):
+        self.extend(Data)
+        return self
+
+    def remove(self, Record):
+        del self[self.Position(Record)]
+
+    def pop(self, Index=-1):
+        self.Positions.Changed(Index)
+        Record = super().pop(Index)
+        self.Positions.Forget(Record)
+        self.Removed(Record)
+        return Record
+
+    def clear(self):
+        for Record in self:
+            self.Removed(Record)
+        super().clear()
+        self.Positions = Positions(self)
+
+    def __delitem__(self, Index):
+        Removed = self[Index] if isinstance(Index, slice) else [self[Index]]
+        self.Positions.Changed(Index)
+        super().__delitem__(Index)
+        for Record in Removed:
+            self.Positions.Forget(Record)
+            self.Removed(Record)
+
+    def __setitem__(self, Index, Record):
+        """Replacing a record with one of the same ID is tracked as an update, otherwise as a delete and insert"""
+
+        if isinstance(Index, slice):
+            Old, New = self[Index], list(Record)
+            self.Positions.Changed(Index)
+            super().__setitem__(Index, New)
+            for Existing in Old:
+                self.Positions.Forget(Existing)
+                self.Removed(Existing)
+            for Added in New:
+                self.Added(Added)
+            return
+
+        Existing = self[Index]
+        self.Positions.Changed(Index)
+        super().__setitem__(Index, Record)
+        self.Positions.Forget(Existing)
+        if Existing.GetID() == Record.GetID():
+            self.Modified(Record, Existing)
+        else:
+            self.Removed(Existing)
+            self.Added(Record)
+
+
+def Guarded(Function):
+    """Wraps a method of a connection so only one thread at a time uses the connection its views share, a thread
+    carrying out a transaction keeps it until the transaction is finished"""
+
+    @functools.wraps(Function)
+    def Wrapper(self, *Arguments, **Keywords):
+        with self.Guard:
+            return Function(self, *Arguments, **Keywords)
+    return Wrapper
+
 
 class Database:
     """Creates an object defined as a generic Database connection which can read and save data"""
@@ -23,38 +289,160 @@ class Database:
         """Other variables made, assigned to child classes when made"""
         self.Cursor = None
         self.Connection = None
+        self.Placeholder = '?'
 
-    def Execute(self, Statement):
-        """Called to execute a SQL command using statement in parameter"""
+        """Number of rows written per statement during bulk writes, replaced by the configured value"""
+        self.BatchSize = 500
 
-        self.Cursor.execute(Statement)
+        """Lock shared by every view of the connection, held while a thread uses it"""
+        self.Guard = threading.RLock()
 
-    def Save(self, Data):
-        """Called to save data inside a local based database"""
+    def View(self, Table):
+        """Returns a lightweight copy of the connection scoped to the table in parameter, sharing the same connection"""
 
-        """Uses database cursor to carry out SQL to delete all items from database table"""
-        self.Execute('DELETE FROM ' + self.Table)
+        Scoped = copy.copy(self)
+        Scoped.Table = Table
 
-        """Uses database cursor to carry out SQL to insert a record for each item in the Data array in the parameter"""
-        for Record in Data:
-            self.Execute('INSERT INTO ' + self.Table + ' VALUES' + str(tuple(Record.GetAttributes())))
+        """Each view is given its own cursor so result-sets of different tables do not overwrite each other"""
+        if self.Connection:
+            Scoped.Cursor = self.Connection.cursor()
+        return Scoped
 
-        """Calls function to commit to any updates which have taken place"""
-        self.Commit()
+    def Close(self):
+        """Closes the underlying connection, called when the configured backend is changed"""
+
+        if self.Connection:
+            self.Connection.close()
+
+    @Guarded
+    def Execute(self, Statement, Parameters=None):
+        """Called to execute a SQL command using statement in parameter, values are bound using Parameters
+
+        Returns the cursor so the result-set can be fetched"""
+
+        if Parameters is None:
+            self.Cursor.execute(Statement)
+        else:
+            self.Cursor.execute(Statement, Parameters)
+        return self.Cursor
+
+    def InsertStatement(self, Width, Rows=1):
+        """Returns a parameterised insert statement for the scoped table with Rows groups of Width values"""
+
+        Values = '(' + ', '.join([self.Placeholder] * Width) + ')'
+        return 'INSERT INTO ' + self.Table + ' VALUES ' + ', '.join([Values] * Rows)
+
+    @Guarded
+    def InsertMany(self, Rows, Progress=None):
+        """Inserts each row in parameter using executemany, a batch of BatchSize rows at a time
+
+        Progress is called with the number of rows inserted so far after each batch, which is also returned"""
+
+        Count = 0
+        for Batch in Batches(Rows, self.BatchSize):
+            self.Cursor.executemany(self.InsertStatement(len(Batch[0])), Batch)
+            Count += len(Batch)
+            if Progress:
+                Progress(Count)
+        return Count
+
+    @Guarded
+    def Save(self, Data, Progress=None):
+        """Called to replace the contents of the table with Data inside a single transaction, returns the number of
+        records saved
+
+        Data may be a generator, it is read and written a batch at a time with Progress called after each batch"""
+
+        """Starts an explicit transaction so the table is never left half written"""
+        self.Begin()
+        try:
+
+            """Uses database cursor to carry out SQL to delete all items from database table"""
+            self.Execute('DELETE FROM ' + self.Table)
+
+            """Inserts the attributes of every Record in the Data array in the parameter in batches"""
+            Count = self.InsertMany((tuple(Record.GetAttributes()) for Record in Data), Progress)
+
+            """The replaced table may hold any IDs, so its next ID is worked out again from the highest one"""
+            self.Execute('DELETE FROM Sequences WHERE Name = ' + self.Placeholder, (self.Table,))
+
+            """Calls function to commit to any updates which have taken place"""
+            self.Commit()
+        except Exception:
+
+            """If anything fails, undo the partial changes so the previous contents remain"""
+            self.Rollback()
+            raise
+        return Count
+
+    @Guarded
+    def Flush(self, Data):
+        """Writes only the records inserted, updated or deleted since the Records in parameter were last flushed,
+        returns the Stamp of the table once written, or None if there was nothing to write
+
+        Updates only set the attributes edited, so one terminal editing an item's price never writes back the stock
+        it read over stock another terminal has since taken. The Stamp is taken before the connection is released, so
+        a write made by another thread after this one is never counted as part of it"""
+
+        if not Data.Changed():
+            return None
+
+        """Builds the statements for the scoped table using its column names, the first column being the ID"""
+        Columns = [Attribute[0] for Attribute in Tables[self.Table]]
+        Condition = ' WHERE ' + Columns[0] + ' = ' + self.Placeholder
+
+        """Updated rows are grouped by the attributes edited, each group being set by one statement"""
+        Updates = {}
+        for Record in Data.Updated.values():
+            Attributes = tuple(Record.GetAttributes())
+            Edited = tuple(Data.Edited(Record))
+            if Edited:
+                Updates.setdefault(Edited, []).append(tuple(Attributes[Position] for Position in Edited) +
+                                                      Attributes[:1])
+
+        self.Begin()
+        try:
+
+            """Deletes, updates then inserts each changed row using parameterised statements"""
+            if Data.Deleted:
+                self.Cursor.executemany('DELETE FROM ' + self.Table + Condition, [(ID,) for ID in Data.Deleted])
+            for Edited, Rows in Updates.items():
+                Assignments = ', '.join([Columns[Position] + ' = ' + self.Placeholder for Position in Edited])
+                self.Cursor.executemany('UPDATE ' + self.Table + ' SET ' + Assignments + Condition, Rows)
+            if Data.Inserted:
+                self.InsertMany(tuple(Record.GetAttributes()) for Record in Data.Inserted.values())
+            self.Commit()
+        except Exception:
+            self.Rollback()
+            raise
+
+        """Changes have been written so they no longer need tracking"""
+        Data.Clean()
+        return self.Stamp(self.Table)
 
     def Read(self):
-        """Returns array of data after reading database"""
+        """Returns array of data after reading database, served from the read cache while the table is unchanged"""
+
+        return Reads.Read(self, self.Table)
 
-        """Uses database cursor to carry out SQL to select all items from database table"""
-        self.Execute('SELECT * FROM ' + self.Table)
+    def Stamp(self, Table):
+        """Returns a value which changes whenever the table in parameter is written, used to validate cached reads
 
-        """Creates array to store data read in local database"""
-        self.Data = []
+        Writes made by this application count themselves, those made by other terminals are seen from the number of
+        records and the highest ID"""
 
-        """Reads through each Record in the result-set and appends the Record to the Data array"""
-        for Record in self.Cursor.fetchall():
-            self.Data.append(list(Record))
-        return self.Data
+        ID = Tables[Table][0][0]
+        return (Version(Table),) + tuple(self.Scalars('SELECT count(*), max(' + ID + ') FROM ' + Table))
+
+    @Guarded
+    def Fetch(self):
+        """Returns array of data read from the database, called by the read cache when it holds no valid copy"""
+
+        """Reads through each Record streamed from the database table and appends the Record to the Data array"""
+        Data = []
+        for Record in self.Stream('SELECT * FROM ' + self.Table):
+            Data.append(list(Record))
+        return Data
 
     def Create(self, Table, Fields):
         """Used to create a new table with attributes specific in parameter"""
@@ -65,12 +453,15 @@ class Database:
         Statement = Statement[:-2] + ')'
         self.Execute(Statement)
 
+    @Guarded
     def Insert(self, Data):
         """Used to insert a data item into the database"""
 
-        self.Execute('INSERT INTO ' + self.Table + ' VALUES ' + str(Data.GetAttributes()))
+        Attributes = tuple(Data.GetAttributes())
+        self.Execute(self.InsertStatement(len(Attributes)), Attributes)
         self.Commit()
 
+    @Guarded
     def Delete(self, RowID):
         """Used to delete a data item from the database using RowID in parameter"""
 
@@ -87,202 +478,1201 @@ class Database:
 
         self.Execute('UPDATE ' + Table + ' SET ' + Field + ' = '' + Value + '' WHERE id = ' + ID)
 
-    def SelectAll(self, Table, Order=''):
-        """Returns all relevant records from a table using parameters"""
+    @Guarded
+    def SelectAll(self, Table=None, Order=''):
+        """Returns all records from a table as a list of rows, sorted by the attribute in Order if one is given"""
 
-        Statement = 'SELECT * FROM ' + Table
+        Statement = 'SELECT * FROM ' + (Table or self.Table)
         if Order:
             Statement += ' ORDER BY ' + str(Order)
         return self.Execute(Statement).fetchall()
 
+    @Guarded
     def SelectRecord(self, Table, ID, Field='*'):
-        """Returns all attributes or specific attributes of a record from a table using the parameters"""
+        """Returns all attributes or specific attributes of the record with the ID in parameter, as a list of rows"""
+
+        Statement = 'SELECT ' + Field + ' FROM ' + Table + ' WHERE ' + Tables[Table][0][0] + ' = ' + self.Placeholder
+        return self.Execute(Statement, (ID,)).fetchall()
+
+    @Guarded
+    def SelectRange(self, Table, Low, High):
+        """Returns the records with IDs from Low to High inclusive as a list of rows in order of ID"""
 
-        return self.Execute('SELECT ' + Field + ' FROM ' + Table + ' WHERE id = ' + str(ID)).fetchall()
+        ID = Tables[Table][0][0]
+        Statement = ('SELECT * FROM ' + Table + ' WHERE ' + ID + ' BETWEEN ' + self.Placeholder + ' AND '
+                     + self.Placeholder + ' ORDER BY ' + ID)
+        return self.Execute(Statement, (Low, High)).fetchall()
+
+    @Guarded
+    def Page(self, Table, Before=None, Limit=100):
+        """Returns up to Limit records with IDs below Before, or the highest IDs if None, as a list of rows highest first
+
+        The next page is read by passing the lowest ID of the last, so each page is found using the primary key however
+        many records come before it"""
+
+        ID = Tables[Table][0][0]
+        Statement = 'SELECT * FROM ' + Table
+        Parameters = (Limit,)
+        if Before is not None:
+            Statement += ' WHERE ' + ID + ' < ' + self.Placeholder
+            Parameters = (Before, Limit)
+        return self.Execute(Statement + ' ORDER BY ' + ID + ' DESC LIMIT ' + self.Placeholder, Parameters).fetchall()
+
+    @Guarded
+    def Aggregate(self, Function, Table, Expression='*'):
+        """Returns the single value of the aggregate Function, such as sum, over Expression for the table in parameter
+
+        Expression is an attribute or a product of attributes such as 'Price * Stock', computed by the database"""
+
+        return self.Execute('SELECT ' + Function + '(' + Expression + ') FROM ' + Table).fetchone()[0]
 
     def Count(self, Table):
         """Returns the number of records from table specified in parameter"""
 
-        return self.Execute('SELECT count(*) FROM ' + Table)
+        return self.Aggregate('count', Table)
 
     def Minimum(self, Table, Attribute):
         """Returns the minimum value from the table in parameter"""
 
-        return self.Execute('SELECT min(' + Attribute + ') FROM ' + Table)
+        return self.Aggregate('min', Table, Attribute)
 
     def Maximum(self, Table, Attribute):
         """Returns the maximum value from the table in parameter"""
 
-        return self.Execute('SELECT max(' + Attribute + ') FROM ' + Table)
+        return self.Aggregate('max', Table, Attribute)
 
     def Average(self, Table, Attribute):
         """Returns the average value from the table in parameter"""
 
-        return self.Execute('SELECT avg(' + Attribute + ') FROM ' + Table)
+        return self.Aggregate('avg', Table, Attribute)
 
     def Sum(self, Table, Attribute):
         """Returns the sum value of record attributes from the table in parameter"""
 
-        return self.Execute('SELECT sum(' + Attribute + ') FROM ' + Table)
+        return self.Aggregate('sum', Table, Attribute)
+
+    @Guarded
+    def Scalar(self, Statement, Parameters=None):
+        """Returns the first value of the first row of the result of the statement in parameter"""
+
+        Row = self.Execute(Statement, Parameters).fetchone()
+        return Row[0] if Row else None
+
+    @Guarded
+    def Scalars(self, Statement, Parameters=None):
+        """Returns the first row of the result of the statement in parameter as a tuple"""
+
+        return tuple(self.Execute(Statement, Parameters).fetchone())
+
+    def Stream(self, Statement, Parameters=None):
+        """Yields each row of the result of the statement in parameter, fetched BatchSize rows at a time
+
+        A cursor of its own is used so other statements can run while the rows are being read"""
 
+        Cursor = self.Reader().cursor()
+        try:
+            if Parameters is None:
+                Cursor.execute(Statement)
+            else:
+                Cursor.execute(Statement, Parameters)
+            Rows = Cursor.fetchmany(self.BatchSize)
+            while Rows:
+                yield from Rows
+                Rows = Cursor.fetchmany(self.BatchSize)
+        finally:
+            Cursor.close()
+
+    def Reader(self):
+        """Returns the connection Stream reads from, the shared connection unless the backend gives readers their own"""
+
+        return self.Connection
+
+    def Highest(self, Table):
+        """Returns the highest ID stored in the table in parameter, or 0 if it is empty"""
+
+        return int(self.Aggregate('max', Table, Tables[Table][0][0]) or 0)
+
+    @Guarded
+    def Reserve(self, Table, Count=1):
+        """Returns the first of Count new IDs for the table in parameter, advancing its stored high-water mark
+
+        The mark is kept in the Sequences table and only read from the table itself the first time"""
+
+        Condition = ' WHERE Name = ' + self.Placeholder
+        self.Lock()
+        try:
+            self.Execute('SELECT Value FROM Sequences' + Condition, (Table,))
+            Row = self.Cursor.fetchone()
+            if Row is None:
+                Value = self.Highest(Table)
+                self.Execute('INSERT INTO Sequences VALUES (' + self.Placeholder + ', ' + self.Placeholder + ')',
+                             (Table, Value + Count))
+            else:
+                Value = int(Row[0])
+                self.Execute('UPDATE Sequences SET Value = ' + self.Placeholder + Condition, (Value + Count, Table))
+
+            """Committed directly as giving out IDs does not change the data of any table"""
+            self.Connection.commit()
+        except Exception:
+            self.Rollback()
+            raise
+        return Value + 1
+
+    @Guarded
+    def PlaceOrder(self, Header, Lines):
+        """Writes an order as a single transaction, its header row, its lines in parameter and a decrement of the stock
+        of each item ordered, so the cost depends only on the number of lines
+
+        Stock held for the order is used first. Each decrement only applies while enough stock remains, so orders
+        made at once by other terminals are never overwritten. Raises ValueError and leaves the database unchanged if
+        an item does not have enough stock"""
+
+        Orders, Items = self.View('Orders'), self.View('OrdersItem')
+        Lines = [tuple(Line) for Line in Lines]
+        self.Lock()
+        try:
+            Orders.Execute(Orders.InsertStatement(len(Header)), tuple(Header))
+            Items.InsertMany(Lines)
+            for ItemID, Quantity in Needed(Lines).items():
+
+                """Stock held beyond the quantity ordered is given back, as a negative decrement"""
+                Quantity -= self.Claim(Header[0], ItemID)
+                if Quantity and not self.Take(ItemID, Quantity) and Quantity > 0:
+                    raise ValueError('There is not enough stock of item ' + str(ItemID))
+            self.Connection.commit()
+        except Exception:
+            self.Rollback()
+            raise
+        for Table in ('Orders', 'OrdersItem', 'Inventory', 'Reservations'):
+            Changed(Table)
+
+    @Guarded
+    def HoldStock(self, OrderID, ItemID, Quantity, Expires):
+        """Takes Quantity of the stock of the item in parameter and holds it for the order until Expires, in seconds
+        since the epoch. Every hold of the order is kept until then, as the order is still being made
+
+        The stock is taken by a single conditional decrement, so terminals holding the same item at once can never
+        take more than there is. Raises ValueError and holds nothing if not enough stock remains"""
+
+        Parameters = ' WHERE OrderID = ' + self.Placeholder + ' AND ItemID = ' + self.Placeholder
+        self.Lock()
+        try:
+            if not self.Take(ItemID, Quantity):
+                raise ValueError('There is not enough stock of item ' + str(ItemID))
+            if not self.Execute('UPDATE Reservations SET Quantity = Quantity + ' + self.Placeholder + Parameters,
+                                (Quantity, OrderID, ItemID)).rowcount:
+                self.Execute('INSERT INTO Reservations VALUES (' + ', '.join([self.Placeholder] * 4) + ')',
+                             (OrderID, ItemID, Quantity, Expires))
+            self.Execute('UPDATE Reservations SET Expires = ' + self.Placeholder + ' WHERE OrderID = '
+                         + self.Placeholder, (Expires, OrderID))
+            self.Connection.commit()
+        except Exception:
+            self.Rollback()
+            raise
+        Changed('Inventory')
+        Changed('Reservations')
+
+    @Guarded
+    def ReleaseStock(self, OrderID, ItemID=None):
+        """Gives back the stock held by the order for the item in parameter, or for every item if None, returns the
+        quantity given back"""
+
+        Statement = 'SELECT ItemID FROM Reservations WHERE OrderID = ' + self.Placeholder
+        Parameters = (OrderID,)
+        if ItemID is not None:
+            Statement += ' AND ItemID = ' + self.Placeholder
+            Parameters += (ItemID,)
+        self.Lock()
+        try:
+            Released = 0
+            for Row in self.Execute(Statement, Parameters).fetchall():
+                Quantity = self.Claim(OrderID, Row[0])
+                self.Take(Row[0], -Quantity)
+                Released += Quantity
+            self.Connection.commit()
+        except Exception:
+            self.Rollback()
+            raise
+        Changed('Inventory')
+        Changed('Reservations')
+        return Released
+
+    @Guarded
+    def ExpireHolds(self, Now):
+        """Gives back the stock of every hold which expired before Now, in seconds since the epoch, left by orders
+        which were abandoned. Returns the number of holds expired"""
+
+        self.Lock()
+        try:
+            Expired = 0
+            Rows = self.Execute('SELECT OrderID, ItemID FROM Reservations WHERE Expires < ' + self.Placeholder,
+                                (Now,)).fetchall()
+            for OrderID, ItemID in Rows:
+                Quantity = self.Claim(OrderID, ItemID, Now)
+                if Quantity:
+                    self.Take(ItemID, -Quantity)
+                    Expired += 1
+            self.Connection.commit()
+        except Exception:
+            self.Rollback()
+            raise
+        if Expired:
+            Changed('Inventory')
+            Changed('Reservations')
+        return Expired
+
+    def Claim(self, OrderID, ItemID, Before=None):
+        """Deletes the hold of the order on the item in parameter, only if it expired before Before when given, and
+        returns the quantity it held, or 0 if there was none as it has already been placed, released or expired
+
+        Whichever terminal deletes the hold is the only one to use its stock, called inside a transaction"""
+
+        Condition = ' WHERE OrderID = ' + self.Placeholder + ' AND ItemID = ' + self.Placeholder
+        Row = self.Execute('SELECT Quantity FROM Reservations' + Condition, (OrderID, ItemID)).fetchone()
+        if Row is None:
+            return 0
+        Condition += ' AND Quantity = ' + self.Placeholder
+        Parameters = (OrderID, ItemID, Row[0])
+        if Before is not None:
+            Condition += ' AND Expires < ' + self.Placeholder
+            Parameters += (Before,)
+        return int(Row[0]) if self.Execute('DELETE FROM Reservations' + Condition, Parameters).rowcount == 1 else 0
+
+    def Take(self, ItemID, Quantity):
+        """Decrements the stock of the item in parameter by Quantity only if that much remains, returns whether it
+        was taken. A negative Quantity gives stock back, called inside a transaction"""
+
+        return self.Execute('UPDATE Inventory SET Stock = Stock - ' + self.Placeholder + ' WHERE ItemID = '
+                            + self.Placeholder + ' AND Stock >= ' + self.Placeholder,
+                            (Quantity, ItemID, Quantity)).rowcount == 1
+
+    def Lock(self):
+        """Starts a transaction which stops other connections writing until it ends, used when reserving IDs"""
+
+        self.Begin()
+
+    def Begin(self):
+        """Starts an explicit transaction, ended by either Commit or Rollback"""
+
+        self.Connection.begin()
+
+    @Guarded
     def Commit(self):
         """Commits any changes that have been made to the database"""
 
         self.Connection.commit()
+        Changed(self.Table)
+
+    @Guarded
+    def Rollback(self):
+        """Discards any changes made since the transaction was started"""
+
+        self.Connection.rollback()
 
 
 class Local(Database):
     """Creates an object defined as a local database connection which inherits functions from parent class"""
 
-    def __init__(self, File, Table):
+    def __init__(self, File, Table=None):
         """Establishes the connection to the local database"""
 
         """Parameters are passed onto the parent Database class"""
         super().__init__(File, Table)
 
-        """Connection is made to local database using file name defined in parameter"""
-        self.Connection = sqlite3.connect(self.File)
+        """Connection is made to local database using file name defined in parameter, used by the worker threads as
+        well so access is serialised by the connection's Guard rather than limited to the thread which made it"""
+        self.Connection = sqlite3.connect(self.File, check_same_thread=False)
 
         """Cursor object is created using Connection object"""
         self.Cursor = self.Connection.cursor()
 
+        """Connections streaming rows on each thread, made the first time the thread streams and closed with the
+        shared connection"""
+        self.Readers = threading.local()
+        self.Opened = []
+
         """Assigns database type to Local"""
         self.Type = Type.Local
 
-        """Calls function to check the database has all required tables"""
-        self.Check()
+        """Calls function to tune the connection, its tables are made and keyed by the migrations"""
+        self.Tune()
 
-    def Check(self):
-        """Called when database is made, used to check and ensure all required tables exist"""
+    def Tune(self):
+        """Applies the performance profile to the connection, the memory sizes are set in the configuration
 
-        """Dictionary stores each table name as well as each attribute and corresponding data type """
-        Tables = {
-            'Orders': [['OrderID', 'integer'], ['Date', 'string'], ['CustomerID', 'integer']],
-            'OrdersItem': [['OrderID', 'integer'], ['ItemID', 'integer'], ['Quantity', 'integer']],
-            'Inventory': [['ItemID', 'integer'], ['Brand', 'string'], ['Type', 'string'], ['Name', 'string'],
-                          ['Price', 'real'], ['Stock', 'integer']],
-            'Customers': [['CustomerID', 'integer'], ['Firstname', 'string'], ['Surname', 'string'],
-                          ['Contact', 'string'], ['Address', 'real']]}
+        Write-ahead logging lets readers carry on while a write is made, so it is only synced at checkpoints. This
+        cannot corrupt the database though a power cut may lose the last few commits"""
 
-        """Iteration through dictionary to create table if it doesn't already exist"""
-        for Key in Tables:
+        self.Execute('PRAGMA journal_mode = WAL')
+        self.Execute('PRAGMA synchronous = NORMAL')
+        self.Size(self.Connection)
 
-            """Builds the final string of attributes for the SQL query"""
-            x = ""
-            for Attribute in Tables[Key]:
-                x = x + Attribute[0] + ' ' + Attribute[1] + ', '
-            x = x[:-2]
+    def Size(self, Connection):
+        """Maps up to MMAP bytes of the file into memory and caches up to CACHE kibibytes of pages for the connection
+        in parameter"""
 
-            """Carries out the SQL query making the table with the key attribute and the built attribute string"""
-            self.Execute('CREATE TABLE IF NOT EXISTS ' + Key + ' (' + x + ')')
+        Configuration = settings.Connect()
+        Connection.execute('PRAGMA mmap_size = ' + str(int(Configuration.GetValue('LOCAL', 'MMAP', '268435456'))))
+        Connection.execute('PRAGMA cache_size = ' + str(-int(Configuration.GetValue('LOCAL', 'CACHE', '65536'))))
 
-        """Commits any changes made to the database"""
-        self.Commit()
+    def Reader(self):
+        """Returns the connection of the calling thread which Stream reads from, such as during an export
+
+        The shared connection may be part way through a transaction made on another thread, such as a Save on the
+        Writer, whose changes must not be read until they are committed. Write-ahead logging lets a connection of its
+        own read the last committed state without waiting for the transaction to end"""
+
+        Connection = getattr(self.Readers, 'Connection', None)
+        if Connection is None:
+            Connection = sqlite3.connect(self.File, check_same_thread=False)
+            self.Size(Connection)
+            self.Readers.Connection = Connection
+            self.Opened.append(Connection)
+        return Connection
+
+    def Close(self):
+        """Closes the shared connection and those each thread streamed from, called when the configured backend is
+        changed"""
+
+        super().Close()
+        for Connection in self.Opened:
+            Connection.close()
+
+    @Guarded
+    def Stamp(self, Table):
+        """Returns a value which changes whenever the table in parameter is written, used to validate cached reads
+
+        The data version of the connection changes whenever another connection, such as another terminal sharing the
+        file, commits a write to any table. Writes made on this connection count themselves"""
+
+        return Version(Table), self.Connection.execute('PRAGMA data_version').fetchone()[0]
+
+    def Begin(self):
+        """Starts an explicit transaction unless one is already open on the connection"""
+
+        if not self.Connection.in_transaction:
+            self.Execute('BEGIN')
+
+    def Lock(self):
+        """Takes the database write lock straight away so two connections cannot read the same high-water mark"""
+
+        if not self.Connection.in_transaction:
+            self.Execute('BEGIN IMMEDIATE')
 
 
 class Remote(Database):
     """Creates an object defined as a remote Database connection which inherits functions from parent class"""
 
-    def __init__(self, Host, User, Password, File, Table):
-        """Establishes the connection to the remote database"""
+    def __init__(self, Host, User, Password, File, Table=None, Port=3306, Connector=None, Lost=None):
+        """Establishes the pool of connections to the remote database, raising ConnectionError if it cannot connect
+
+        Connector is called with the keyword arguments of pymysql.connect to make each connection and Lost is the
+        tuple of exceptions meaning a connection has been lost, both default to those of the pymysql driver so a
+        stand-in server can be used in their place"""
 
         """Parameters are passed onto the parent Database class"""
         super().__init__(File, Table)
 
-        """Connection is made to remote database using values in parameter, exception handling checking if connection is successful"""
+        """The unbuffered cursor class is only known to the pymysql driver, other connectors stream with their own"""
+        self.Unbuffered = None
+        if Connector is None:
+            if pymysql is None:
+                raise ConnectionError('The pymysql package is not installed, it is needed to use a remote database')
+            Connector = pymysql.connect
+            self.Unbuffered = pymysql.cursors.SSCursor
+        if Lost is None:
+            Lost = (pymysql.err.OperationalError, pymysql.err.InterfaceError)
+
+        """Each thread is lent a connection of its own, made using the values in parameter. Every statement commits
+        by itself unless a transaction is begun, so reads always see the latest committed data"""
+        Configuration = settings.Connect()
+        self.Guard = Leases(lambda: Connector(host=Host, port=int(Port), user=User, password=Password,
+                                              database=File, autocommit=True, connect_timeout=10),
+                            Size=int(Configuration.GetValue('REMOTE', 'CONNECTIONS', '8')),
+                            Retries=int(Configuration.GetValue('REMOTE', 'RETRIES', '3')),
+                            Lost=Lost)
+
+        """Assigns database type to Remote and the parameter style used by the pymysql driver"""
+        self.Type = Type.Remote
+        self.Placeholder = '%s'
+
+    @property
+    def Connection(self):
+        """The connection lent to the thread using the database, lent to it the first time it is used"""
+
+        return self.Guard.Connection()
+
+    @Connection.setter
+    def Connection(self, Value):
+        """Connections are only ever lent by the pool, so the value set by the parent class is not kept"""
+
+    @property
+    def Cursor(self):
+        """The cursor of this view on the connection lent to the thread using it"""
+
+        return self.Guard.Cursor(self)
+
+    @Cursor.setter
+    def Cursor(self, Value):
+        """Cursors are made on the lent connections, so the value set by the parent class is not kept"""
+
+    def View(self, Table):
+        """Returns a copy of the connection scoped to the table in parameter, its cursor made when it is first used"""
+
+        Scoped = copy.copy(self)
+        Scoped.Table = Table
+        return Scoped
+
+    def Close(self):
+        """Closes every connection of the pool, called when the configured backend is changed"""
+
+        self.Guard.Close()
+
+    def Stamp(self, Table):
+        """Returns a value which changes whenever the table in parameter is written, used to validate cached reads
+
+        Writes made by other terminals are seen from the number of records, the highest ID and the time the server
+        last changed the table, which is only kept to the second"""
+
+        ID = Tables[Table][0][0]
+        return (Version(Table),) + self.Scalars(
+            'SELECT count(*), max(' + ID + '), (SELECT UPDATE_TIME FROM information_schema.tables WHERE '
+            'table_schema = DATABASE() AND table_name = %s) FROM ' + Table, (Table,))
+
+    def Execute(self, Statement, Parameters=None):
+        """Called to execute a SQL command using statement in parameter, values are bound using Parameters
+
+        A query failing because the connection was lost is run once more on a new connection, unless a transaction
+        was under way, as it changes nothing. Returns the cursor so the result-set can be fetched"""
+
+        with self.Guard as Loan:
+            Retry = not Loan.Begun and Statement.lstrip()[:6].upper() == 'SELECT'
+            try:
+                return super().Execute(Statement, Parameters)
+            except self.Guard.Lost:
+                if not Retry:
+                    raise
+            return super().Execute(Statement, Parameters)
+
+    def Begin(self):
+        """Starts an explicit transaction, ended by either Commit or Rollback, so queries are no longer retried"""
+
+        self.Connection.begin()
+        self.Guard.Lent().Begun = True
+
+    @Guarded
+    def Rollback(self):
+        """Discards any changes made since the transaction was started, there are none left if the connection was lost"""
+
         try:
-            self.Connection = pymysql.connect(host=Host, user=User, passwd=Password, db=File)
-        except Exception:
-            message.showerror('Error', 'Could not connect to remote database, check remote database settings')
-            exit()
+            self.Connection.rollback()
+        except self.Guard.Lost:
+            pass
 
-        """Cursor object is created using Connection object"""
-        self.Cursor = self.Connection.cursor()
+    @Guarded
+    def Reserve(self, Table, Count=1):
+        """Returns the first of Count new IDs for the table in parameter using a single atomic update
 
-        """Assigns database type to Remote"""
-        self.Type = Type.Remote
+        LAST_INSERT_ID keeps the advanced value for this connection, so terminals sharing the database never clash"""
+
+        Statement = 'UPDATE Sequences SET Value = LAST_INSERT_ID(Value + %s) WHERE Name = %s'
+        try:
+            self.Execute(Statement, (Count, Table))
+            if not self.Cursor.rowcount:
+
+                """The first time, the mark starts at the highest stored ID, the primary key stops two being made"""
+                self.Execute('INSERT IGNORE INTO Sequences SELECT %s, coalesce(max(' + Tables[Table][0][0] + '), 0) '
+                             'FROM ' + Table, (Table,))
+                self.Execute(Statement, (Count, Table))
+            self.Execute('SELECT LAST_INSERT_ID()')
+            Value = int(self.Cursor.fetchone()[0])
+            self.Connection.commit()
+        except Exception:
+            self.Rollback()
+            raise
+        return Value - Count + 1
+
+    @Guarded
+    def InsertMany(self, Rows, Progress=None):
+        """Inserts each row in parameter as multi-row statements of BatchSize rows, one round trip per batch"""
+
+        Count = 0
+        for Batch in Batches(Rows, self.BatchSize):
+            Parameters = [Value for Row in Batch for Value in Row]
+            self.Execute(self.InsertStatement(len(Batch[0]), len(Batch)), Parameters)
+            Count += len(Batch)
+            if Progress:
+                Progress(Count)
+        return Count
+
+    def Stream(self, Statement, Parameters=None):
+        """Yields each row of the result of the statement in parameter using an unbuffered cursor, so the server sends
+        rows as they are read rather than the driver holding the whole result-set
+
+        No other statement can be sent on the connection until every row has been read, so it is held throughout"""
+
+        with self.Guard:
+            if self.Unbuffered is None:
+                Cursor = self.Connection.cursor()
+            else:
+                Cursor = self.Connection.cursor(self.Unbuffered)
+            try:
+                Cursor.execute(Statement, Parameters)
+                Rows = Cursor.fetchmany(self.BatchSize)
+                while Rows:
+                    yield from Rows
+                    Rows = Cursor.fetchmany(self.BatchSize)
+            finally:
+                Cursor.close()
 
 
 class Text(Database):
     """Creates an object defined as a text file Database connection which overrides functions from parent class"""
 
-    def __init__(self, File):
-        """Parameters are passed onto the parent Database class"""
-        super().__init__(File, None)
+    def __init__(self, File='../Data/Text/', Table=None):
+        """Parameters are passed onto the parent Database class, File being the directory holding each table file"""
+        super().__init__(File, Table)
 
         """Assigns database type to Text"""
         self.Type = Type.Text
 
-        """Calls function to check the database has all required tables"""
-        self.Check()
+        """A table's journal is compacted into its file once it grows past this fraction of the file's size, or past
+        Limit bytes however large the file is, as every change it holds is kept in memory. The files of the tables
+        are made by the migrations"""
+        self.Ratio = 0.5
+        self.Limit = int(settings.Connect().GetValue('TEXT', 'JOURNAL', '4194304'))
 
-    def Check(self):
-        """Called when connection is made, used to check and ensure all required tables exist for text database"""
+        """Finishes or undoes any Save cut short when the application last stopped"""
+        self.Recover()
 
-        """List containing all of the tables needed for the system"""
-        Tables = ['Orders', 'OrdersItem', 'Inventory', 'Customers']
+    def Path(self, Table=None):
+        """Returns the location of the text file storing the table in parameter, or the scoped table by default"""
 
-        """Iteration through each required table"""
-        for Table in Tables:
+        return os.path.join(self.File, (Table or self.Table) + '.csv')
 
-            try:
-                """Tries to open the iterated file using the 'r' state, meaning read only, do not delete records"""
-                open('../Data/Text/' + Table + '.csv', 'r')
-            except IOError:
-                """If an error occurs it means the file does not exist", in that case open with 'w' state meaning write, deletes records"""
-                open('../Data/Text/' + Table + '.csv', 'w')
+    def JournalPath(self, Table=None):
+        """Returns the location of the journal of changes not yet compacted into the file of the table in parameter"""
 
-    def Save(self, Data):
-        """Called to save data inside a text based database"""
+        return os.path.join(self.File, (Table or self.Table) + '.journal')
 
-        """Connects to and Removes all records from the table due to 'w' parameter"""
-        Connection = open('../Data/Text/' + self.File + '.csv', 'w')
+    def Base(self, Table, Replayed):
+        """Returns the location of the file the Replay in parameter of the table's journal applies to, which is the
+        file written by a Save until it has replaced the table's file"""
 
-        """Creates writer instance for opened text file"""
-        Writer = csv.writer(Connection, lineterminator='\n')
+        if Replayed.Saved:
+            Saved = self.Path(Table) + '.' + Replayed.Saved
+            if os.path.exists(Saved):
+                return Saved
+        return self.Path(Table)
 
-        """Writes row inside opened file for each Record in Data parameter by getting attributes"""
-        for Record in Data:
-            Writer.writerow(list(Record.GetAttributes()))
+    def Save(self, Data, Progress=None):
+        """Called to save data inside a text based database, replacing every record of the table, returns the number
+        of records saved
 
-        """Closing connection when process is complete"""
-        Connection.close()
+        The records are written a batch at a time to a new file, so any number can be saved without holding them in
+        memory, calling Progress with the number written after each batch. The journal is then replaced by one naming
+        the new file, at which point the save takes effect, before the new file replaces the old. A save cut short
+        before then leaves the table as it was, one cut short after is finished when the database is next opened"""
 
-    def Read(self):
+        Path = self.Path()
+        Journal = self.JournalPath()
+        Token = os.urandom(8).hex()
+        Saved = Path + '.' + Token
+
+        """Holds the lock compacting the table, so it is not compacted from the records being replaced meanwhile"""
+        with JournalLock(Journal + '.tmp'):
+            Count = 0
+            try:
+                with open(Saved, 'w') as Connection:
+                    Writer = csv.writer(Connection, lineterminator='\n')
+                    for Batch in Batches((list(Record.GetAttributes()) for Record in Data), self.BatchSize):
+                        Writer.writerows(Batch)
+                        Count += len(Batch)
+                        if Progress:
+                            Progress(Count)
+                    Connection.flush()
+                    os.fsync(Connection.fileno())
+            except BaseException:
+                if os.path.exists(Saved):
+                    os.remove(Saved)
+                raise
+
+            with JournalLock(Journal):
+                Replace(Journal, b'B\nS,' + Token.encode() + b'\nC\n')
+                try:
+                    os.replace(Saved, Path)
+                except OSError:
+                    """The file may be held open by a reader on some systems, the journal names the new file so it is
+                    read in its place until the table is next compacted"""
+                else:
+                    os.remove(Journal)
+        Changed(self.Table)
+
+        """The replaced table may hold any IDs, so its next ID is worked out again from the highest one"""
+        Sequences = self.Sequences()
+        if Sequences.pop(self.Table, None) is not None:
+            self.StoreSequences(Sequences)
+        return Count
+
+    def Sequences(self):
+        """Returns a dictionary of the high-water mark stored for each table"""
+
+        return {Record[0]: int(Record[1]) for Record in self.Rows('Sequences')}
+
+    def StoreSequences(self, Sequences):
+        """Writes the dictionary of high-water marks in parameter to a temporary file which then replaces the old one"""
+
+        Path = self.Path('Sequences')
+        with open(Path + '.tmp', 'w') as Connection:
+            Writer = csv.writer(Connection, lineterminator='\n')
+            for Name, Value in Sequences.items():
+                Writer.writerow([Name, Value])
+        os.replace(Path + '.tmp', Path)
+
+    def Recover(self):
+        """Replaces the file of each table whose Save was cut short once its journal named the file it wrote, and
+        removes the files written by those cut short before then
+
+        A table being saved or compacted meanwhile is left alone, its own Save finishes or the file is removed the
+        next time the database is opened"""
+
+        try:
+            Names = os.listdir(self.File)
+        except OSError:
+            return
+        for Name in Names:
+            Parts = Name.split('.')
+            if len(Parts) != 3 or Parts[0] not in Tables or Parts[1] != 'csv' or Parts[2] == 'tmp':
+                continue
+            Table, Token = Parts[0], Parts[2]
+            Journal = self.JournalPath(Table)
+            if not JournalLock(Journal + '.tmp').acquire(blocking=False):
+                continue
+            try:
+                with JournalLock(Journal):
+                    if self.Replayed(Table).Saved == Token:
+                        os.replace(os.path.join(self.File, Name), self.Path(Table))
+                    else:
+                        os.remove(os.path.join(self.File, Name))
+            except OSError:
+                pass
+            finally:
+                JournalLock(Journal + '.tmp').release()
+
+    def Reserve(self, Table, Count=1):
+        """Returns the first of Count new IDs for the table in parameter, advancing its high-water mark
+
+        The marks are read and written back under a lock so two threads cannot be given the same IDs"""
+
+        with JournalLock(self.Path('Sequences')):
+            Sequences = self.Sequences()
+            Value = Sequences[Table] if Table in Sequences else self.Highest(Table)
+            Sequences[Table] = Value + Count
+            self.StoreSequences(Sequences)
+        return Value + 1
+
+    def PlaceOrder(self, Header, Lines):
+        """Writes an order, its header row, its lines in parameter and a decrement of the stock of each item ordered,
+        using the stock held for the order first
+
+        Text files have no transactions, so the stock of every item is checked under a lock before anything is written.
+        The stock is then journaled before the holds, lines and header, so an order is never stored without its stock
+        having been taken. Raises ValueError and writes nothing if an item does not have enough stock"""
+
+        with JournalLock(self.Path('Inventory')):
+            Held = self.Holds(Header[0])
+            Entries = []
+            for ItemID, Quantity in Needed(Lines).items():
+                if ItemID in Held:
+                    Quantity -= int(Held[ItemID][2])
+                Entry = self.Decrement(ItemID, Quantity) if Quantity else None
+                if Entry:
+                    Entries.append(Entry)
+                elif Quantity > 0:
+                    raise ValueError('There is not enough stock of item ' + str(ItemID))
+            if Entries:
+                self.Journal(Entries, 'Inventory')
+            if Held:
+                self.Journal([['D', str(Header[0]), str(ItemID)] for ItemID in Held], 'Reservations')
+            self.Journal([['I'] + list(Line) for Line in Lines], 'OrdersItem')
+            self.Journal([['I'] + list(Header)], 'Orders')
+
+    def HoldStock(self, OrderID, ItemID, Quantity, Expires):
+        """Takes Quantity of the stock of the item in parameter and holds it for the order until Expires, in seconds
+        since the epoch, every hold of the order is kept until then. Raises ValueError if not enough stock remains
+
+        The stock is journaled before the hold, so stock is never given back by a hold which did not take it"""
+
+        with JournalLock(self.Path('Inventory')):
+            Entry = self.Decrement(ItemID, Quantity)
+            if Entry is None:
+                raise ValueError('There is not enough stock of item ' + str(ItemID))
+            Held = self.Holds(OrderID)
+            Current = int(Held[int(ItemID)][2]) if int(ItemID) in Held else 0
+            Held[int(ItemID)] = [str(OrderID), str(ItemID), str(Current + int(Quantity))]
+            self.Journal([Entry], 'Inventory')
+            self.Journal([['U'] + Record[:3] + [str(Expires)] for Record in Held.values()], 'Reservations')
+
+    def ReleaseStock(self, OrderID, ItemID=None):
+        """Gives back the stock held by the order for the item in parameter, or for every item if None, returns the
+        quantity given back"""
+
+        with JournalLock(self.Path('Inventory')):
+            Held = self.Holds(OrderID)
+            if ItemID is not None:
+                Held = {Key: Record for Key, Record in Held.items() if Key == int(ItemID)}
+            return self.Return(Held.values())
+
+    def ExpireHolds(self, Now):
+        """Gives back the stock of every hold which expired before Now, in seconds since the epoch, left by orders
+        which were abandoned. Returns the number of holds expired"""
+
+        with JournalLock(self.Path('Inventory')):
+            Expired = [Record for Record in self.Rows('Reservations') if float(Record[3]) < Now]
+            self.Return(Expired)
+        return len(Expired)
+
+    def Holds(self, OrderID):
+        """Returns a dictionary of the hold records of the order in parameter keyed by Item ID"""
+
+        return {int(Record[1]): Record for Record in self.Lookup('Reservations', OrderID)}
+
+    def Return(self, Held):
+        """Deletes the hold records in parameter then gives their stock back, returns the quantity given back
+
+        The holds are journaled first, so a failure part way loses stock rather than giving it back twice"""
+
+        Held = list(Held)
+        if not Held:
+            return 0
+        self.Journal([['D', Record[0].strip(), Record[1].strip()] for Record in Held], 'Reservations')
+        Entries = [self.Decrement(ItemID, -Quantity) for ItemID, Quantity in Needed(Held).items()]
+        Entries = [Entry for Entry in Entries if Entry]
+        if Entries:
+            self.Journal(Entries, 'Inventory')
+        return sum(int(Record[2]) for Record in Held)
+
+    def Decrement(self, ItemID, Quantity):
+        """Returns the journal entry decrementing the stock of the item in parameter by Quantity, or None if the item
+        does not exist or that much does not remain. A negative Quantity gives stock back, called holding the lock"""
+
+        Records = self.Lookup('Inventory', ItemID)
+        if not Records:
+            return None
+        Record = list(Records[0])
+        Stock = Typed('Inventory', Record)[5]
+        if Stock < Quantity:
+            return None
+        Record[5] = str(Stock - Quantity)
+        return ['U'] + Record
+
+    def Flush(self, Data):
+        """Writes only the changes tracked by the Records in parameter as a single journal entry, returns the Stamp of
+        the table once written, or None if there was nothing to write
+
+        A journaled update replaces the whole record, so the attributes edited are applied to the record as stored.
+        The lock taken when stock is held or sold is kept until it is journaled, so no stock taken is written over"""
+
+        if not Data.Changed():
+            return None
+
+        with JournalLock(self.Path()):
+            Entries = [['D', ID] for ID in Data.Deleted]
+            for Record in Data.Updated.values():
+                Attributes = list(Record.GetAttributes())
+                Edited = Data.Edited(Record)
+                if len(Edited) < len(Attributes) - 1 and Identifiers.get(self.Table, 1) == 1:
+                    Stored = self.Lookup(self.Table, Attributes[0])
+                    if Stored:
+                        Attributes = [Attributes[Position] if Position in Edited else Value
+                                      for Position, Value in enumerate(Stored[0])]
+                if Edited:
+                    Entries.append(['U'] + Attributes)
+            Entries.extend(['I'] + list(Record.GetAttributes()) for Record in Data.Inserted.values())
+            if Entries:
+                self.Journal(Entries)
+            Stamp = self.Stamp(self.Table)
+
+        """Changes have been written so they no longer need tracking"""
+        Data.Clean()
+        return Stamp
+
+    def Journal(self, Entries, Table=None, Clear=False, Progress=None):
+        """Appends the entries in parameter to the journal of the table as one entry, the cost depending only on them
+
+        Each entry is an operation followed by attributes: I inserts and U updates a record, D deletes a record by
+        its key and Z clears the table, written first if Clear is set. A Save replaces the journal with an S entry
+        naming the file it wrote. Entries are enclosed in B and C lines so one cut short is never replayed. They are
+        written a batch at a time, calling Progress with the number written"""
+
+        Table = Table or self.Table
+        Path = self.JournalPath(Table)
+        with JournalLock(Path):
+            with open(Path, 'a+b') as Connection:
+
+                """A line left unfinished by a crash is ended so it cannot join onto the first line written"""
+                if Connection.tell():
+                    Connection.seek(-1, os.SEEK_END)
+                    if Connection.read(1) != b'\n':
+                        Connection.write(b'\n')
+
+                Connection.write(b'B\nZ\n' if Clear else b'B\n')
+                Count = 0
+                for Batch in Batches(Entries, self.BatchSize):
+                    Lines = io.StringIO()
+                    csv.writer(Lines, lineterminator='\n').writerows(Batch)
+                    Connection.write(Lines.getvalue().encode())
+                    Count += len(Batch)
+                    if Progress:
+                        Progress(Count)
+                Connection.write(b'C\n')
+                Connection.flush()
+                os.fsync(Connection.fileno())
+        Changed(Table)
+
+        """Once the journal has grown large enough it is merged into the table's file in the background"""
+        if os.path.getsize(Path) > min(self.Ratio * max(os.path.getsize(self.Path(Table)), 65536), self.Limit):
+            Compact(self, Table)
+        return Count
+
+    def Journaled(self, Table=None):
+        """Returns whether the table in parameter has journal entries which have not been compacted"""
+
+        Path = self.JournalPath(Table)
+        return os.path.exists(Path) and os.path.getsize(Path) > 0
+
+    def Changes(self, Table=None):
+        """Returns whether the journal of the table clears it, and a copy of the dictionary of the records it changes
+        keyed by their identifying attributes, None for those deleted"""
+
+        Replayed = self.Replayed(Table)
+        with Replayed.Lock:
+            return Replayed.Cleared, dict(Replayed.Changes)
+
+    def Replayed(self, Table=None):
+        """Returns the Replay of the journal of the table in parameter, which is changed in place as entries are
+        appended, so its Lock is held while it is read
+
+        The parsed journal is kept until the journal is replaced, so each call only parses the entries appended since
+        the last one"""
+
+        Table = Table or self.Table
+        Path = self.JournalPath(Table)
+        if not self.Journaled(Table):
+            Journals.pop(os.path.abspath(Path), None)
+            return Replay(None, Identifiers.get(Table, 1))
+
+        with open(Path, 'rb') as Connection:
+            Status = os.fstat(Connection.fileno())
+            Identity = (Status.st_dev, Status.st_ino)
+            Cached = Journals.get(os.path.abspath(Path))
+            if Cached is not None and Cached.Identity == Identity:
+                with Cached.Lock:
+
+                    """The bytes before where the parse stopped are compared in case the journal was replaced by one
+                    of the same inode, it is then parsed again from its start"""
+                    Connection.seek(max(Cached.Offset - len(Cached.Tail), 0))
+                    if Cached.Offset <= Status.st_size and Connection.read(len(Cached.Tail)) == Cached.Tail:
+                        return self.Parse(Table, Cached, Connection, Status.st_size)
+            Cached = Replay(Identity, Identifiers.get(Table, 1))
+            with Cached.Lock:
+                return self.Parse(Table, Cached, Connection, Status.st_size)
+
+    def Parse(self, Table, Cached, Connection, Length):
+        """Parses the journal opened as Connection from where the Replay in parameter stopped up to Length bytes,
+        keeping it as the parse of the table's journal, called holding its Lock"""
+
+        Connection.seek(Cached.Offset)
+        Remaining = Length - Cached.Offset
+        Carried = b''
+
+        """The journal is read a megabyte at a time, so only the changes it makes are held in memory"""
+        while Remaining > 0:
+            Chunk = Connection.read(min(Remaining, 1048576))
+            if not Chunk:
+                break
+            Remaining -= len(Chunk)
+            Data = Carried + Chunk
+
+            """Only whole lines are parsed, the rest is carried to the next chunk or, for a line still being
+            written, read the next time"""
+            End = Data.rfind(b'\n') + 1
+            Carried = Data[End:]
+            if End:
+                Cached.Extend(Data[:End])
+        Journals[os.path.abspath(self.JournalPath(Table))] = Cached
+        return Cached
+
+    def Opened(self, Table=None, Mode='rb'):
+        """Returns the Replay of the table's journal with the file it applies to opened in Mode, both taken holding the
+        journal's lock so a Save or compaction never leaves the journal read applying to a different file"""
+
+        Table = Table or self.Table
+
+        """The journal is parsed before the lock is taken, so only entries appended since are parsed holding it"""
+        self.Replayed(Table)
+        with JournalLock(self.JournalPath(Table)):
+            Replayed = self.Replayed(Table)
+            return Replayed, open(self.Base(Table, Replayed), Mode)
+
+    def Merged(self, Table=None, Changes=None, Opened=None):
+        """Yields every record of the table read from the file then changed by its journal, or by the Changes given
+        as returned by the Changes method applying to the file Opened as returned by the Opened method. Only the
+        journal's changes are held in memory, never the whole table
+
+        Updated records keep their place in the file while inserted records follow the end of it"""
+
+        Table = Table or self.Table
+        Width = Identifiers.get(Table, 1)
+        Replayed, Connection = self.Opened(Table, 'r') if Opened is None else Opened
+        if Changes is None:
+            with Replayed.Lock:
+                Changes = Replayed.Cleared, dict(Replayed.Changes)
+        Cleared, Changes = Changes
+        Written = set()
+        with Connection:
+            if not Cleared:
+                for Record in csv.reader(Connection):
+                    if not Record:
+                        continue
+                    Key = tuple(Value.strip() for Value in Record[:Width])
+                    if Key not in Changes:
+                        yield Record
+                    elif Key not in Written:
+                        Written.add(Key)
+                        if Changes[Key] is not None:
+                            yield Changes[Key]
+        for Key, Record in Changes.items():
+            if Record is not None and Key not in Written:
+                yield Record
+
+    def Index(self, Table, Connection):
+        """Returns arrays of the IDs of the table's file opened as Connection in order, with the byte offsets where
+        each run of lines with that ID starts and ends, kept in a sidecar file which is rebuilt whenever the file
+        changes"""
+
+        Path = Connection.name
+        Status = os.fstat(Connection.fileno())
+        Stamp = array.array('q', [Status.st_size, Status.st_mtime_ns])
+
+        """The index held in memory is used until the file changes, then the sidecar is tried before rebuilding"""
+        Cached = Indexes.get(os.path.abspath(Path))
+        if Cached and Cached[0] == Stamp:
+            return Cached[1]
+        Sidecar = os.path.join(self.File, Table + '.index')
+        Arrays = ReadIndex(Sidecar, Stamp)
+        if Arrays is None:
+            Arrays = BuildIndex(Connection)
+            WriteIndex(Sidecar, Stamp, Arrays)
+        Indexes[os.path.abspath(Path)] = (Stamp, Arrays)
+        return Arrays
+
+    def Lookup(self, Table, Low, High=None):
+        """Returns the records of the table with IDs from Low to High inclusive, or just Low, in order of ID
+
+        Only the lines holding those IDs are read from the memory-mapped file, changes in the journal are applied"""
+
+        High = Low if High is None else High
+        Width = Identifiers.get(Table, 1)
+        Replayed, Connection = self.Opened(Table)
+        Records = []
+        with Connection:
+            if not Replayed.Cleared and os.fstat(Connection.fileno()).st_size:
+                IDs, Starts, Ends = self.Index(Table, Connection)
+                First = bisect.bisect_left(IDs, int(Low))
+                Last = bisect.bisect_right(IDs, int(High))
+                if First < Last:
+                    with mmap.mmap(Connection.fileno(), 0, access=mmap.ACCESS_READ) as Map:
+                        for Position in range(First, Last):
+                            Lines = Map[Starts[Position]:Ends[Position]].decode().splitlines()
+                            Records.extend(Record for Record in csv.reader(Lines) if Record)
+
+        """Records changed in the journal replace those read from the file, those it inserts are added"""
+        with Replayed.Lock:
+            if Replayed.Changes:
+                Records = [Record for Record in Records
+                           if tuple(Value.strip() for Value in Record[:Width]) not in Replayed.Changes]
+                Records.extend(Replayed.Within(Low, High))
+                Records.sort(key=lambda Record: int(Record[0]))
+        return Records
+
+    def Compact(self, Table=None):
+        """Merges the journal of the table in parameter into its file, returns whether it was compacted
+
+        The merged records are written to a temporary file which atomically replaces the old one, so a crash at any
+        point leaves either the old file and journal or the new file. Entries logged while merging are kept"""
+
+        Table = Table or self.Table
+        Journal = self.JournalPath(Table)
+
+        """Only one compaction of a table runs at a time"""
+        with JournalLock(Journal + '.tmp'):
+            return self.Merge(Table)
+
+    def Merge(self, Table):
+        """Called by Compact to merge the journal of the table in parameter into its file"""
+
+        Path = self.Path(Table)
+        Journal = self.JournalPath(Table)
+
+        """The journal is parsed before the lock is taken, so only entries appended since are parsed holding it"""
+        self.Replayed(Table)
+        with JournalLock(Journal):
+            if not self.Journaled(Table):
+                return False
+            Length = os.path.getsize(Journal)
+            Opened = self.Opened(Table, 'r')
+            Changes = self.Changes(Table)
+        Base = Opened[1].name
+
+        """The slow part is done without the lock so records can still be saved while the file is rewritten"""
+        with open(Path + '.tmp', 'w') as Connection:
+            csv.writer(Connection, lineterminator='\n').writerows(self.Merged(Table, Changes, Opened))
+            Connection.flush()
+            os.fsync(Connection.fileno())
+
+        with JournalLock(Journal):
+            with open(Journal, 'rb') as Connection:
+                Connection.seek(Length)
+                Tail = Connection.read()
+            try:
+                os.replace(Path + '.tmp', Path)
+            except OSError:
+                """The file may be held open by a reader on some systems, it is compacted again after the next save"""
+                os.remove(Path + '.tmp')
+                return False
+
+            """Replaying the old journal over the new file gives the same records, so a crash here loses nothing"""
+            Replace(Journal, Tail)
+
+            """A file written by a Save which could not replace the table's file is no longer read"""
+            if Base != Path:
+                try:
+                    os.remove(Base)
+                except OSError:
+                    pass
+        return True
+
+    def Stamp(self, Table):
+        """Returns the size and modification time of the table's file and journal, so edits made outside the
+        application also invalidate cached reads"""
+
+        Stamp = [Version(Table)]
+        for Path in (self.Path(Table), self.JournalPath(Table)):
+            if os.path.exists(Path):
+                Status = os.stat(Path)
+                Stamp.extend((Status.st_size, Status.st_mtime_ns))
+            else:
+                Stamp.extend((None, None))
+        return tuple(Stamp)
+
+    def Fetch(self):
         """Returns array of data after reading text based database"""
 
-        """Establishes connection to the local text file"""
-        Connection = open('../Data/Text/' + self.File + '.csv', 'r')
+        return list(self.Rows())
 
-        """Creates reader instance for opened text file"""
-        Reader = csv.reader(Connection)
+    def Rows(self, Table=None):
+        """Yields each record of the table in parameter, or the scoped table, one at a time from its text file"""
 
-        """Creates array to store data read in text file"""
-        Data = []
+        """Changes still in the journal are replayed over the file"""
+        if self.Journaled(Table):
+            yield from self.Merged(Table)
+            return
 
-        """Reads through each Record in the reader instance and appends the Record to the Data array"""
-        for Record in Reader:
-            if Record:
-                Data.append(Record)
+        """Establishes connection to the local text file, closed once every record has been read"""
+        with open(self.Path(Table), 'r') as Connection:
 
-        """Closing connection when process is complete"""
-        Connection.close()
-        return Data
+            """Reads through each Record in a reader instance, skipping empty lines"""
+            for Record in csv.reader(Connection):
+                if Record:
+                    yield Record
 
-    def Insert(self, Data):
-        """Used to insert a data item into a text file, overrides parent database class"""
+    def SelectAll(self, Table=None, Order=''):
+        """Returns all records from a table with each attribute converted to its type, sorted by Order if given"""
 
-        """Establishes connection to the local text file with append configuration"""
-        Connection = open('../Data/Text/' + self.File + '.csv', 'a')
+        Table = Table or self.Table
+        Data = [tuple(Typed(Table, Record)) for Record in self.Rows(Table)]
+        if Order:
+            Data.sort(key=lambda Record: Record[Column(Table, Order)])
+        return Data
 
-        """Creates writer instance for opened text file"""
-        Writer = csv.writer(Connection, lineterminator='\n')
+    def SelectRecord(self, Table, ID, Field='*'):
+        """Returns all attributes or a specific attribute of the records with the ID in parameter, as a list of rows"""
+
+        Data = [Typed(Table, Record) for Record in self.Lookup(Table, ID)]
+        return [tuple(Record) if Field == '*' else (Record[Column(Table, Field)],) for Record in Data]
+
+    def SelectRange(self, Table, Low, High):
+        """Returns the records with IDs from Low to High inclusive as a list of rows in order of ID"""
+
+        return [tuple(Typed(Table, Record)) for Record in self.Lookup(Table, Low, High)]
+
+    def Page(self, Table, Before=None, Limit=100):
+        """Returns up to Limit records with IDs below Before, or the highest IDs if None, as a list of rows highest first
+
+        The IDs bounding the page are found in the table's index and only those lines are read. The range is widened
+        while records deleted in the journal leave it short"""
+
+        Replayed, Connection = self.Opened(Table)
+        with Connection:
+            Empty = Replayed.Cleared or not os.fstat(Connection.fileno()).st_size
+            IDs = [] if Empty else self.Index(Table, Connection)[0]
+        End = len(IDs) if Before is None else bisect.bisect_left(IDs, int(Before))
+        High = 2 ** 63 - 1 if Before is None else int(Before) - 1
+
+        """Records inserted in the journal may have any ID, so the lowest page reads everything below its highest ID"""
+        Count = Limit
+        while True:
+            Start = max(End - Count, 0)
+            Low = IDs[Start] if Start else min(IDs[0] if len(IDs) else 0, 0)
+            Records = self.Lookup(Table, Low, High)
+            if len(Records) >= Limit or not Start:
+                break
+            Count *= 2
+        return [tuple(Typed(Table, Record)) for Record in reversed(Records[-Limit:])]
+
+    def Evaluate(self, Table, Expression):
+        """Yields the value of Expression, an attribute or a product of attributes, for each record of the table"""
+
+        if Expression == '*':
+            for Record in self.Rows(Table):
+                yield 1
+            return
+        Columns = [Column(Table, Name) for Name in Expression.split('*')]
+        for Record in self.Rows(Table):
+            Record = Typed(Table, Record)
+            Value = 1
+            for Index in Columns:
+                Value *= Record[Index]
+            yield Value
+
+    def Aggregate(self, Function, Table, Expression='*'):
+        """Returns the single value of the aggregate Function over Expression, computed while reading the text file
+
+        Like SQL, count is 0 for an empty table while every other aggregate is None"""
+
+        Count = 0
+        Result = None
+        for Value in self.Evaluate(Table, Expression):
+            Count += 1
+            if Result is None:
+                Result = Value
+            elif Function in ('sum', 'avg'):
+                Result += Value
+            elif Function == 'min':
+                Result = min(Result, Value)
+            elif Function == 'max':
+                Result = max(Result, Value)
+        if Function == 'count':
+            return Count
+        if Function == 'avg' and Count:
+            return Result / Count
+        return Result
 
-        """Writes row inside opened file for data item in parameter"""
-        Writer.writerow(Data.GetAttributes())
+    def Insert(self, Data):
+        """Used to insert a data item into a text file, overrides parent database class"""
 
-        """Closing connection when process is complete"""
-        Connection.close()
+        self.Journal([['I'] + list(Data.GetAttributes())])
 
 
 class Type(enum.Enum):
@@ -293,16 +1683,562 @@ class Type(enum.Enum):
     Text = 'Text'
 
 
+"""Dictionary counting the writes made to each table, used to tell when copies of a table have become stale"""
+Versions = {}
+
+
+def Changed(Table):
+    """Called after every write to the table in parameter so any copies of it are read again"""
+
+    if Table:
+        Versions[Table] = Versions.get(Table, 0) + 1
+
+
+def Version(Table):
+    """Returns the number of writes made to the table in parameter, which changes whenever the table is written"""
+
+    return Versions.get(Table, 0)
+
+
+def Column(Table, Attribute):
+    """Returns the position of the attribute in parameter within the records of the table, ignoring case"""
+
+    Attribute = Attribute.strip().lower()
+    for Index, Field in enumerate(Tables[Table]):
+        if Field[0].lower() == Attribute:
+            return Index
+    raise ValueError('Unknown attribute ' + Attribute + ' of ' + Table)
+
+
+def Typed(Table, Record):
+    """Returns the record in parameter read from a text file with each attribute converted to its type in Tables
+
+    As with SQLite column affinity, a value which cannot be converted is kept as text"""
+
+    Converters = {'integer': int, 'real': float}
+    Data = []
+    for Value, Field in zip(Record, Tables[Table]):
+        try:
+            Data.append(Converters[Field[1]](Value) if Field[1] in Converters else Value)
+        except ValueError:
+            Data.append(Value)
+    return Data
+
+
+class Cache:
+    """Creates a read-through cache of whole tables which evicts the least recently read once Limit rows are held"""
+
+    def __init__(self, Limit=1000000):
+        """Starts empty, counting the reads served from the cache and those which had to go to the database"""
+
+        self.Limit = Limit
+        self.Entries = collections.OrderedDict()
+        self.Size = 0
+        self.Hits = 0
+        self.Misses = 0
+        self.Lock = threading.Lock()
+
+    def Read(self, Connection, Table):
+        """Returns a copy of the rows of the table in parameter, only read from the Connection if its stamp changed"""
+
+        Key = (Connection.Type, Connection.File, Table)
+
+        """The stamp is taken before reading so a write made during the read makes the entry stale, not wrong"""
+        Stamp = Connection.Stamp(Table)
+        with self.Lock:
+            Entry = self.Entries.get(Key)
+            if Entry and Entry[0] == Stamp:
+                self.Entries.move_to_end(Key)
+                self.Hits += 1
+                return list(Entry[1])
+            self.Misses += 1
+
+        Rows = Connection.Fetch()
+        self.Store(Key, Stamp, Rows)
+        return list(Rows)
+
+    def Store(self, Key, Stamp, Rows):
+        """Keeps the rows in parameter, evicting the least recently read tables until within Limit"""
+
+        with self.Lock:
+            if Key in self.Entries:
+                self.Size -= len(self.Entries.pop(Key)[1])
+            if len(Rows) > self.Limit:
+                return
+            self.Entries[Key] = (Stamp, Rows)
+            self.Size += len(Rows)
+            while self.Size > self.Limit:
+                self.Size -= len(self.Entries.popitem(last=False)[1][1])
+
+    def Clear(self):
+        """Forgets every cached table"""
+
+        with self.Lock:
+            self.Entries.clear()
+            self.Size = 0
+
+    def Statistics(self):
+        """Returns a dictionary of the hits, misses, tables and rows held by the cache"""
+
+        with self.Lock:
+            return {'Hits': self.Hits, 'Misses': self.Misses, 'Tables': len(self.Entries), 'Rows': self.Size}
+
+
+"""Application-wide cache of table reads"""
+Reads = Cache()
+
+"""Dictionary storing the offset index of each text file with the size and modification time it was built for"""
+Indexes = {}
+
+
+def BuildIndex(Connection):
+    """Returns arrays of the ID of each run of lines sharing an ID in the file opened in binary as Connection, with
+    the byte offsets where the run starts and ends, sorted by ID"""
+
+    IDs, Starts, Ends = array.array('q'), array.array('q'), array.array('q')
+    Offset = 0
+    Connection.seek(0)
+    for Line in Connection:
+        Field = Line.split(b',', 1)[0].strip()
+        if Field:
+            ID = int(Field)
+
+            """Consecutive lines of the same ID, such as the lines of an order, extend the same run"""
+            if IDs and IDs[-1] == ID and Ends[-1] == Offset:
+                Ends[-1] = Offset + len(Line)
+            else:
+                IDs.append(ID)
+                Starts.append(Offset)
+                Ends.append(Offset + len(Line))
+        Offset += len(Line)
+
+    """Files are normally in order of ID already, otherwise the runs are sorted so they can be searched"""
+    if any(IDs[Position] > IDs[Position + 1] for Position in range(len(IDs) - 1)):
+        Order = sorted(range(len(IDs)), key=IDs.__getitem__)
+        IDs = array.array('q', (IDs[Position] for Position in Order))
+        Starts = array.array('q', (Starts[Position] for Position in Order))
+        Ends = array.array('q', (Ends[Position] for Position in Order))
+    return IDs, Starts, Ends
+
+
+def ReadIndex(Sidecar, Stamp):
+    """Returns the arrays stored in the sidecar file in parameter, or None if it is missing or was built for a file
+    with a different size and modification time than Stamp"""
+
+    try:
+        with open(Sidecar, 'rb') as Connection:
+            Header = array.array('q')
+            Header.fromfile(Connection, 3)
+            if Header[:2] != Stamp:
+                return None
+            Arrays = []
+            for Position in range(3):
+                Values = array.array('q')
+                Values.fromfile(Connection, Header[2])
+                Arrays.append(Values)
+            return tuple(Arrays)
+    except (OSError, EOFError):
+        return None
+
+
+def WriteIndex(Sidecar, Stamp, Arrays):
+    """Writes the index arrays in parameter to the sidecar file, headed by the Stamp of the file they were built for"""
+
+    try:
+        with open(Sidecar + '.tmp', 'wb') as Connection:
+            (Stamp + array.array('q', [len(Arrays[0])])).tofile(Connection)
+            for Values in Arrays:
+                Values.tofile(Connection)
+        os.replace(Sidecar + '.tmp', Sidecar)
+    except OSError:
+        """The index still works from memory if the sidecar cannot be written"""
+        pass
+
+
+"""Dictionary storing a lock for each journal, held while it is appended to or replaced"""
+JournalLocks = {}
+
+"""Dictionary storing the parsed journal of each text file, so lookups only parse entries appended since the last"""
+Journals = {}
+
+
+class Replay:
+    """Creates the state of a journal parsed up to Offset: whether it clears its table, the records it changes and
+    the operations of an entry whose C line has not yet been read
+
+    The state is changed in place as entries are appended, so Lock is held while it is read or changed"""
+
+    def __init__(self, Identity, Width):
+        """Identity is the device and inode of the journal, Width the number of attributes identifying a record"""
+
+        self.Identity = Identity
+        self.Width = Width
+        self.Offset = 0
+        self.Tail = b''
+        self.Cleared = False
+        self.Changes = {}
+        self.Pending = None
+        self.Saved = None
+        self.Lock = threading.Lock()
+
+        """IDs of every record the journal changes in order, with their keys, kept sorted as records are added"""
+        self.IDs = array.array('q')
+        self.Keys = []
+
+    def Within(self, Low, High):
+        """Returns the records the journal inserts or updates with IDs from Low to High inclusive, called holding Lock"""
+
+        Records = (self.Changes[self.Keys[Position]] for Position in
+                   range(bisect.bisect_left(self.IDs, int(Low)), bisect.bisect_right(self.IDs, int(High))))
+        return [Record for Record in Records if Record is not None]
+
+    def Extend(self, Data):
+        """Parses the whole lines of Data, which follow Offset in the journal, called holding Lock"""
+
+        Added = []
+
+        """Operations are only applied once the C line ending their entry has been read"""
+        for Record in csv.reader(Data.decode().splitlines()):
+            if not Record:
+                continue
+            if Record[0] == 'B':
+                self.Pending = []
+            elif Record[0] == 'C' and self.Pending is not None:
+                for Operation in self.Pending:
+                    Key = tuple(Value.strip() for Value in Operation[1:self.Width + 1])
+                    if Operation[0] in ('Z', 'S'):
+                        self.Cleared = Operation[0] == 'Z'
+                        self.Changes.clear()
+                        self.IDs, self.Keys, Added = array.array('q'), [], []
+
+                        """S names the file written by a Save, which is read in place of the table's file"""
+                        if Operation[0] == 'S':
+                            self.Saved = Operation[1]
+                        continue
+                    if Key not in self.Changes:
+                        Added.append(Key)
+                    self.Changes[Key] = None if Operation[0] == 'D' else Operation[1:]
+                self.Pending = None
+            elif self.Pending is not None:
+                self.Pending.append(Record)
+        self.Place(Added)
+        self.Offset += len(Data)
+        self.Tail = (self.Tail + Data)[-64:]
+
+    def Place(self, Added):
+        """Adds the keys in parameter to the sorted IDs, each put in its place while there are few of them, otherwise
+        they are appended and sorted with the rest, which are already in order"""
+
+        if len(Added) <= 16:
+            for Key in Added:
+                Position = bisect.bisect_right(self.IDs, int(Key[0]))
+                self.IDs.insert(Position, int(Key[0]))
+                self.Keys.insert(Position, Key)
+            return
+        Order = sorted(itertools.chain(zip(self.IDs, self.Keys), ((int(Key[0]), Key) for Key in Added)),
+                       key=lambda Pair: Pair[0])
+        self.IDs = array.array('q', (ID for ID, Key in Order))
+        self.Keys = [Key for ID, Key in Order]
+
+
+"""Journals currently being compacted in the background"""
+Compacting = set()
+
+
+class Leases:
+    """Creates a bounded pool of connections made by Factory, lending each thread which uses the database a connection
+    of its own until its outermost statement, transaction or stream is finished. Statements and transactions of
+    different threads then never share a connection, while idle threads hold none, and a result-set can still be read
+    after the statement which made it returns
+
+    Used as the Guard of a remote connection, so the connection of the thread is checked before each use"""
+
+    def __init__(self, Factory, Size=4, Retries=3, Delay=0.5, Idle=30, Timeout=30, Lost=(), Ping=None):
+        """At most Size connections are open, a thread waits up to Timeout seconds for one to be returned. A failed
+        connection is tried Retries times, waiting Delay seconds then twice as long each time
+
+        A connection unused for Idle seconds is pinged before it is used. Lost is the tuple of exceptions meaning the
+        connection has been lost, it is then closed and made again when next used"""
+
+        self.Factory = Factory
+        self.Size = Size
+        self.Retries = Retries
+        self.Delay = Delay
+        self.Idle = Idle
+        self.Timeout = Timeout
+        self.Lost = Lost
+        self.Ping = Ping or (lambda Connection: Connection.ping(reconnect=False))
+
+        """Connections returned with when they were last used, ready to be lent again, and every loan made"""
+        self.Free = []
+        self.Loans = weakref.WeakSet()
+        self.Slots = threading.BoundedSemaphore(Size)
+        self.Lock = threading.Lock()
+        self.Local = threading.local()
+
+    def __enter__(self):
+        """Checks the connection of the thread when it starts using the database rather than for every statement"""
+
+        Loan = self.Lent()
+        if Loan.Depth == 0:
+            self.Check(Loan)
+        Loan.Depth += 1
+        return Loan
+
+    def __exit__(self, Kind, Error, Traceback):
+        """Closes the connection of the thread if the error raised while using it means it has been lost, and returns
+        it to the pool once the thread has finished using the database"""
+
+        Loan = self.Local.Loan
+        Loan.Depth -= 1
+        Loan.Held[1] = time.monotonic()
+        if isinstance(Error, self.Lost):
+            self.Discard(Loan)
+        if not Loan.Depth:
+            del self.Local.Loan
+            Loan.Returned()
+        return False
+
+    def Lent(self):
+        """Returns the loan of the thread, lending it a connection slot first if it has none"""
+
+        Current = getattr(self.Local, 'Loan', None)
+        if Current is None:
+            if not self.Slots.acquire(timeout=self.Timeout):
+                raise ConnectionError('All ' + str(self.Size) + ' remote database connections are in use')
+            with self.Lock:
+                Current = Loan(*(self.Free.pop() if self.Free else (None, time.monotonic())))
+                self.Loans.add(Current)
+
+            """The connection is returned to the pool when the thread finishes using it, or once the thread has ended
+            and its loan is collected if it used the connection outside a statement"""
+            Current.Returned = weakref.finalize(Current, self.Return, Current.Held)
+            self.Local.Loan = Current
+        return Current
+
+    def Connection(self):
+        """Returns the connection lent to the thread, connecting first if it has none"""
+
+        Loan = self.Lent()
+        if Loan.Held[0] is None:
+            Loan.Held[0] = self.Connect()
+            Loan.Held[1] = time.monotonic()
+        return Loan.Held[0]
+
+    def Cursor(self, View):
+        """Returns the cursor of the view in parameter on the connection lent to the thread"""
+
+        Connection = self.Connection()
+        Loan = self.Local.Loan
+        if View not in Loan.Cursors:
+            Loan.Cursors[View] = Connection.cursor()
+        return Loan.Cursors[View]
+
+    def Check(self, Loan):
+        """Makes sure the connection of the loan in parameter is still open, pinging it if unused for a while"""
+
+        if Loan.Held[0] is not None and time.monotonic() - Loan.Held[1] > self.Idle:
+            try:
+                self.Ping(Loan.Held[0])
+            except Exception:
+                self.Discard(Loan)
+        self.Connection()
+
+    def Connect(self):
+        """Returns a new connection, trying again with a growing delay if it fails, raises ConnectionError once every
+        attempt has failed"""
+
+        for Attempt in range(self.Retries):
+            try:
+                return self.Factory()
+            except Exception as E:
+                Error = E
+                if Attempt < self.Retries - 1:
+                    time.sleep(min(self.Delay * 2 ** Attempt, 10))
+        raise ConnectionError('Could not connect to remote database, check remote database settings: ' + str(Error))
+
+    def Discard(self, Loan):
+        """Closes the connection of the loan in parameter, a new one is made when the thread next uses the database"""
+
+        Connection, Loan.Held[0] = Loan.Held[0], None
+        Loan.Cursors = weakref.WeakKeyDictionary()
+        Loan.Begun = False
+        if Connection is not None:
+            try:
+                Connection.close()
+            except Exception:
+                pass
+
+    def Return(self, Held):
+        """Called once a thread has finished with its connection so it can be lent to another thread"""
+
+        with self.Lock:
+            if Held[0] is not None:
+                self.Free.append((Held[0], Held[1]))
+                Held[0] = None
+        self.Slots.release()
+
+    def Close(self):
+        """Closes every connection of the pool, those lent to threads are made again if they are used"""
+
+        with self.Lock:
+            Loans = list(self.Loans)
+            Free, self.Free = self.Free, []
+        for Loan in Loans:
+            self.Discard(Loan)
+        for Connection, Used in Free:
+            try:
+                Connection.close()
+            except Exception:
+                pass
+
+
+class Loan:
+    """Creates the record of the connection lent to one thread with when it was last used, the cursor of each view
+    using it and whether a transaction has begun on it"""
+
+    def __init__(self, Connection, Used):
+        """Held is a list so the pool can still return the connection once the loan itself has been collected"""
+
+        self.Held = [Connection, Used]
+        self.Cursors = weakref.WeakKeyDictionary()
+        self.Depth = 0
+        self.Begun = False
+        self.Returned = None
+
+
+def JournalLock(Path):
+    """Returns the lock of the journal or other rewritten file at the path in parameter"""
+
+    return JournalLocks.setdefault(os.path.abspath(Path), threading.RLock())
+
+
+def Compact(Connection, Table):
+    """Starts compacting the journal of the table in parameter on a background thread unless it already is"""
+
+    Path = os.path.abspath(Connection.JournalPath(Table))
+    if Path in Compacting:
+        return
+    Compacting.add(Path)
+
+    def Run():
+        try:
+            Connection.Compact(Table)
+        finally:
+            Compacting.discard(Path)
+
+    threading.Thread(target=Run, daemon=True).start()
+
+
+def Needed(Lines):
+    """Returns a dictionary of the total quantity of each Item ID in the order lines or hold records in parameter"""
+
+    Totals = {}
+    for Line in Lines:
+        Totals[int(Line[1])] = Totals.get(int(Line[1]), 0) + int(Line[2])
+    return Totals
+
+
+def Replace(Path, Data):
+    """Replaces the file at the path in parameter with one holding the bytes of Data, written and synced to a
+    temporary file first so a crash leaves either the old file or the new one"""
+
+    with open(Path + '.tmp', 'wb') as Connection:
+        Connection.write(Data)
+        Connection.flush()
+        os.fsync(Connection.fileno())
+    os.replace(Path + '.tmp', Path)
+
+
+def Batches(Rows, Size):
+    """Yields lists of at most Size rows from the iterable in parameter without reading it all into memory"""
+
+    Rows = iter(Rows)
+    Batch = list(itertools.islice(Rows, Size))
+    while Batch:
+        yield Batch
+        Batch = list(itertools.islice(Rows, Size))
+
+
+class Pool:
+    """Keeps one long-lived connection to the configured backend and hands out table-scoped views of it"""
+
+    def __init__(self):
+        """Starts without a connection, the first request will establish one"""
+
+        self.Key = None
+        self.Connection = None
+
+        """Held while the connection is checked or replaced, as worker threads may request views at the same time"""
+        self.Lock = threading.RLock()
+
+    def Configuration(self):
+        """Returns a tuple identifying the configured backend, used to detect when the settings have changed"""
+
+        Configuration = settings.Connect()
+        DatabaseType = Configuration.GetValue('DATABASE', 'TYPE')
+        if DatabaseType == Type.Remote.name:
+            return (Type.Remote,
+                    Configuration.GetValue('REMOTE', 'HOST'),
+                    Configuration.GetValue('REMOTE', 'USERNAME'),
+                    Configuration.GetValue('REMOTE', 'PASSWORD'),
+                    Configuration.GetValue('REMOTE', 'DATABASE', 'impact'),
+                    Configuration.GetValue('REMOTE', 'PORT', '3306'))
+        elif DatabaseType == Type.Text.name:
+            return (Type.Text,)
+        else:
+            return (Type.Local, Configuration.GetValue('LOCAL', 'PATH'))
+
+    def Open(self, Key):
+        """Returns a new connection to the backend described by the Key tuple in parameter"""
+
+        if Key[0] == Type.Remote:
+            Connection = Remote(Key[1], Key[2], Key[3], Key[4], Port=Key[5])
+        elif Key[0] == Type.Text:
+            Connection = Text()
+        else:
+            Connection = Local(Key[1])
+
+        """Applies the configured number of rows sent per statement during bulk writes"""
+        Connection.BatchSize = int(settings.Connect().GetValue('DATABASE', 'BATCH', Connection.BatchSize))
+
+        """Applies the configured number of rows the read cache may hold across all tables"""
+        Reads.Limit = int(settings.Connect().GetValue('DATABASE', 'CACHE', Reads.Limit))
+
+        """Brings the schema of the backend up to date before it is used, imported here as it uses this module"""
+        from src import migrations
+        migrations.Migrate(Connection)
+        return Connection
+
+    def Get(self, Table):
+        """Returns a view of the pooled connection for the table in parameter, reconnecting if the backend changed"""
+
+        Key = self.Configuration()
+        with self.Lock:
+            if Key != self.Key:
+                self.Close()
+                self.Connection = self.Open(Key)
+                self.Key = Key
+            return self.Connection.View(Table)
+
+    def Close(self):
+        """Closes the pooled connection, the next request will establish a new one"""
+
+        with self.Lock:
+            if self.Connection:
+                self.Connection.Close()
+            self.Connection = None
+            self.Key = None
+
+        """Reads cached from the old backend must not be served for the new one"""
+        Reads.Clear()
+
+
+"""Application-wide pool shared by every interface"""
+Connections = Pool()
+
+
 def Connect(Table):
     """Returns the relevant database connection depending on chosen configuration"""
 
-    DatabaseType = settings.Connect().GetValue('DATABASE', 'TYPE')
-    if DatabaseType == Type.Remote.name:
-        return Remote(settings.Connect().GetValue('REMOTE', 'HOST'),
-                      settings.Connect().GetValue('REMOTE', 'USERNAME'),
-                      settings.Connect().GetValue('REMOTE', 'PASSWORD'),
-                      'impact', Table)
-    elif DatabaseType == Type.Text.name:
-        return Text(Table)
-    else:
-        return Local(settings.Connect().GetValue('LOCAL', 'PATH'), Table)
+    return Connections.Get(Table)
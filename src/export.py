@@ -0,0 +1,240 @@
+import csv
+import datetime
+import functools
+import gzip
+from tkinter import filedialog as dialog
+from tkinter import messagebox as message
+
+from src import database
+from src.utils import ProgressWindow
+
+"""Views which can be exported, each table as it is stored and every order line joined with its order and item"""
+Views = ('Inventory', 'Customers', 'Orders', 'OrdersItem', 'OrderLines')
+
+"""Header row written before each joined view, tables are written without one so they can be imported again"""
+Headers = {'OrderLines': ['OrderID', 'Date', 'CustomerID', 'ItemID', 'Name', 'Price', 'Quantity', 'Net']}
+
+"""Statements reading each view from a SQL database, views of order lines carry the date of their order to filter by"""
+Statements = {
+    'Inventory': 'SELECT * FROM Inventory',
+    'Customers': 'SELECT * FROM Customers',
+    'Orders': 'SELECT * FROM Orders',
+    'OrdersItem': 'SELECT OrdersItem.OrderID, OrdersItem.ItemID, OrdersItem.Quantity, Orders.Date FROM OrdersItem '
+                  'INNER JOIN Orders ON OrdersItem.OrderID = Orders.OrderID',
+    'OrderLines': 'SELECT Orders.OrderID, Orders.Date, Orders.CustomerID, OrdersItem.ItemID, Inventory.Name, '
+                  'Inventory.Price, OrdersItem.Quantity FROM OrdersItem '
+                  'INNER JOIN Orders ON OrdersItem.OrderID = Orders.OrderID '
+                  'LEFT JOIN Inventory ON OrdersItem.ItemID = Inventory.ItemID'}
+
+"""Number of items whose name and price are kept while joining order lines read from the text database"""
+Items = 4096
+
+
+def Export(View, Path, Start=None, End=None, Compress=False, Progress=None):
+    """Writes every record of the view in parameter to the csv file at Path as it is read, never holding the view
+
+    Orders and order lines can be limited to orders dated from Start to End inclusive, either may be None. The file
+    is gzipped when Compress is set or Path ends with .gz. Progress is called with the number of records read from
+    the view's table after each batch, returns the number of records written"""
+
+    if View not in Views:
+        raise ValueError('Cannot export ' + str(View))
+    Start, End = Parse(Start), Parse(End)
+    if Start and End and Start > End:
+        raise ValueError('The start date must not be after the end date')
+
+    if Compress or Path.endswith('.gz'):
+        File = gzip.open(Path, 'wt', newline='')
+    else:
+        File = open(Path, 'w', newline='')
+    Count = 0
+    with File:
+        Writer = csv.writer(File)
+        if View in Headers:
+            Writer.writerow(Headers[View])
+        Read = Reader(View, Start, End)
+        for Batch in database.Batches(Read, database.Connect(Table(View)).BatchSize):
+            Rows = [Row for Row in Batch if Row is not None]
+            Writer.writerows(Rows)
+            Count += len(Rows)
+            if Progress:
+                Progress(Read.Count)
+    return Count
+
+
+def ExportView(Master, View, Name, Start=None, End=None, Done=None):
+    """Called by the Export buttons, prompts for the file the view in parameter is exported to then exports it on the
+    Worker of the Master interface while showing its progress, the file is gzipped if its name ends with .gz
+
+    Done is called once the export has been made"""
+
+    Path = dialog.asksaveasfilename(parent=Master, title='Export file', defaultextension='.csv',
+                                    initialfile=Name + '.csv',
+                                    filetypes=[('CSV file', '.csv'), ('Compressed CSV file', '.csv.gz')])
+    if not Path:
+        return
+    Progress = ProgressWindow(Master, 'Export', 1)
+
+    def Run():
+        """Counts the records to be read then writes the file, run on a worker thread"""
+
+        Master.Worker.Post(Progress.Expect, Size(View))
+        return Export(View, Path, Start, End, Progress=lambda Read: Master.Worker.Post(
+            Progress.Update, Read, 'Read ' + str(Read) + ' records'))
+
+    def Exported(Count):
+        """Called on the interface's thread with the number of records written"""
+
+        Progress.destroy()
+        message.showinfo('Export', 'Successfully exported ' + str(Count) + ' records to ' + Path, parent=Master)
+        if Done:
+            Done()
+
+    def Failed(Error):
+        """Called on the interface's thread if the file could not be written"""
+
+        Progress.destroy()
+        message.showerror('Error', 'Error whilst exporting: ' + str(Error), parent=Master)
+
+    Master.Worker.Submit(Run, Exported, Failed)
+
+
+def Table(View):
+    """Returns the table whose records are read one at a time to make the view in parameter"""
+
+    return 'OrdersItem' if View == 'OrderLines' else View
+
+
+def Size(View):
+    """Returns the number of records of the table read to make the view in parameter, used to show progress"""
+
+    return int(database.Connect(Table(View)).Count(Table(View)))
+
+
+def Parse(Date):
+    """Returns the D/M/YYYY date in parameter as a date, or None if it is empty or cannot be read"""
+
+    if isinstance(Date, datetime.date) or Date is None:
+        return Date
+    try:
+        return datetime.datetime.strptime(str(Date).strip(), '%d/%m/%Y').date()
+    except ValueError:
+        return None
+
+
+def Within(Date, Start, End):
+    """Returns whether the D/M/YYYY date in parameter falls from Start to End, always True when neither is given"""
+
+    if Start is None and End is None:
+        return True
+    Date = Parse(Date)
+    return Date is not None and (Start is None or Date >= Start) and (End is None or Date <= End)
+
+
+class Reader:
+    """Creates an iterator over the records of a view counting the records read, records which do not fall within the
+    dates are given as None so progress is still reported while long runs of them are skipped"""
+
+    def __init__(self, View, Start, End):
+        """Start and End limit orders and order lines to orders made within those dates"""
+
+        self.View = View
+        self.Start = Start
+        self.End = End
+        self.Count = 0
+
+    def __iter__(self):
+        """Reads from the configured backend, the text database joins the files itself as it has no server"""
+
+        Connection = database.Connect(Table(self.View))
+        Rows = self.Text(Connection) if Connection.Type == database.Type.Text else self.SQL(Connection)
+        for Row in Rows:
+            self.Count += 1
+            yield Row
+
+    def SQL(self, Connection):
+        """Yields each row of the view streamed from the database, lines without an order are left out by the join
+
+        Dates are stored as D/M/YYYY text, so a remote database filters them by parsing each one while the others are
+        filtered as they are read. Rows are still checked once read, so both give the same records"""
+
+        Filter = self.Start is not None or self.End is not None
+        Statement = Statements[self.View]
+        Parameters = None
+        if self.View == 'OrdersItem' and not Filter:
+            Statement = 'SELECT * FROM OrdersItem'
+        elif Filter and self.View not in ('Inventory', 'Customers') and Connection.Type == database.Type.Remote:
+            Conditions, Parameters = [], []
+            for Bound, Operator in ((self.Start, ' >= '), (self.End, ' <= ')):
+                if Bound is not None:
+                    Conditions.append("STR_TO_DATE(Orders.Date, '%%d/%%m/%%Y')" + Operator + '%s')
+                    Parameters.append(Bound.isoformat())
+            Statement += ' WHERE ' + ' AND '.join(Conditions)
+        for Row in Connection.Stream(Statement, Parameters):
+            Row = list(Row)
+            if self.View == 'Orders' and not Within(Row[1], self.Start, self.End):
+                yield None
+            elif self.View == 'OrdersItem' and Filter:
+                yield Row[:3] if Within(Row[3], self.Start, self.End) else None
+            elif self.View == 'OrderLines':
+                yield self.Line(Row) if Within(Row[1], self.Start, self.End) else None
+            else:
+                yield Row
+
+    def Text(self, Connection):
+        """Yields each record of the view read from the text files, joining each order line to its order and item as
+        it is read, so at most one order and the Items most recently joined are held however large the files are"""
+
+        if self.View in ('Inventory', 'Customers') or (self.View == 'OrdersItem' and
+                                                      self.Start is None and self.End is None):
+            yield from Connection.Rows(self.View)
+            return
+        if self.View == 'Orders':
+            for Record in Connection.Rows('Orders'):
+                yield Record if Within(Record[1], self.Start, self.End) else None
+            return
+
+        Orders = Connection.Rows('Orders')
+        Current = next(Orders, None)
+
+        def Order(OrderID):
+            """Returns the order with the ID in parameter, or None if there is none. Order lines are normally in order
+            of OrderID like the orders, so the orders are read alongside them, those out of step are looked up"""
+
+            nonlocal Current
+            while Current is not None and int(Current[0]) < OrderID:
+                Current = next(Orders, None)
+            if Current is not None and int(Current[0]) == OrderID:
+                return Current
+            Found = Connection.Lookup('Orders', OrderID)
+            return Found[0] if Found else None
+
+        @functools.lru_cache(maxsize=Items)
+        def Item(ItemID):
+            """Returns the name and price of the item with the ID in parameter, both None if there is no such item"""
+
+            Found = Connection.Lookup('Inventory', ItemID)
+            if not Found:
+                return None, None
+            Record = database.Typed('Inventory', Found[0])
+            return Record[3], Record[4]
+
+        try:
+            for Record in Connection.Rows('OrdersItem'):
+                Found = Order(int(Record[0]))
+                if Found is None or not Within(Found[1], self.Start, self.End):
+                    yield None
+                elif self.View == 'OrdersItem':
+                    yield Record
+                else:
+                    Name, Price = Item(int(Record[1]))
+                    yield self.Line([Found[0], Found[1], Found[2], Record[1], Name, Price, Record[2]])
+        finally:
+            Orders.close()
+
+    @staticmethod
+    def Line(Row):
+        """Returns the joined order line in parameter with its net value, empty when the item no longer exists"""
+
+        Price, Quantity = Row[5], int(Row[6])
+        return Row + ['' if Price is None else round(float(Price) * Quantity, 2)]
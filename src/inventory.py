@@ -6,6 +6,11 @@ from tkinter import messagebox as message
 from tkinter.ttk import *
 
 from src import database
+from src import export
+from src import repository
+from src import search
+from src import sequences
+from src import workers
 from src.utils import *
 
 
@@ -31,6 +36,53 @@ class Item:
         return int(self.ItemID)
 
 
+class ItemReader:
+    """Creates an iterable giving an Item for each valid record of an open csv file, one record at a time"""
+
+    def __init__(self, File, Errors):
+        """Records which are not valid are written using the Errors csv writer with their line number and the error"""
+
+        self.File = File
+        self.Errors = Errors
+
+        """Number of characters read so far, with the numbers of records accepted and rejected"""
+        self.Position = 0
+        self.Accepted = 0
+        self.Rejected = 0
+
+    def Lines(self):
+        """Yields each line of the file, counting the characters read"""
+
+        for Line in self.File:
+            self.Position += len(Line)
+            yield Line
+
+    def __iter__(self):
+        """Yields an Item for each record which can be made into one"""
+
+        Reader = csv.reader(self.Lines())
+        for Record in Reader:
+            if not Record:
+                continue
+            try:
+                if len(Record) < 6:
+                    raise ValueError('expected 6 attributes but found ' + str(len(Record)))
+                ImportItem = Item(int(Record[0]), str(Record[1]), str(Record[2]), str(Record[3]), float(Record[4]),
+                                  int(Record[5]))
+            except ValueError as E:
+                self.Rejected += 1
+                self.Errors.writerow([Reader.line_num, str(E)] + Record)
+                continue
+            self.Accepted += 1
+            yield ImportItem
+
+
+def CreateItem(Record):
+    """Returns a new Item object using the attributes of a row read from the database"""
+
+    return Item(Record[0], Record[1], Record[2], Record[3], Record[4], Record[5])
+
+
 class InventoryManager(Toplevel):
     """Creates an instance of the InventoryManager interface as a subclass of the Tkinter Toplevel widget"""
 
@@ -46,24 +98,30 @@ class InventoryManager(Toplevel):
         """Sets application title"""
         self.title('Inventory Management')
 
-        """Calls class defined functions to connect to database, set up interface and inventory items"""
-        self.LoadDatabase()
+        """Runs the database work of the interface on worker threads, the inventory is empty until it has been read"""
+        self.Worker = workers.Worker(self)
+        self.Inventory = database.Records()
+
+        """Calls class defined functions to set up interface then connect to database to load the inventory items"""
         self.LoadInterface()
-        self.LoadInventory(self.Inventory)
+        self.LoadDatabase()
 
         """Starts the main loop for the application"""
         self.mainloop()
 
     def LoadDatabase(self):
-        """Called to create connection to Database type specified in the configuration file and reads data"""
+        """Called to get the inventory from the shared repository, which reads the database only once
+
+        The inventory is read on a worker thread and loaded once it arrives, replacing any earlier read still running"""
 
-        self.Inventory = []
+        """Creates Item object for each row found in Database, shared with every other open interface"""
+        self.Worker.Submit(lambda: repository.Shared.Load('Inventory', CreateItem), self.InventoryLoaded, Key='Load')
 
-        """Creates Item object for each row found in Database and places object in new Inventory array"""
-        Records = database.Connect('Inventory').Read()
-        for Record in Records:
-            NewItem = Item(Record[0], Record[1], Record[2], Record[3], Record[4], Record[5])
-            self.Inventory.append(NewItem)
+    def InventoryLoaded(self, Data):
+        """Called on the interface's thread with the inventory once it has been read"""
+
+        self.Inventory = Data
+        self.LoadInventory(self.Inventory)
 
     def LoadInterface(self):
         """Called to set up the core interface widgets for the application"""
@@ -159,10 +217,10 @@ class InventoryManager(Toplevel):
         self.BottomFrame = LabelFrame(self, text='Inventory')
         self.BottomFrame.pack(fill=BOTH, expand=TRUE)
 
-        """Creates and packs Treeview widget onto the BottomFrame frame, binds functions and hides headings"""
-        self.InventoryTreeview = Treeview(self.BottomFrame, height=19)
+        """Creates and packs a virtual Treeview widget onto the BottomFrame frame, binds functions and hides headings"""
+        self.InventoryTreeview = VirtualTreeview(self.BottomFrame, height=19)
         self.InventoryTreeview.pack(side=LEFT, expand=TRUE, fill=BOTH)
-        self.InventoryTreeview.bind('<<TreeviewSelect>>', self.LoadItemAttributes)
+        self.InventoryTreeview.bind('<<RecordSelect>>', self.LoadItemAttributes)
         self.InventoryTreeview.bind('<Button-1>', self.ClickTree)
         self.InventoryTreeview['show'] = 'headings'
 
@@ -181,36 +239,37 @@ class InventoryManager(Toplevel):
             self.InventoryTreeview.heading(self.Attributes[self.Headers.index(Header)], text=Header, anchor=W)
             self.InventoryTreeview.column(self.Attributes[self.Headers.index(Header)], width=135, minwidth=135)
 
+        """Creates the sort engine used when a Treeview header is clicked"""
+        self.Sorter = Sorter()
+
         """Used to place the window at the center of the screen"""
         ConfigureInterface(self)
 
     def LoadInventory(self, Data):
         """Called to load the Treeview widget with the data in list specified in the parameter"""
 
-        """Calls function to remote all of the items already existing in the Treeview widget"""
-        self.ResetInventory()
+        """Only the rows in view are made, their values are swapped in as the Treeview is scrolled"""
+        self.InventoryTreeview.Load(Data)
 
-        """Inserts a new item at index i with values specified as long as there is an item in the Data parameter"""
-        if Data:
-            i = 0
-            for Record in Data:
-                self.InventoryTreeview.insert('', END, text=i, values=(Record.GetAttributes()))
-                i += 1
-
-            """Sets the current selected item as the first value which will also trigger the TreeviewSelect function"""
-            self.InventoryTreeview.selection_set(self.InventoryTreeview.get_children()[0])
+        """Selects the first item which will also trigger the RecordSelect function"""
+        self.InventoryTreeview.Select(0)
 
     def SaveInventory(self, Data):
         """Called to save the data stored in the class defined Data list in the database"""
 
-        database.Connect('Inventory').Save(Data)
+        """Only the records changed since the last save are written, unless a plain list replaces the whole table
+
+        The changes are taken straight away then written on the worker thread, in the order the saves were made"""
+        if isinstance(Data, database.Records):
+            Changes = repository.Shared.Changes('Inventory', Data)
+            self.Worker.Submit(lambda: repository.Shared.Write('Inventory', Changes), Write=True)
+        else:
+            self.Worker.Submit(lambda: database.Connect('Inventory').Save(Data), Write=True)
 
     def ResetInventory(self):
         """Called to remove all the items already stored inside the Treeview widget"""
 
-        self.InventoryTreeviewChildren = self.InventoryTreeview.get_children()
-        for Child in self.InventoryTreeviewChildren:
-            self.InventoryTreeview.delete(Child)
+        self.InventoryTreeview.Load([])
 
     def ClickTree(self, Event):
         """Called to change the Treeview to a different sort type, activated by clicking header using Event parameter"""
@@ -218,16 +277,15 @@ class InventoryManager(Toplevel):
         """Function is called for every click on Treeview so checks whether click region is header"""
         self.ClickedRegion = self.InventoryTreeview.identify('region', Event.x, Event.y)
         if self.ClickedRegion == 'heading':
-            """Calls function to load the inventory with a sorted list"""
-            self.LoadInventory(SortTree(Event, self.InventoryTreeview, self.Inventory))
+            """Sorts by the clicked column, or reverses it if clicked again, then loads the inventory with the sorted list"""
+            self.Sorter.Click(ColumnIndex(Event, self.InventoryTreeview))
+            self.Sorter.Indicate(self.InventoryTreeview, self.Headers)
+            self.LoadInventory(self.Sorter.Sort(self.Inventory))
 
     def GetSelectedItem(self):
         """Returns the values for the item dictionary which is currently selected in the Treeview"""
 
-        self.Selected = self.InventoryTreeview.selection()
-        for Item in self.Selected:
-            self.SelectedIndex = self.InventoryTreeview.item(Item)
-            self.SelectedRecord = self.SelectedIndex['values']
+        self.SelectedRecord = self.InventoryTreeview.SelectedValues()
         return self.SelectedRecord
 
     def LoadItemAttributes(self, Event):
@@ -266,13 +324,12 @@ class InventoryManager(Toplevel):
             self.SelectedID = self.GetSelectedItem()[0]
 
             """Changes the Item identified by the ID attribute to the new NewItem object"""
-            for DataItem in self.Inventory:
-                if DataItem.GetAttributes()[0] == self.SelectedID:
-                    self.Inventory[self.Inventory.index(DataItem)] = self.NewItem
+            DataItem = self.Inventory.Get(self.SelectedID)
+            if DataItem:
+                self.Inventory[self.Inventory.Position(DataItem)] = self.NewItem
 
-            """Edits the same item which is stored in the Treeview to the same values"""
-            for Entry in self.Entries:
-                self.InventoryTreeview.set(self.Selected[0], column=self.Entries.index(Entry), value=Entry.get())
+            """Replaces the same item which is shown in the Treeview with the new object"""
+            self.InventoryTreeview.Replace(self.NewItem)
 
             """Calls the class defined method to save inventory Data now that an item has been edited"""
             self.SaveInventory(self.Inventory)
@@ -295,23 +352,13 @@ class InventoryManager(Toplevel):
         self.Query = self.SearchEntry.get()
         self.Attribute = self.SearchVariable.get()
 
-        """Creates a new array to store the results of the search attempt"""
-        self.Results = []
-
-        """Definite iteration checking each item in the Data array with input specified in the Entry and OptionsMenu"""
-        for DataItem in self.Inventory:
-            if str(self.Query).lower() in \
-                    str(DataItem.GetAttributes()[(self.SearchOptions.index(self.Attribute))]).lower():
-                """Append the Item object to the results array if the condition is met"""
-                self.Results.append(DataItem)
+        """Uses the shared search index to find matches for the query, kept in the current sort order"""
+        Index = search.Shared(self.Inventory)
+        self.Results = self.Sorter.Sort(Index.Find(self.SearchOptions.index(self.Attribute), self.Query))
 
-        """Calls the function to load the Treeview widget with the Results list"""
+        """Calls the function to load the Treeview widget with the Results list, selecting the first result"""
         self.LoadInventory(self.Results)
 
-        """As long as there is at least one result, set the first option in the Treeview widget"""
-        if self.Results:
-            self.InventoryTreeview.selection_set(self.InventoryTreeview.get_children()[0])
-
     def DeleteItem(self):
         """Called when the Remove button is pressed, used to remove the selected item from the inventory"""
 
@@ -322,19 +369,19 @@ class InventoryManager(Toplevel):
         Confirm = message.askquestion('Remove', 'Remove item from inventory?', icon='warning', parent=self)
         if Confirm == message.YES:
 
-            """Definite iteration through inventory Data looking for selected item"""
-            for DataItem in self.Inventory:
-                if int(DataItem.ItemID) == int(self.SelectedRecord[0]):
-                    """Removes item from Data list as well as Treeview when match is found"""
-                    self.Inventory.remove(DataItem)
-                    self.InventoryTreeview.delete(self.Selected[0])
+            """Looks up the selected item by its ID"""
+            DataItem = self.Inventory.Get(self.SelectedRecord[0])
+            if DataItem:
+                """Removes item from Data list as well as Treeview when found"""
+                self.Inventory.remove(DataItem)
+                self.InventoryTreeview.Forget(DataItem)
+                sequences.Release('Inventory', DataItem.ItemID)
 
             """Calls the class defined method to save inventory Data now that an item has been removed"""
             self.SaveInventory(self.Inventory)
 
             """As long as there is at least one result, set the first option in the Treeview widget"""
-            if self.Inventory:
-                self.InventoryTreeview.selection_set(self.InventoryTreeview.get_children()[0])
+            self.InventoryTreeview.Select(0)
 
     def RefreshItems(self):
         """Called when the Refresh button is pressed, used to save and refresh the inventory"""
@@ -343,74 +390,67 @@ class InventoryManager(Toplevel):
         self.LoadInventory(self.Inventory)
 
     def ImportItems(self, *Event):
-        """Called when the Import button is pressed, allows user to import a .csv file as the inventory list"""
+        """Called when the Import button is pressed, allows user to import a .csv file as the inventory list
 
-        """Will attempt to read selected import file, returns error if not possible"""
-        try:
+        The file is read, checked and saved a batch at a time so any size of file can be imported, records which are
+        not valid are skipped and written to an errors file beside it"""
 
-            """User to prompted for csv file to import"""
-            File = dialog.askopenfile(mode='r+', title='Import file', parent=self, defaultextension='.csv',
-                                      filetypes=[('CSV file', '.csv'), ('Text file', '.txt')])
-
-            """Creates instance to read specified csv file"""
-            Reader = csv.reader(File)
-
-            """Creates new array to store records found in csv file"""
-            ImportedItems = []
-
-            """Iteration through csv file which creates an Item object for each record then appends it to new array"""
-            for Record in Reader:
-                if Record:
-                    try:
-                        ImportItem = Item(int(Record[0]), str(Record[1]), str(Record[2]), str(Record[3]),
-                                          float(Record[4]), int(Record[5]))
-                        ImportedItems.append(ImportItem)
-                    except ValueError as E:
-                        message.showerror('Error', 'Error whilst importing: ' + str(E), parent=self)
-                        return
-
-            """User is prompted to confirm whether they wish to replace existing inventory"""
-            Confirm = message.askquestion('Confirm', 'Old list will be wiped and replaced with new list, are you sure?',
-                                          icon='warning', parent=self)
-
-            """If user selects YES, existing inventory will be replaced and message will be displayed"""
-            if Confirm == message.YES:
-                self.Inventory = ImportedItems
-                message.showinfo('Import', 'Successfully imported ' + File.name, parent=self)
-        except (ValueError, TypeError, FileNotFoundError) as E:
-            message.showerror('Error', 'Error whilst importing: ' + str(E), parent=self)
-        finally:
-
-            """Will finally call RefreshItems function which saves and loads the inventory list"""
-            self.RefreshItems()
+        """User to prompted for csv file to import"""
+        File = dialog.askopenfile(mode='r', title='Import file', parent=self, defaultextension='.csv',
+                                  filetypes=[('CSV file', '.csv'), ('Text file', '.txt')])
+        if not File:
+            return
 
-    def ExportItems(self):
-        """Called when the Export button is pressed, allows user to export the inventory to .csv file"""
+        """User is prompted to confirm whether they wish to replace existing inventory"""
+        Confirm = message.askquestion('Confirm', 'Old list will be wiped and replaced with new list, are you sure?',
+                                      icon='warning', parent=self)
+        if Confirm != message.YES:
+            File.close()
+            return
 
-        """Will attempt to write data to exported file, returns error if not possible"""
-        try:
+        Progress = ProgressWindow(self, 'Import', os.path.getsize(File.name))
+        ErrorPath = os.path.splitext(File.name)[0] + '.errors.csv'
 
-            """User to prompted for destination and file name to save the exported file"""
-            File = dialog.asksaveasfile(parent=self, mode='w', defaultextension='.csv',
-                                        initialfile='inventory.csv', title='Export file')
+        def Import():
+            """Existing inventory is replaced inside a single transaction as the records are read, on a worker thread
+            so the interface keeps responding, progress is shown on the interface's thread"""
 
-            """Creates instance to write csv file at specified location"""
-            Writer = csv.writer(File)
+            with File, open(ErrorPath, 'w', newline='') as ErrorFile:
+                Reader = ItemReader(File, csv.writer(ErrorFile))
+                database.Connect('Inventory').Save(Reader, lambda Count: self.Worker.Post(
+                    Progress.Update, Reader.Position,
+                    'Imported ' + str(Count) + ' items, ' + str(Reader.Rejected) + ' skipped'))
+            return Reader
 
-            """Writes the attributes of each Item in the inventory to the csv file specified if Data exists"""
-            if self.Inventory:
-                for DataItem in self.Inventory:
-                    Writer.writerow(DataItem.GetAttributes())
+        self.Worker.Submit(Import, lambda Reader: self.ItemsImported(Progress, File.name, ErrorPath, Reader),
+                           lambda E: self.ItemsImported(Progress, File.name, ErrorPath, None, E), Write=True)
 
-            """Close the file instance created previously"""
-            File.close()
+    def ItemsImported(self, Progress, Name, ErrorPath, Reader, Error=None):
+        """Called once an import has finished, or failed with Error, to report the number of items imported"""
+
+        Progress.destroy()
 
-            """User is prompted whether they wish to open the created file and will do so if user selects YES"""
-            Confirm = message.askquestion('Open file', 'Open ' + File.name + ' in notepad?', parent=self)
-            if Confirm == message.YES:
-                os.system('notepad.exe ' + File.name)
-        except TypeError as E:
-            message.showerror('Error', 'Error whilst exporting: ' + str(E), parent=self)
+        """Loads the inventory as it now is, unchanged if the import failed"""
+        self.LoadDatabase()
+        if Error is not None:
+            message.showerror('Error', 'Error whilst importing: ' + str(Error), parent=self)
+            return
+
+        """Reports the number of items imported and where any records which were skipped can be found"""
+        Result = 'Successfully imported ' + str(Reader.Accepted) + ' items from ' + Name
+        if Reader.Rejected:
+            Result += '\n' + str(Reader.Rejected) + ' records were not valid and have been written to ' + ErrorPath
+        else:
+            os.remove(ErrorPath)
+        message.showinfo('Import', Result, parent=self)
+
+    def ExportItems(self):
+        """Called when the Export button is pressed, allows user to export the inventory to .csv file
+
+        Items are written as they are read from the database rather than from the loaded inventory, so the file can be
+        imported again"""
+
+        export.ExportView(self, 'Inventory', 'inventory')
 
 
 class NewItem(Toplevel):
@@ -426,6 +466,9 @@ class NewItem(Toplevel):
         """Sets the window title of the new TopLevel instance"""
         self.title('New item')
 
+        """Allocates the ID of the new item on a worker thread, as it is a write to the database"""
+        self.Worker = workers.Worker(self)
+
         """Calls class defined functions to set up interface"""
         self.LoadInterface()
 
@@ -467,10 +510,12 @@ class NewItem(Toplevel):
         self.FinishedButton = Button(self.MainFrame, text='Finished', command=self.Finished)
         self.FinishedButton.grid(row=6, columnspan=2, pady=5)
 
-        """As the ID entry should be unique, it is auto-generated based on the items existing in the Data"""
-        self.IDEntry.insert(0, self.GenerateID())
+        """As the ID entry should be unique, it is given out by the allocator of the inventory and shown once it arrives,
+        the item cannot be finished until then"""
+        self.FinishedButton['state'] = DISABLED
+        self.Worker.Submit(self.GenerateID, self.IDGenerated, Write=True)
 
-        """Sets entry in first index to disabled state after it's loaded so it cannot be edited by the user"""
+        """Sets entry in first index to disabled state so it cannot be edited by the user"""
         self.IDEntry.configure(state=DISABLED)
 
         """Binds the return key to call the Finished function"""
@@ -480,21 +525,17 @@ class NewItem(Toplevel):
         ConfigureInterface(self)
 
     def GenerateID(self):
-        """Returns the unique ID the new item should be stored as, checks through inventory"""
-
-        """Definite iteration through Data list checking if generated ID already exists"""
-        GeneratedID = 1
-        for DataItem in self.master.Inventory:
+        """Returns the unique ID the new item should be stored as, given out by the allocator of the inventory"""
 
-            """If generated ID does not exist for this item, it is available so return the generated number"""
-            if int(DataItem.ItemID) is not int(GeneratedID):
-                return GeneratedID
+        return sequences.Allocate('Inventory')
 
-            """Else add one to generated ID and reiterate"""
-            GeneratedID += 1
+    def IDGenerated(self, ID):
+        """Called on the interface's thread with the ID given out for the new item, shown in the ID entry"""
 
-        """Final number should be available as it will be the final generated ID plus one"""
-        return GeneratedID
+        self.IDEntry.configure(state=NORMAL)
+        self.IDEntry.insert(0, ID)
+        self.IDEntry.configure(state=DISABLED)
+        self.FinishedButton['state'] = NORMAL
 
     def ValidFields(self):
         """Returns whether it is possible to create valid item to store in inventory"""
@@ -510,6 +551,10 @@ class NewItem(Toplevel):
     def Finished(self):
         """Called when the user presses the Finished button, used to save the new item"""
 
+        """The item cannot be added until its ID has been given out"""
+        if not self.IDEntry.get():
+            return
+
         """Creates a new list and places all the entries previously specified for easy usage"""
         self.Entries = [self.IDEntry, self.BrandEntry, self.TypeEntry, self.NameEntry, self.PriceEntry, self.StockEntry]
 
@@ -1,3 +1,5 @@
+import logging
+
 from src.customers import *
 from src.inventory import *
 from src.order_creation import *
@@ -74,5 +76,10 @@ class MainMenu(Tk):
 
 """The scope in which the interpreter’s main program executes"""
 if __name__ == '__main__':
+    """Warnings from work done without a window, such as keys the migrations could not add or failed sweeps of
+    expired holds, are written to the application's log"""
+    logging.basicConfig(filename='../Data/Application.log', level=logging.WARNING,
+                        format='%(asctime)s %(name)s %(levelname)s: %(message)s')
+
     """Creates instance of the MainMenu class"""
     MainMenu()
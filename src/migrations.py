@@ -0,0 +1,361 @@
+import csv
+import logging
+import os
+
+from src import database
+
+"""Name the schema version is stored under in the Sequences table, which every backend already has"""
+Name = 'Schema'
+
+"""Reports the changes migrations could not make, listing at most Shown of the records affected"""
+Log = logging.getLogger(__name__)
+Shown = 20
+
+"""Type each attribute type of Tables is stored as in a MySQL database, and the MySQL types already counted as it"""
+Types = {'integer': 'INTEGER', 'real': 'DOUBLE', 'text': 'VARCHAR(255)'}
+Families = {'integer': ('int', 'integer', 'bigint', 'mediumint', 'smallint', 'tinyint'),
+            'real': ('double', 'float', 'decimal', 'real'),
+            'text': ('varchar', 'char', 'text', 'tinytext', 'mediumtext', 'longtext')}
+
+
+def Migrate(Connection):
+    """Applies every migration newer than the schema version of the database in parameter in order, storing the
+    version reached after each one so an interrupted run carries on from there. Returns the version reached
+
+    Each migration checks the database before changing it, so running one again, such as on a database made at the
+    latest schema by Check, changes nothing"""
+
+    """The table the version is stored in is made first, so a new database can be migrated from nothing"""
+    Create(Connection, 'Sequences')
+    Current = Version(Connection)
+    for Number, Migration in enumerate(Migrations, 1):
+        if Number > Current:
+            Migration(Connection)
+            Store(Connection, Number)
+    return max(Current, len(Migrations))
+
+
+def Version(Connection):
+    """Returns the schema version of the database in parameter, 0 if it has never been migrated"""
+
+    if Connection.Type == database.Type.Text:
+        return Connection.Sequences().get(Name, 0)
+    Row = Connection.Execute('SELECT Value FROM Sequences WHERE Name = ' + Connection.Placeholder, (Name,)).fetchone()
+    return int(Row[0]) if Row else 0
+
+
+def Store(Connection, Number):
+    """Stores the version in parameter as the schema version of the database in parameter"""
+
+    if Connection.Type == database.Type.Text:
+        with database.JournalLock(Connection.Path('Sequences')):
+            Sequences = Connection.Sequences()
+            Sequences[Name] = Number
+            Connection.StoreSequences(Sequences)
+        return
+
+    Condition = ' WHERE Name = ' + Connection.Placeholder
+    if not Connection.Execute('UPDATE Sequences SET Value = ' + Connection.Placeholder + Condition,
+                              (Number, Name)).rowcount:
+        Connection.Execute('INSERT INTO Sequences VALUES (' + Connection.Placeholder + ', ' + Connection.Placeholder +
+                           ')', (Name, Number))
+    Connection.Connection.commit()
+
+
+def Exists(Connection, Table):
+    """Returns whether the table in parameter exists in the database in parameter"""
+
+    if Connection.Type == database.Type.Local:
+        return Connection.Execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                  (Table,)).fetchone() is not None
+    if Connection.Type == database.Type.Remote:
+        return Connection.Execute('SELECT 1 FROM information_schema.tables WHERE table_schema = DATABASE() '
+                                  'AND table_name = %s', (Table,)).fetchone() is not None
+    return os.path.exists(Connection.Path(Table))
+
+
+def Create(Connection, Table):
+    """Makes the table in parameter with the attributes of Tables and its primary key, unless it already exists"""
+
+    if Connection.Type == database.Type.Text:
+        if not Exists(Connection, Table):
+            open(Connection.Path(Table), 'a').close()
+        return
+    Connection.Execute('CREATE TABLE IF NOT EXISTS ' + Table + ' (' +
+                       Definition(Connection, Table, database.Tables[Table]) + ')')
+    Connection.Connection.commit()
+
+
+def Definition(Connection, Table, Attributes, Keyed=True):
+    """Returns the attributes of the table in parameter as written when it is made, from its (Name, Type)
+    Attributes, followed by its primary key if Keyed"""
+
+    Kinds = Types if Connection.Type == database.Type.Remote else {}
+    Attributes = ', '.join([Name + ' ' + Kinds.get(Kind, Kind) for Name, Kind in Attributes])
+    if Keyed and Table in database.PrimaryKeys:
+        Attributes += ', PRIMARY KEY (' + ', '.join(database.PrimaryKeys[Table]) + ')'
+    return Attributes
+
+
+def Keyed(Connection, Table):
+    """Returns whether the table in parameter has a primary key, text files have none so are always taken to"""
+
+    if Connection.Type == database.Type.Local:
+        return any(Column[5] for Column in Connection.Execute('PRAGMA table_info(' + Table + ')').fetchall())
+    if Connection.Type == database.Type.Remote:
+        return Connection.Execute('SELECT 1 FROM information_schema.table_constraints WHERE table_schema = '
+                                  "DATABASE() AND table_name = %s AND constraint_type = 'PRIMARY KEY'",
+                                  (Table,)).fetchone() is not None
+    return True
+
+
+def Unique(Connection, Table):
+    """Returns whether every record of the table in parameter has a primary key which is given and not shared"""
+
+    Attributes = database.PrimaryKeys[Table]
+    if Connection.Execute('SELECT 1 FROM ' + Table + ' WHERE ' + ' OR '.join([Attribute + ' IS NULL' for Attribute
+                                                                             in Attributes]) + ' LIMIT 1').fetchone():
+        return False
+    return Connection.Execute('SELECT 1 FROM ' + Table + ' GROUP BY ' + ', '.join(Attributes) +
+                              ' HAVING count(*) > 1 LIMIT 1').fetchone() is None
+
+
+def AddKey(Connection, Table):
+    """Gives the table in parameter its primary key unless it already has one. A table holding records with the same
+    key cannot be given one, so the key is only indexed and the records are reported to be put right by hand"""
+
+    if Keyed(Connection, Table):
+        return
+    Attributes = ', '.join(database.PrimaryKeys[Table])
+    if not Unique(Connection, Table):
+        Log.warning('Could not add a primary key to %s as records share the same %s, it has been indexed instead',
+                    Table, Attributes)
+        AddIndex(Connection, Table + 'Key', Table, Attributes)
+    elif Connection.Type == database.Type.Local:
+
+        """SQLite cannot add a primary key to an existing table, so it is rebuilt with one"""
+        Rebuild(Connection, Table, Columns(Connection, Table), Key=True)
+    else:
+        Connection.Execute('ALTER TABLE ' + Table + ' ADD PRIMARY KEY (' + Attributes + ')')
+        if Connection.Execute('SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() '
+                              'AND table_name = %s AND index_name = %s', (Table, Table + 'Key')).fetchone():
+            Connection.Execute('DROP INDEX ' + Table + 'Key ON ' + Table)
+
+
+def Columns(Connection, Table):
+    """Returns a list of the (Name, Type) of each attribute of the table in parameter as it is stored, text files
+    store no types so those of Tables are given"""
+
+    if Connection.Type == database.Type.Local:
+        return [(Column[1], Column[2].lower()) for Column in
+                Connection.Execute('PRAGMA table_info(' + Table + ')').fetchall()]
+    if Connection.Type == database.Type.Remote:
+        return [(Column[0], Column[1].lower()) for Column in Connection.Execute(
+            'SELECT column_name, data_type FROM information_schema.columns WHERE table_schema = DATABASE() '
+            'AND table_name = %s ORDER BY ordinal_position', (Table,)).fetchall()]
+    return [tuple(Attribute) for Attribute in database.Tables[Table]]
+
+
+def AddIndex(Connection, Index, Table, Attribute):
+    """Indexes the attribute of the table in parameter under the name Index unless it already is, or the table does
+    not exist yet as it is indexed when made
+
+    Text files are only looked up by ID, using the sidecar index made the first time a table is looked up"""
+
+    if Connection.Type == database.Type.Text or not Exists(Connection, Table):
+        return
+    if Connection.Type == database.Type.Local:
+        Connection.Execute('CREATE INDEX IF NOT EXISTS ' + Index + ' ON ' + Table + ' (' + Attribute + ')')
+        Connection.Connection.commit()
+    elif Connection.Type == database.Type.Remote:
+        if not Connection.Execute('SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() '
+                                  'AND table_name = %s AND index_name = %s', (Table, Index)).fetchone():
+            Connection.Execute('CREATE INDEX ' + Index + ' ON ' + Table + ' (' + Attribute + ')')
+
+
+def Retype(Connection, Table, Kinds):
+    """Changes the type of each attribute of the table in parameter to the one given by the Kinds dictionary, such as
+    {'Address': 'text'}, converting the values already stored. Attributes already of that type are left as they are
+
+    Values already stored as numbers lost any leading zeros when they were stored, so cannot be restored when they
+    become text. The records holding them are reported by Unrestored so they can be put right by hand
+
+    Text files store every value as text so only the type used when reading, given by Tables, changes"""
+
+    Stored = Columns(Connection, Table)
+    if Connection.Type == database.Type.Local:
+        Changed = [(Attribute, Kinds.get(Attribute, Kind)) for Attribute, Kind in Stored]
+        if Changed != Stored:
+            Numbers = {}
+
+            def Convert(Row):
+                """Returns the row in parameter with each value cast to its new type, noting the ID of the record for
+                each text attribute it held as a number"""
+
+                for Value, (Attribute, Kind) in zip(Row, Changed):
+                    if Kind == 'text' and isinstance(Value, (int, float)):
+                        Noted = Numbers.setdefault(Attribute, [0, []])
+                        Noted[0] += 1
+                        if len(Noted[1]) < Shown:
+                            Noted[1].append(Row[0])
+                return [Cast(Value, Kind) for Value, (Attribute, Kind) in zip(Row, Changed)]
+
+            Rebuild(Connection, Table, Changed, Convert)
+            for Attribute, (Count, IDs) in Numbers.items():
+                Unrestored(Table, Attribute, Count, IDs)
+    elif Connection.Type == database.Type.Remote:
+
+        """MySQL converts the values itself while the table is altered, so the records holding numbers are counted
+        first"""
+        for Attribute, Kind in Stored:
+            if Attribute in Kinds and Kind not in Families[Kinds[Attribute]]:
+                if Kinds[Attribute] == 'text':
+                    Condition = ' FROM ' + Table + ' WHERE ' + Attribute + ' IS NOT NULL'
+                    Count = Connection.Execute('SELECT count(*)' + Condition).fetchone()[0]
+                    if Count:
+                        IDs = Connection.Execute('SELECT ' + database.Tables[Table][0][0] + Condition + ' LIMIT ' +
+                                                 str(Shown)).fetchall()
+                        Unrestored(Table, Attribute, Count, [Row[0] for Row in IDs])
+                Connection.Execute('ALTER TABLE ' + Table + ' MODIFY ' + Attribute + ' ' + Types[Kinds[Attribute]])
+
+
+def Unrestored(Table, Attribute, Count, IDs):
+    """Reports the Count records of the table in parameter whose attribute was stored as a number and is now text,
+    any leading zeros it had, such as those of a phone number, were lost when it was stored. IDs lists the first of
+    them"""
+
+    Listed = ', '.join([str(ID) for ID in IDs]) + (' and others' if Count > len(IDs) else '')
+    Log.warning('%d records of %s held %s as a number, it is now text but any leading zeros lost when it was stored '
+                'cannot be restored, check the records with IDs %s', Count, Table, Attribute, Listed)
+
+
+def Rebuild(Connection, Table, Attributes, Convert=None, Key=None):
+    """Replaces the table in parameter with one of the (Name, Type) Attributes given, each row copied across after
+    being passed to Convert if given, which returns the row to be stored. Used to change types or restructure tables
+
+    The new table has a primary key if Key is set, by default if the table replaced has one. Text files have none
+
+    Rows are streamed a batch at a time, so the table is never held in memory. The table is only replaced once every
+    row has been copied, so it is left as it was if the copy fails"""
+
+    Rebuilt = Table + 'Migrated'
+    if Key is None:
+        Key = Keyed(Connection, Table)
+    if Connection.Type == database.Type.Text:
+        Rows = Connection.Rows(Table)
+    else:
+        Rows = (list(Row) for Row in Connection.Stream('SELECT * FROM ' + Table))
+    if Convert:
+        Rows = map(Convert, Rows)
+
+    if Connection.Type == database.Type.Text:
+        Path = Connection.Path(Table)
+        Journal = Connection.JournalPath(Table)
+
+        """Holds the locks compacting and journaling the table, so no change is made while the file is rewritten"""
+        with database.JournalLock(Journal + '.tmp'), database.JournalLock(Journal):
+            with open(Path + '.tmp', 'w') as File:
+                Writer = csv.writer(File, lineterminator='\n')
+                for Batch in database.Batches(Rows, Connection.BatchSize):
+                    Writer.writerows(Batch)
+                File.flush()
+                os.fsync(File.fileno())
+
+            """The journal has been replayed into the new file so it is removed along with the old file"""
+            os.replace(Path + '.tmp', Path)
+            if os.path.exists(Journal):
+                os.remove(Journal)
+
+    elif Connection.Type == database.Type.Local:
+
+        """The copy and the swap are one transaction, which also drops the indexes of the old table"""
+        Connection.Connection.commit()
+        Connection.Lock()
+        try:
+            Connection.Execute('DROP TABLE IF EXISTS ' + Rebuilt)
+            Connection.Execute('CREATE TABLE ' + Rebuilt + ' (' + Definition(Connection, Table, Attributes, Key) + ')')
+            Connection.View(Rebuilt).InsertMany(Rows)
+            Connection.Execute('DROP TABLE ' + Table)
+            Connection.Execute('ALTER TABLE ' + Rebuilt + ' RENAME TO ' + Table)
+            Connection.Connection.commit()
+        except Exception:
+            Connection.Rollback()
+            raise
+        Reindex(Connection, Table)
+
+    else:
+
+        """MySQL copies the rows itself, Convert cannot be applied as they never reach the application"""
+        Connection.Execute('DROP TABLE IF EXISTS ' + Rebuilt)
+        Connection.Execute('CREATE TABLE ' + Rebuilt + ' (' + Definition(Connection, Table, Attributes, Key) + ')')
+        Connection.Execute('INSERT INTO ' + Rebuilt + ' SELECT * FROM ' + Table)
+        Connection.Execute('RENAME TABLE ' + Table + ' TO ' + Table + 'Old, ' + Rebuilt + ' TO ' + Table)
+        Connection.Execute('DROP TABLE ' + Table + 'Old')
+        Connection.Connection.commit()
+        Reindex(Connection, Table)
+
+    """Copies of the table read before it was rebuilt are read again"""
+    database.Changed(Table)
+
+
+def Reindex(Connection, Table):
+    """Adds each index of the table in parameter again once it has been rebuilt, with the index of its key if it
+    could not be given a primary key"""
+
+    for Index, (Indexed, Attribute) in database.TableIndexes.items():
+        if Indexed == Table:
+            AddIndex(Connection, Index, Table, Attribute)
+    if Table in database.PrimaryKeys and not Keyed(Connection, Table):
+        AddIndex(Connection, Table + 'Key', Table, ', '.join(database.PrimaryKeys[Table]))
+
+
+def Cast(Value, Kind):
+    """Returns the value in parameter converted to the type in parameter, kept as it is if it cannot be converted
+
+    Whole numbers become text without a decimal point, as numbers stored by the old real addresses were entered so.
+    A number becomes text as it was stored, so any leading zeros it was entered with are not restored"""
+
+    if Value is None:
+        return None
+    if Kind == 'text':
+        if isinstance(Value, float) and Value.is_integer():
+            return str(int(Value))
+        return str(Value)
+    try:
+        return {'integer': int, 'real': float}[Kind](Value)
+    except (KeyError, ValueError):
+        return Value
+
+
+def Indexes(Connection):
+    """Version 1, indexes the attributes order lines and orders are looked up and joined by"""
+
+    for Index, (Table, Attribute) in database.TableIndexes.items():
+        AddIndex(Connection, Index, Table, Attribute)
+
+
+def Text(Connection):
+    """Version 2, stores names, dates, contacts and addresses as text. Addresses were real numbers and the other
+    attributes had no SQLite type, so both turned anything which looked like a number into one
+
+    New values are stored as entered from now on. Values already turned into numbers lost any leading zeros, such
+    as that of a contact number like 07700900860, and cannot be recovered, so their records are reported instead"""
+
+    for Table in ('Orders', 'Inventory', 'Customers'):
+        Retype(Connection, Table, dict(database.Tables[Table]))
+
+
+def Keys(Connection):
+    """Version 3, makes every table which does not exist yet then gives each table its primary key and indexes.
+    Until now tables were made and keyed when connecting to a local database, while a remote database was only
+    given the indexes of version 1"""
+
+    for Table in database.Tables:
+        Create(Connection, Table)
+        if Table in database.PrimaryKeys:
+            AddKey(Connection, Table)
+    Indexes(Connection)
+
+
+"""Every migration in the order they are applied, the schema version being the number applied"""
+Migrations = [Indexes, Text, Keys]
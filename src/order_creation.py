@@ -4,6 +4,13 @@ from tkinter import messagebox as message
 from tkinter.ttk import *
 
 from src import database
+from src import repository
+from src import reservations
+from src import search
+from src import sequences
+from src import workers
+from src.customers import Customer, CreateCustomer
+from src.inventory import CreateItem
 from src.utils import *
 
 
@@ -48,42 +55,6 @@ class OrdersItem:
         return int(self.OrderID), int(self.ItemID), int(self.Quantity)
 
 
-class Item:
-    """Creates an object to be stored in the Inventory array"""
-
-    def __init__(self, ItemID, Brand, Type, Name, Price, Stock):
-        self.ItemID = int(ItemID)
-        self.Brand = str(Brand)
-        self.Type = str(Type)
-        self.Name = str(Name)
-        self.Price = float(Price)
-        self.Stock = int(Stock)
-
-    def GetAttributes(self):
-        """Returns the the attributes of the Item object as a list"""
-
-        return int(self.ItemID), self.Brand, self.Type, self.Name, float('{0:.2f}'.format(self.Price)), int(
-            self.Stock)
-
-
-class Customer:
-    """Creates an object item to be stored as each customer entity"""
-
-    def __init__(self, CustomerID, Firstname, Surname, Contact, Address):
-        """Parameters stored as attributes for each Customer item"""
-
-        self.CustomerID = CustomerID
-        self.Firstname = Firstname
-        self.Surname = Surname
-        self.Contact = Contact
-        self.Address = Address
-
-    def GetAttributes(self):
-        """Returns the the attributes of the Customer object as a list"""
-
-        return int(self.CustomerID), self.Firstname, self.Surname, self.Contact, self.Address
-
-
 class OrderCreation(Toplevel):
     """Creates an instance of the OrderCreation interface as a subclass of the Tkinter Toplevel widget"""
 
@@ -99,23 +70,39 @@ class OrderCreation(Toplevel):
         """Sets application title"""
         self.title('Order Creation')
 
-        """Calls class defined functions to connect to database, set up interface and order  items"""
-        self.LoadDatabase()
+        """Runs the database work of the interface on worker threads, the inventory is empty until it has been read"""
+        self.Worker = workers.Worker(self)
+        self.Inventory = database.Records()
+
+        """Dictionary of the quantity of each Item ID held by this order since the inventory was read, the stock read
+        does not include it yet"""
+        self.Reserved = {}
+
+        """Calls class defined functions to set up interface, connect to database and create the order"""
         self.LoadInterface()
+        self.LoadDatabase()
         self.LoadOrder()
 
+        """Stock held for the order is given back if the window is closed before it is finished"""
+        self.protocol('WM_DELETE_WINDOW', self.Abandon)
+
         """Starts the main loop for the application"""
         self.mainloop()
 
     def LoadDatabase(self):
-        """Called to create connection to Database type specified in the configuration file and reads data"""
+        """Called to get the inventory from the shared repository, which reads the database only once
+
+        The inventory is read on a worker thread and replaces the empty inventory once it arrives"""
+
+        """Creates Item object for each row found in Database, shared with every other open interface"""
+        self.Worker.Submit(lambda: repository.Shared.Load('Inventory', CreateItem), self.InventoryLoaded, Key='Load')
 
-        self.Inventory = []
+    def InventoryLoaded(self, Data):
+        """Called on the interface's thread with the inventory once it has been read, its stock already excludes
+        everything held for the order"""
 
-        """Creates Item object for each row found in Database and places object in new Inventory array"""
-        Records = database.Connect('Inventory').Read()
-        for Record in Records:
-            self.Inventory.append(Item(Record[0], Record[1], Record[2], Record[3], Record[4], Record[5]))
+        self.Inventory = Data
+        self.Reserved = {}
 
     def LoadInterface(self):
         """Called to set up the core interface widgets for the application"""
@@ -189,39 +176,38 @@ class OrderCreation(Toplevel):
     def LoadOrder(self):
         """Called to create first instance object of an Order"""
 
-        """Creates initial object calling functions to generate a unique ID and the current date in the parameters"""
-        self.Order = Order(self.GenerateID(), self.GenerateDate())
+        """Creates initial object with the current date, its unique ID is given out on the worker thread as it is a
+        write to the database. Items cannot be added or the order finished until the ID has arrived"""
+        self.Order = Order(None, self.GenerateDate())
+        self.AddButton['state'] = DISABLED
+        self.FinishButton['state'] = DISABLED
+        self.Worker.Submit(self.GenerateID, self.IDGenerated, Write=True)
 
         """Function called to set up the order details on the left panel"""
         self.LoadOrderDetails()
 
+    def IDGenerated(self, ID):
+        """Called on the interface's thread with the ID given out for the order, shown in the order details"""
+
+        self.Order.OrderID = ID
+        self.IDEntry.delete(0, END)
+        self.IDEntry.insert(END, ID)
+        self.AddButton['state'] = NORMAL
+        self.FinishButton['state'] = NORMAL
+
     def LoadOrderDetails(self):
         """Called to populate the Entry widgets with the different order attributes"""
 
-        self.Attributes = [self.Order.OrderID, self.Order.Date, 0]
+        self.Attributes = [self.Order.OrderID or '', self.Order.Date, 0]
         self.Entries = [self.IDEntry, self.DateEntry, self.NetEntry]
         for Entry in self.Entries:
             Entry.delete(0, END)
             Entry.insert(END, self.Attributes[self.Entries.index(Entry)])
 
     def GenerateID(self):
-        """Returns the unique ID the new order should be stored as, checks through existing orders"""
-
-        Records = database.Connect('Orders').Read()
-
-        """Definite iteration through Records list checking if generated ID already exists"""
-        GeneratedID = 1
-        for DataItem in Records:
+        """Returns the unique ID the new order should be stored as, given out by the allocator of the orders"""
 
-            """If generated ID does not exist for this item, it is available so return the generated number"""
-            if int(DataItem[0]) is not GeneratedID:
-                return GeneratedID
-
-            """Else add one to generated ID and reiterate"""
-            GeneratedID += 1
-
-        """Final number should be available as it will be the final generated ID plus one"""
-        return GeneratedID
+        return sequences.Allocate('Orders')
 
     def GenerateDate(self):
         """Returns the current date in the format DD/MM/YYYY"""
@@ -256,9 +242,14 @@ class OrderCreation(Toplevel):
     def GetItemDetails(self, OrderItem):
         """Returns item attributes for the record stored in the inventory with the ID in the parameter OrderItem"""
 
-        for Item in self.Inventory:
-            if int(OrderItem.ItemID) == int(Item.ItemID):
-                return int(Item.ItemID), str(Item.Name), float(Item.Price)
+        Item = self.Inventory.Get(OrderItem.ItemID)
+        if Item:
+            return int(Item.ItemID), str(Item.Name), float(Item.Price)
+
+    def GetAvailable(self, Item):
+        """Returns the stock of the Item in parameter which has not already been added to this order"""
+
+        return Item.Stock - self.Reserved.get(Item.ItemID, 0)
 
     def UpdateOrderNet(self):
         """Called to gather the price amount of each sub order item and insert it into the NetEntry widget"""
@@ -286,21 +277,45 @@ class OrderCreation(Toplevel):
             Confirm = message.askquestion('Remove', 'Remove item from order?', icon='warning', parent=self)
             if Confirm == message.YES:
 
-                """Iterates through Order and removes relevant OrderItem when found, as well as from Treeview"""
-                for OrderItem in self.Order:
-                    if OrderItem.ItemID == Attributes[0]:
-                        self.Order.remove(OrderItem)
-                        self.OrderTree.delete(self.Selection[0])
+                """Gives back the stock held for the item on the worker thread, then removes it from the order"""
+                OrderID, ItemID = self.Order.OrderID, Attributes[0]
+                self.Worker.Submit(lambda: reservations.Release(OrderID, ItemID),
+                                   lambda Released: self.ItemRemoved(ItemID, Released), Write=True)
+        else:
+            message.showerror('Error', 'No item was selected, try again', parent=self)
+
+    def ItemRemoved(self, ItemID, Released):
+        """Called once the stock held for the item in parameter has been given back, removes it from the order"""
+
+        """Iterates through Order and removes relevant OrderItem when found, then reloads the Treeview"""
+        for OrderItem in self.Order:
+            if int(OrderItem.ItemID) == int(ItemID):
+                self.Order.remove(OrderItem)
+                break
+        self.Reserved[int(ItemID)] = self.Reserved.get(int(ItemID), 0) - Released
+        self.LoadOrderTree(self.Order)
 
-                        """Adds back the stock from the inventory item from when it was added to the order"""
-                        for Item in self.Inventory:
-                            if Item.ItemID == Attributes[0]:
-                                Item.Stock += Attributes[3]
+    def Added(self, ItemID, Quantity):
+        """Called once Quantity of the item in parameter has been held for the order, adds it to the order"""
 
-            """Calls the function to update the net order value"""
-            self.UpdateOrderNet()
+        self.Reserved[int(ItemID)] = self.Reserved.get(int(ItemID), 0) + Quantity
+
+        """The same item is only listed once, further quantities are added to its line"""
+        for OrderItem in self.Order:
+            if int(OrderItem.ItemID) == int(ItemID):
+                OrderItem.Quantity = int(OrderItem.Quantity) + Quantity
+                break
         else:
-            message.showerror('Error', 'No item was selected, try again', parent=self)
+            self.Order.append(OrdersItem(self.Order.OrderID, ItemID, Quantity))
+        self.LoadOrderTree(self.Order)
+
+    def Abandon(self):
+        """Called when the window is closed, the order's stock is given back in the background without waiting"""
+
+        OrderID = self.Order.OrderID
+        if OrderID is not None:
+            workers.Executors()[1].submit(reservations.Release, OrderID)
+        self.destroy()
 
     def GetSelectedItemAttributes(self):
         """Returns the tree values of the currency selected order"""
@@ -315,20 +330,26 @@ class OrderCreation(Toplevel):
         """Checks whether all of the necessary requirements have been met for the order, if not, send error message"""
         if self.Order.Completed():
 
-            """Inserts the new Order into the Orders table"""
-            database.Connect('Orders').Insert(self.Order)
+            """The order, its lines and the stock taken by them are written together on the worker thread, the window
+            is closed once it has been saved"""
+            Header = self.Order.GetAttributes()
+            Lines = [OrdersItem.GetAttributes() for OrdersItem in self.Order]
+            self.FinishButton['state'] = DISABLED
+            self.Worker.Submit(lambda: database.Connect('Orders').PlaceOrder(Header, Lines),
+                               lambda Result: self.destroy(), self.SaveFailed, Write=True)
+        else:
+            message.showerror('Error', 'Order is not complete', parent=self)
 
-            """Inserts a new OrdersItem record into the database for each OrderItem in the Order array"""
-            for OrdersItem in self.Order:
-                database.Connect('OrdersItem').Insert(OrdersItem)
+    def SaveFailed(self, Error):
+        """Called if the order could not be saved, such as when another terminal has taken the stock, nothing of the
+        order has been written so the inventory is read again to show the stock which remains"""
 
-            """Updates the inventory table as the stock levels have been adjusted after the order"""
-            database.Connect('Inventory').Save(self.Inventory)
+        message.showerror('Error', 'Error whilst saving order: ' + str(Error), parent=self)
 
-            """Once the order has been saved, terminate the application"""
-            self.destroy()
-        else:
-            message.showerror('Error', 'Order is not complete', parent=self)
+        """Another terminal may have changed the stock, so any copy of the inventory held is not used again"""
+        database.Changed('Inventory')
+        self.LoadDatabase()
+        self.FinishButton['state'] = NORMAL
 
 
 class InventorySelection(Toplevel):
@@ -375,10 +396,10 @@ class InventorySelection(Toplevel):
         """Focuses the user input on the Search entry for quick usability"""
         self.SearchEntry.focus_force()
 
-        """Creates and packs Treeview widget onto the InventoryFrame frame, binds functions and hides headings"""
-        self.InventoryTree = Treeview(self.InventoryFrame, height=20)
+        """Creates and packs a virtual Treeview widget onto the InventoryFrame frame, binds functions and hides headings"""
+        self.InventoryTree = VirtualTreeview(self.InventoryFrame, Values=self.GetRowValues, height=20)
         self.InventoryTree.pack(side=LEFT, expand=TRUE, fill=BOTH)
-        self.InventoryTree.bind('<<TreeviewSelect>>', self.QuantitySelection)
+        self.InventoryTree.bind('<<RecordSelect>>', self.QuantitySelection)
         self.InventoryTree['show'] = 'headings'
 
         """Creates Scrollbar widget and packs it beside Treeview on the InventoryFrame and assigns scroll command"""
@@ -404,19 +425,20 @@ class InventorySelection(Toplevel):
     def LoadInventory(self, Data):
         """Called to load the Treeview widget with the data in list specified in the parameter"""
 
-        """Calls function to remote all of the items already existing in the Treeview widget"""
-        self.ResetInventory()
+        """Only the rows in view are made, their values are swapped in as the Treeview is scrolled"""
+        self.InventoryTree.Load(Data)
 
-        """Inserts a new item with values specified using record attributes"""
-        for Record in Data:
-            self.InventoryTree.insert('', END, text=Data.index(Record), values=(Record.GetAttributes()))
+    def GetRowValues(self, Record):
+        """Returns the values displayed for the item in parameter, showing the stock still available"""
+
+        Values = list(Record.GetAttributes())
+        Values[5] = self.OrderCreation.GetAvailable(Record)
+        return Values
 
     def ResetInventory(self):
         """Called to remove all the items already stored inside the Treeview widget"""
 
-        self.ProductTreeviewChildren = self.InventoryTree.get_children()
-        for Child in self.ProductTreeviewChildren:
-            self.InventoryTree.delete(Child)
+        self.InventoryTree.Load([])
 
     def Search(self, Event):
         """Called when the SearchEntry is edited using the <KeyRelease> binding"""
@@ -425,15 +447,9 @@ class InventorySelection(Toplevel):
         self.Query = self.SearchEntry.get()
         self.Attribute = self.SearchVariable.get()
 
-        """Creates a new array to store the results of the search attempt"""
-        self.Results = []
-
-        """Definite iteration checking each item in Inventory from master class using specified inputs"""
-        for DataItem in self.OrderCreation.Inventory:
-            if str(self.Query).lower() in \
-                    str(DataItem.GetAttributes()[(self.SearchOptions.index(self.Attribute))]).lower():
-                """Append the Item object to the results array if the condition is met"""
-                self.Results.append(DataItem)
+        """Uses the shared search index of the inventory from master class to find matches for the query"""
+        Index = search.Shared(self.OrderCreation.Inventory)
+        self.Results = Index.Find(self.SearchOptions.index(self.Attribute), self.Query)
 
         """Calls the function to load the Treeview widget with the Results list"""
         self.LoadInventory(self.Results)
@@ -441,9 +457,7 @@ class InventorySelection(Toplevel):
     def GetSelectedItem(self):
         """Returns the values for the item dictionary which is currently selected in the Treeview"""
 
-        for Selection in self.InventoryTree.selection():
-            Selected = self.InventoryTree.item(Selection)
-            return Selected['values']
+        return self.InventoryTree.SelectedValues()
 
     def QuantitySelection(self, Event):
         """Called when the Treeview item is selected using the <<TreeviewSelect>> binding, gives input options"""
@@ -533,19 +547,17 @@ class QuantitySelection(Toplevel):
         self.QuantityEntry.focus_force()
 
     def ValidField(self):
-        """Checks whether the quantity specified by the user is valid, essentially if there is enough stock"""
+        """Checks whether the quantity specified by the user is valid, essentially if there is enough stock as last
+        read, the database checks again when the stock is held"""
 
-        for InventoryItem in self.OrderCreation.Inventory:
-            if InventoryItem.ItemID == self.ItemID:
+        InventoryItem = self.OrderCreation.Inventory.Get(self.ItemID)
+        if InventoryItem:
 
-                """Checks if reducing the stock by amount specified will cause stock to become a negative integer"""
-                if (InventoryItem.Stock - self.Quantity >= 0) and (self.Quantity > 0):
-
-                    """Reduces the stock of the inventory item but does not save, in case order isn't finalised"""
-                    InventoryItem.Stock -= self.Quantity
-                    return True
-                else:
-                    message.showerror('Error', 'Error whilst adding item, check quantity input', parent=self)
+            """Checks if reducing the stock by amount specified will cause stock to become a negative integer"""
+            if (self.OrderCreation.GetAvailable(InventoryItem) - self.Quantity >= 0) and (self.Quantity > 0):
+                return True
+            else:
+                message.showerror('Error', 'Error whilst adding item, check quantity input', parent=self)
         return False
 
     def Finished(self, *Event):
@@ -556,19 +568,32 @@ class QuantitySelection(Toplevel):
 
             """Checks whether there is enough stock to meet required quantity"""
             if self.ValidField():
-                """Creates a new OrdersItem object and appends it to the master class Orders array"""
-                self.OrderCreation.Order.append(
-                    OrdersItem(self.OrderCreation.Order.OrderID, self.ItemID, self.Quantity))
-
-                """Reloads the Order tree in the main interface by calling a master class function"""
-                self.OrderCreation.LoadOrderTree(self.OrderCreation.Order)
 
-                """Destroys the InventorySelection and QuantitySelection GUI instances now the item has been added"""
-                self.InventorySelection.destroy()
-                self.destroy()
+                """Holds the stock for the order on the worker thread so no other terminal can sell it, the item is
+                added once it is held"""
+                OrderID, ItemID, Quantity = self.OrderCreation.Order.OrderID, self.ItemID, self.Quantity
+                self.FinishedButton['state'] = DISABLED
+                self.OrderCreation.Worker.Submit(lambda: reservations.Hold(OrderID, ItemID, Quantity),
+                                                 lambda Result: self.Held(ItemID, Quantity), self.HoldFailed,
+                                                 Write=True)
         except ValueError as E:
             message.showerror('Error', 'Error whilst adding item: ' + str(E), parent=self)
 
+    def Held(self, ItemID, Quantity):
+        """Called once the stock has been held, adds the item to the order in the main interface"""
+
+        self.OrderCreation.Added(ItemID, Quantity)
+
+        """Destroys the InventorySelection and QuantitySelection GUI instances now the item has been added"""
+        self.InventorySelection.destroy()
+        self.destroy()
+
+    def HoldFailed(self, Error):
+        """Called if the stock could not be held, such as when another terminal has just taken it"""
+
+        message.showerror('Error', 'Error whilst adding item: ' + str(Error), parent=self)
+        self.FinishedButton['state'] = NORMAL
+
 
 class CustomerSelection(Toplevel):
     """Creates an instance of the CustomerSelection interface as subclass of TopLevel with OrderCreation as root"""
@@ -583,20 +608,26 @@ class CustomerSelection(Toplevel):
         """Sets the window title of the new TopLevel instance"""
         self.title('Customer Selection')
 
-        """Calls class defined functions to load database, set up interface and load customers tree"""
-        self.LoadDatabase()
+        """Runs the database work of the interface on worker threads, there are no customers until they are read"""
+        self.Worker = workers.Worker(self)
+        self.Customers = database.Records()
+
+        """Calls class defined functions to set up interface then load database and the customers tree"""
         self.LoadInterface()
-        self.LoadCustomers()
+        self.LoadDatabase()
 
     def LoadDatabase(self):
-        """Called to create connection to Database type specified in the configuration file and reads data"""
+        """Called to get the customers from the shared repository on a worker thread, which reads the database only
+        once, the customers tree is loaded once they arrive"""
 
-        self.Customers = []
+        self.Worker.Submit(lambda: repository.Shared.Load('Customers', CreateCustomer), self.CustomersLoaded,
+                           Key='Load')
 
-        """Creates Customer object for each row found in Database and places object in new Customers array"""
-        Records = database.Connect('Customers').Read()
-        for Record in Records:
-            self.Customers.append(Customer(Record[0], Record[1], Record[2], Record[3], Record[4]))
+    def CustomersLoaded(self, Data):
+        """Called on the interface's thread with the customers once they have been read"""
+
+        self.Customers = Data
+        self.LoadCustomers()
 
     def LoadInterface(self):
         """Creates and packs the CustomerFrame widget onto the root interface using the pack geometry manager"""
@@ -611,10 +642,10 @@ class CustomerSelection(Toplevel):
         self.NewButton = Button(self.CustomerActions, text='New', command=lambda: NewCustomer(self, self.OrderCreation))
         self.NewButton.grid(row=0, column=0)
 
-        """Creates and packs Treeview widget onto the CustomerFrame frame, binds functions and hides headings"""
-        self.CustomerTree = Treeview(self.CustomerFrame, height=20)
+        """Creates and packs a virtual Treeview widget onto the CustomerFrame frame, binds functions and hides headings"""
+        self.CustomerTree = VirtualTreeview(self.CustomerFrame, height=20)
         self.CustomerTree.pack(side=LEFT, expand=TRUE, fill=BOTH)
-        self.CustomerTree.bind('<<TreeviewSelect>>', self.Finished)
+        self.CustomerTree.bind('<<RecordSelect>>', self.Finished)
         self.CustomerTree['show'] = 'headings'
 
         """Creates Scrollbar widget and packs it beside Treeview on the CustomerFrame and assigns scroll command"""
@@ -640,16 +671,13 @@ class CustomerSelection(Toplevel):
     def LoadCustomers(self):
         """Called to load the Treeview widget with the data in list specified in the parameter"""
 
-        """Inserts a new item with values specified using record attributes"""
-        for Record in self.Customers:
-            self.CustomerTree.insert('', END, text=self.Customers.index(Record), values=(Record.GetAttributes()))
+        """Only the rows in view are made, their values are swapped in as the Treeview is scrolled"""
+        self.CustomerTree.Load(self.Customers)
 
     def GetSelectedCustomer(self):
         """Returns the values for the customer is currently selected in the Treeview"""
 
-        for Selection in self.CustomerTree.selection():
-            Selected = self.CustomerTree.item(Selection)
-            return Selected['values']
+        return self.CustomerTree.SelectedValues()
 
     def Finished(self, Event):
         """Called when the Treeview item is selected using the <<TreeviewSelect>> binding, assigns customer to order"""
@@ -681,6 +709,9 @@ class NewCustomer(Toplevel):
         """Sets the window title of the new TopLevel instance"""
         self.title('New customer')
 
+        """Allocates the ID of the new customer on a worker thread, as it is a write to the database"""
+        self.Worker = workers.Worker(self)
+
         """Calls class defined functions to set up interface"""
         self.LoadInterface()
 
@@ -717,10 +748,12 @@ class NewCustomer(Toplevel):
         self.FinishedButton = Button(self.MainFrame, text='Finished', command=self.Finished)
         self.FinishedButton.grid(row=6, columnspan=2, pady=5)
 
-        """As the ID entry should be unique, it is auto-generated based on existing customer data"""
-        self.IDEntry.insert(0, self.GenerateID())
+        """As the ID entry should be unique, it is given out by the allocator of the customers and shown once it
+        arrives, the customer cannot be finished until then"""
+        self.FinishedButton['state'] = DISABLED
+        self.Worker.Submit(self.GenerateID, self.IDGenerated, Write=True)
 
-        """Sets entry in first index to disabled state after it's loaded so it cannot be edited by the user"""
+        """Sets entry in first index to disabled state so it cannot be edited by the user"""
         self.IDEntry.configure(state=DISABLED)
 
         """Binds the return key to call the Finished function"""
@@ -730,21 +763,17 @@ class NewCustomer(Toplevel):
         ConfigureInterface(self)
 
     def GenerateID(self):
-        """Returns the unique ID the new customer be stored as, checks through existing customer data"""
-
-        """Definite iteration through Customers array checking if generated ID already exists"""
-        GeneratedID = 1
-        for Customer in self.CustomerSelection.Customers:
+        """Returns the unique ID the new customer should be stored as, given out by the allocator of the customers"""
 
-            """If generated ID does not exist for this customer, it is available so return the generated number"""
-            if int(Customer.CustomerID) is not GeneratedID:
-                return GeneratedID
+        return sequences.Allocate('Customers')
 
-            """Else add one to generated ID and reiterate"""
-            GeneratedID += 1
+    def IDGenerated(self, ID):
+        """Called on the interface's thread with the ID given out for the new customer, shown in the ID entry"""
 
-        """Final number should be available as it will be the final generated ID plus one"""
-        return GeneratedID
+        self.IDEntry.configure(state=NORMAL)
+        self.IDEntry.insert(0, ID)
+        self.IDEntry.configure(state=DISABLED)
+        self.FinishedButton['state'] = NORMAL
 
     def ValidFields(self):
         """Checks whether the fields specified by the user are valid and Customer objects can be made"""
@@ -759,6 +788,10 @@ class NewCustomer(Toplevel):
     def Finished(self):
         """Called when the FinishedButton is clicked or the return key is pressed to assign new customer"""
 
+        """The customer cannot be added until its ID has been given out"""
+        if not self.IDEntry.get():
+            return
+
         """Gathers all entry values and appends it to new Input array"""
         self.Entries = [self.IDEntry, self.FirstnameEntry, self.SurnameEntry, self.ContactEntry, self.AddressEntry]
         self.Input = []
@@ -767,9 +800,11 @@ class NewCustomer(Toplevel):
 
         """Calls function to see if all values are valid before continuing"""
         if self.ValidFields():
-            """Inserts newly created Customer into the database using user inputs"""
-            database.Connect('Customers').Insert(
+            """Adds newly created Customer to the shared customers using user inputs, then writes it to the database"""
+            self.CustomerSelection.Customers.append(
                 Customer(self.Input[0], self.Input[1], self.Input[2], self.Input[3], self.Input[4]))
+            Changes = repository.Shared.Changes('Customers', self.CustomerSelection.Customers)
+            self.OrderCreation.Worker.Submit(lambda: repository.Shared.Write('Customers', Changes), Write=True)
 
             """Sets the the OrderCreation class Order object's CustomerID as the customer ID in the select tree item"""
             self.OrderCreation.Order.CustomerID = self.Input[0]
@@ -4,28 +4,33 @@ from tkinter import messagebox as message
 from tkinter.ttk import *
 
 from src import database
+from src import export
+from src import repository
+from src import workers
+from src.customers import CreateCustomer
+from src.inventory import CreateItem
 from src.utils import *
 
 
 class Order(list):
     """Creates an object to be stored as each order, acts as a list with main attributes in parameters"""
 
-    def __init__(self, OrderID, Date, CustomerID, OrdersItems):
-        """Parameters are passed onto the List class"""
-        super().__init__(OrdersItems)
+    def __init__(self, OrderID, Date, CustomerID, OrdersItems=None):
+        """Parameters are passed onto the List class, OrdersItems is None when the lines have not been read yet"""
+        super().__init__(OrdersItems or [])
 
         """Parameters stored as attributes for each Order item"""
         self.OrderID = OrderID
         self.Date = Date
         self.CustomerID = CustomerID
+        self.Loaded = OrdersItems is not None
 
     def GetCustomerAttributes(self):
-        """Returns the relevant customer information a list"""
+        """Returns the relevant customer information a list, looked up by ID in the shared customers"""
 
-        Records = database.Connect('Customers').Read()
-        for Record in Records:
-            if int(Record[0]) == int(self.CustomerID):
-                return Record
+        Customer = repository.Shared.Get('Customers', CreateCustomer, self.CustomerID)
+        if Customer:
+            return list(Customer.GetAttributes())
 
     def GetAttributes(self):
         """Returns the attributes of the Order object as a list"""
@@ -59,6 +64,12 @@ class OrderItem:
         return int(self.ItemID)
 
 
+def CreateOrderItem(Record):
+    """Returns a new OrderItem object using the attributes of a row read from the database"""
+
+    return OrderItem(Record[0], Record[1], Record[2])
+
+
 class OrderManager(Toplevel):
     """Creates an instance of the OrderManager interface as a subclass of the Tkinter Toplevel widget"""
 
@@ -74,41 +85,128 @@ class OrderManager(Toplevel):
         """Sets application title"""
         self.title('Order Management')
 
-        """Calls class defined functions to connect to database, set up interface and inventory items"""
-        self.LoadDatabase()
+        """Runs the database work of the interface on worker threads, orders are read a page at a time, most recent
+        first, as the list is scrolled and the lines of an order are only read once it is selected"""
+        self.Worker = workers.Worker(self)
+        self.Orders = database.Records()
+        self.PageSize = 100
+        self.Exhausted = False
+        self.Fetching = False
+
+        """Records of the order found by the last search, or None when the pages read are shown"""
+        self.Results = None
+
+        """IDs of the orders deleted in this window, left out of pages and searches read before the deletion was
+        written, as they are read on other threads than the one writing it"""
+        self.Deleted = set()
+
+        """Dictionary of the Item ID, Name and Price of each item listed by the orders shown, read on a worker thread
+        with the customer of the order when it is selected"""
+        self.Items = {}
+
+        """Calls class defined functions to set up interface then connect to database to load the orders"""
         self.LoadInterface()
-        self.LoadOrdersList(self.Orders)
+        self.LoadDatabase()
 
         """Starts the main loop for the application"""
         self.mainloop()
 
     def LoadDatabase(self):
-        """Called to create connection to Database type specified in the configuration file, read and store data"""
+        """Called to read the most recent page of orders, the time taken does not depend on how many orders exist
+
+        Any pages already shown are cleared and any page still being read is dropped"""
+
+        self.Orders = database.Records()
+        self.Exhausted = False
+        self.Fetching = False
+        self.OrderListbox.delete(0, END)
+        self.FetchPage()
+
+    def FetchPage(self):
+        """Reads the page of orders after the last one shown on a worker thread, unless a page is already being read
+        or every order has been read. Pages are found by Order ID so reading one is as quick however far down it is"""
+
+        if self.Fetching or self.Exhausted:
+            return
+        self.Fetching = True
+        Before = self.Orders[-1].OrderID if self.Orders else None
+        self.Worker.Submit(lambda: self.ReadPage(Before, self.PageSize), self.PageLoaded, self.PageFailed, Key='Page')
+
+    @staticmethod
+    def ReadPage(Before, Limit):
+        """Returns up to Limit orders with IDs below Before, most recent first, without their lines, run on a worker
+        thread"""
+
+        return [Order(Record[0], Record[1], Record[2]) for Record in database.Connect('Orders').Page('Orders', Before,
+                                                                                                     Limit)]
+
+    def PageLoaded(self, Page):
+        """Called on the interface's thread with a page of orders once it has been read, adds it to the ListBox"""
+
+        self.Fetching = False
+        if len(Page) < self.PageSize:
+            self.Exhausted = True
+        Page = [Order for Order in Page if int(Order.OrderID) not in self.Deleted]
+
+        """Pages read from the database are not changes to be written back"""
+        First = not self.Orders
+        self.Orders.extend(Page)
+        self.Orders.Clean()
+
+        """Orders are only added to the ListBox while it shows the pages read rather than a search result"""
+        if self.Results is None:
+            for Order in Page:
+                self.OrderListbox.insert(END, Order.OrderID)
+            if First and Page:
+                self.OrderListbox.select_set(0)
+                self.LoadOrderInformation()
 
-        self.Orders = []
+    def PageFailed(self, Error):
+        """Called on the interface's thread if a page could not be read, it is read again on the next scroll"""
 
-        """Creates Order object for each row found in Database"""
-        Records = database.Connect('Orders').Read()
-        for Record in Records:
-            """Creates a new Order object with the attributes found in database, also creates new array of OrdersItem"""
-            NewOrder = Order(Record[0], Record[1], Record[2], Record[3], self.LoadOrdersItems(Record[0]))
+        self.Fetching = False
+        self.Worker.Failed(Error)
 
-            """Places new Order object into the new Orders array, each Order has the main attributes and OrdersItem"""
-            self.Orders.append(NewOrder)
+    def Scrolled(self, First, Last):
+        """Called as the ListBox is scrolled to move the Scrollbar, reads the next page once the end is nearly in view"""
 
-    def LoadOrdersItems(self, OrderID):
-        """Returns an array of relevant OrdersItem for the Order ID specified in the parameters"""
+        self.OrderListboxScrollbar.set(First, Last)
+        if float(Last) > 0.9 and self.Results is None:
+            self.FetchPage()
 
-        """Creates new array to store new OrdersItem for specified Order"""
-        self.OrdersItems = []
+    @staticmethod
+    def ReadLines(OrderID):
+        """Returns the OrderItem objects of the order with the ID in parameter, run on a worker thread"""
 
-        """Similar connection is made to a second database"""
-        Records = database.Connect('OrdersItem').Read()
-        for Record in Records:
-            if Record[0] == OrderID:
-                """Appends a new OrderItem object into OrdersItem array using data found in database"""
-                self.OrdersItems.append(OrderItem(Record[0], Record[1], Record[2]))
-        return self.OrdersItems
+        return [CreateOrderItem(Record) for Record in database.Connect('OrdersItem').SelectRecord('OrdersItem', OrderID)]
+
+    @staticmethod
+    def ReadDetails(Order, Lines):
+        """Returns the attributes of the customer of the Order in parameter, its lines, read unless Lines are given,
+        and a dictionary of the details of each item they list, run on a worker thread
+
+        The customers and inventory are looked up in the shared repository, which may have to read them again"""
+
+        if Lines is None:
+            Lines = OrderManager.ReadLines(Order.OrderID)
+        Items = {}
+        for Line in Lines:
+            Item = repository.Shared.Get('Inventory', CreateItem, Line.ItemID)
+            if Item:
+                Items[int(Item.ItemID)] = (int(Item.ItemID), str(Item.Name), float(Item.Price))
+        return Order.GetCustomerAttributes(), Lines, Items
+
+    def DetailsLoaded(self, Order, Details):
+        """Called on the interface's thread with the details of the order in parameter, shown if it is still selected"""
+
+        Customer, Lines, Items = Details
+        self.Items.update(Items)
+        if not Order.Loaded:
+            Order[:] = Lines
+            Order.Loaded = True
+        if self.OrderListbox.curselection() and self.GetOrder(self.GetSelectedOrderID()) is Order:
+            self.LoadCustomerAttributes(Customer)
+            self.LoadOrderItemTree(Order)
 
     def LoadInterface(self):
         """Called to set up the core interface widgets for the application"""
@@ -138,6 +236,10 @@ class OrderManager(Toplevel):
         self.DeleteButton['image'] = self.DeleteImageResource
         self.DeleteButton.grid(row=0, column=1, sticky=N + E + S + W)
 
+        """Creates a Button opening the window used to export orders or their lines within a range of dates"""
+        self.ExportButton = Button(self.OrdersSearchFrame, text='Export', width=7, command=lambda: ExportOrders(self))
+        self.ExportButton.grid(row=0, column=2, sticky=N + S)
+
         """Creates ListBox widget and packs it using pack geometry manager, then binds command when item is selected"""
         self.OrderListbox = Listbox(self.OrdersListFrame, highlightthickness=0, activestyle=DOTBOX,
                                     exportselection=FALSE)
@@ -147,7 +249,7 @@ class OrderManager(Toplevel):
         """Creates Scrollbar widget and packs it beside ListBox on the OrdersListFrame and assigns scroll command"""
         self.OrderListboxScrollbar = Scrollbar(self.OrdersListFrame, command=self.OrderListbox.yview)
         self.OrderListboxScrollbar.pack(side=RIGHT, fill=BOTH, expand=FALSE)
-        self.OrderListbox.config(yscrollcommand=self.OrderListboxScrollbar.set)
+        self.OrderListbox.config(yscrollcommand=self.Scrolled)
 
         """Creates and packs Frame widgets onto the OrderDetailFrame using pack geometry manager"""
         self.OrderAttributes = Frame(self.OrderDetailFrame)
@@ -173,8 +275,8 @@ class OrderManager(Toplevel):
         self.DateEntry = Entry(self.OrderDetailFrame, width=25)
         self.DateEntry.grid(row=1, column=1, padx=10, pady=3)
 
-        """Creates and packs Treeview widget onto the OrderItemDetails frame, binds functions and hides headings"""
-        self.OrdersItemTreeview = Treeview(self.OrderItemDetails, height=19)
+        """Creates and packs a virtual Treeview widget onto the OrderItemDetails frame, showing each line's values"""
+        self.OrdersItemTreeview = VirtualTreeview(self.OrderItemDetails, Values=self.GetLineValues, height=19)
         self.OrdersItemTreeview.pack(side=LEFT, expand=TRUE, fill=BOTH)
         self.OrdersItemTreeview.bind('<Button-1>', self.ClickTree)
         self.OrdersItemTreeview['show'] = 'headings'
@@ -194,6 +296,9 @@ class OrderManager(Toplevel):
             self.OrdersItemTreeview.heading(self.Attributes[self.Headers.index(Header)], text=Header, anchor=W)
             self.OrdersItemTreeview.column(self.Attributes[self.Headers.index(Header)], width=130, minwidth=130)
 
+        """Creates the sort engine used when a Treeview header is clicked, sorting lines by their displayed values"""
+        self.Sorter = Sorter(self.GetLineValues)
+
         """Used to place the window at the center of the screen"""
         ConfigureInterface(self)
 
@@ -220,18 +325,27 @@ class OrderManager(Toplevel):
         return self.OrderListbox.get(self.OrderListbox.curselection())
 
     def GetOrder(self, OrderID):
-        """Returns the relevant Order stored in the Orders array with the matching ID in the parameter"""
+        """Returns the relevant Order read so far with the matching ID in the parameter, including a searched one"""
 
-        for Order in self.Orders:
-            if Order.OrderID == OrderID:
-                return Order
+        Order = self.Orders.Get(OrderID)
+        if Order is None and self.Results is not None:
+            Order = self.Results.Get(OrderID)
+        return Order
 
     def LoadOrderInformation(self, *Event):
-        """Calls various functions to set up the selected Order information"""
+        """Calls various functions to set up the selected Order information, its lines are read the first time"""
 
-        self.LoadOrderItemTree(self.GetOrder(self.GetSelectedOrderID()))
-        self.LoadOrderAttributes(self.GetOrder(self.GetSelectedOrderID()))
-        self.LoadCustomerAttributes(self.GetOrder(self.GetSelectedOrderID()))
+        if not self.OrderListbox.curselection():
+            return
+        Order = self.GetOrder(self.GetSelectedOrderID())
+        self.LoadOrderAttributes(Order)
+
+        """The customer and the items of the order are read on a worker thread, with its lines if not yet read"""
+        self.LoadCustomerAttributes(None)
+        self.ResetOrderItemTree()
+        Lines = list(Order) if Order.Loaded else None
+        self.Worker.Submit(lambda: self.ReadDetails(Order, Lines), lambda Details: self.DetailsLoaded(Order, Details),
+                           Key='Details')
 
     def LoadOrderAttributes(self, Order):
         """Called when an Order is selected in the Listbox to update all Entry boxes"""
@@ -244,16 +358,16 @@ class OrderManager(Toplevel):
             Entry.delete(0, END)
             Entry.insert(END, Order.GetAttributes()[self.Entries.index(Entry)])
 
-    def LoadCustomerAttributes(self, Order):
-        """Used to populate CustomerDetails frame with relevant customer information"""
+    def LoadCustomerAttributes(self, Attributes):
+        """Used to populate CustomerDetails frame with the customer attributes in parameter, blank if None"""
 
         """Destroys existing widgets stored in the CustomerWidgets frame"""
         for Child in self.CustomerDetails.winfo_children():
             Child.destroy()
 
-        """Specifies the different attributes existing for Customers and loads Customer attributes from Order"""
+        """Specifies the different attributes existing for Customers, shown blank until the customer has been read"""
         self.CustomerFields = ['ID', 'Firstname', 'Surname', 'Contact', 'Address']
-        self.CustomerAttributes = Order.GetCustomerAttributes()
+        self.CustomerAttributes = Attributes or [''] * len(self.CustomerFields)
 
         """Definite iteration through CustomerFields list"""
         for Field in self.CustomerFields:
@@ -265,46 +379,32 @@ class OrderManager(Toplevel):
     def ResetOrderItemTree(self):
         """Called to remove all the items already stored inside the Treeview widget"""
 
-        self.OrderTreeviewChildren = self.OrdersItemTreeview.get_children()
-        for Child in self.OrderTreeviewChildren:
-            self.OrdersItemTreeview.delete(Child)
+        self.OrdersItemTreeview.Load([])
 
     def LoadOrderItemTree(self, Data):
         """Called to load the Treeview widget with the data in list specified in the parameter"""
 
-        """Calls function to remote all of the items already existing in the Treeview widget"""
-        self.ResetOrderItemTree()
+        """Only the rows in view are made, the displayed values of each OrderItem are swapped in on scroll"""
+        self.OrdersItemTreeview.Load(Data)
 
-        """Check to see if Data exists"""
-        if Data:
-            i = 0
-            for DataItem in Data:
-                """Gathers the Item attributes for the OrderItem object such as the Name and Price"""
-                Record = self.GetItemDetails(DataItem)
+        """Sets the current selected item as the first one"""
+        self.OrdersItemTreeview.Select(0)
 
-                """Creates new Tuple, calculating the net value of the OrderItem by multiplying quantity and price"""
-                Values = (int(Record[0]), str(Record[1]), float(Record[2]), int(DataItem.Quantity),
-                          float('{0:.2f}'.format(int(Record[2]) * int(DataItem.Quantity))))
+    def GetLineValues(self, DataItem):
+        """Returns the values displayed for the OrderItem in parameter, including its net value"""
 
-                """Inserts a new item at index i using the Values tuple"""
-                self.OrdersItemTreeview.insert('', END, text=i, values=Values)
-                i += 1
+        """Gathers the Item attributes for the OrderItem object such as the Name and Price"""
+        Record = self.GetItemDetails(DataItem)
 
-            """Sets the current selected item as the first value which will also trigger the TreeviewSelect function"""
-            self.OrdersItemTreeview.selection_set(self.OrdersItemTreeview.get_children()[0])
+        """Creates new Tuple, calculating the net value of the OrderItem by multiplying quantity and price"""
+        return (int(Record[0]), str(Record[1]), float(Record[2]), int(DataItem.Quantity),
+                float('{0:.2f}'.format(float(Record[2]) * int(DataItem.Quantity))))
 
     def GetItemDetails(self, OrderItem):
         """Returns the Item ID, Name and Price of the specified OrderItem using the Item ID"""
 
-        """Connection is made to Inventory database to read item data"""
-        Records = database.Connect('Inventory').Read()
-
-        """Definite iteration through inventory database"""
-        for Record in Records:
-
-            """If Record first index, the ID, matches the parameter Item ID, return attributes of Record"""
-            if int(Record[0]) == int(OrderItem.ItemID):
-                return int(Record[0]), str(Record[3]), float(Record[4])
+        """Looks up the item in the details read with the order, an item no longer in the inventory has no price"""
+        return self.Items.get(int(OrderItem.ItemID), (int(OrderItem.ItemID), '', 0.0))
 
     def ClickTree(self, Event):
         """Called to change the Treeview to a different sort type, activated by clicking header using Event parameter"""
@@ -312,8 +412,10 @@ class OrderManager(Toplevel):
         """Function is called for every click on Treeview so checks whether click region is header"""
         self.ClickedRegion = self.OrdersItemTreeview.identify('region', Event.x, Event.y)
         if self.ClickedRegion == 'heading':
-            """Calls function to load the order items with a sorted list"""
-            self.LoadOrderItemTree(SortTree(Event, self.OrdersItemTreeview, self.GetOrder(self.GetSelectedOrderID())))
+            """Sorts by the clicked column, or reverses it if clicked again, then loads the order items sorted"""
+            self.Sorter.Click(ColumnIndex(Event, self.OrdersItemTreeview))
+            self.Sorter.Indicate(self.OrdersItemTreeview, self.Headers)
+            self.LoadOrderItemTree(self.Sorter.Sort(self.GetOrder(self.GetSelectedOrderID())))
 
     def DeleteOrder(self):
         """Called when the Remove button is pressed, used to remove the selected Order from the data"""
@@ -325,35 +427,128 @@ class OrderManager(Toplevel):
         Confirm = message.askquestion('Remove', 'Permanently remove order?', icon='warning', parent=self)
         if Confirm == message.YES:
 
-            """Definite iteration through Orders looking for selected Order"""
-            for Order in self.Orders:
-                if int(Order.OrderID) == int(self.SelectedRecord):
-                    """Removes the relevant Order from the Orders array if found"""
-                    self.Orders.remove(Order)
+            """Looks up the selected Order and removes it from the orders read and the search result if found"""
+            self.Deleted.add(int(self.SelectedRecord))
+            Changes = database.Records()
+            for Data in (self.Orders, self.Results):
+                if Data is not None and Data.Get(self.SelectedRecord) is not None:
+                    Data.remove(Data.Get(self.SelectedRecord))
+                    Changes.Deleted |= Data.Detach().Deleted
 
-            """Connects to database to save inventory Data now that an item has been removed"""
-            database.Connect('Orders').Save(self.Orders)
+            """Writes the removal of the Order to the database on the worker thread"""
+            self.Worker.Submit(lambda: database.Connect('Orders').Flush(Changes), Write=True)
 
-            """Reloads the Orders list with the new Orders list"""
-            self.LoadOrdersList(self.Orders)
+            """Reloads the Orders list with the orders shown"""
+            self.LoadOrdersList(self.Orders if self.Results is None else self.Results)
 
     def Search(self, Event):
         """Called on <KeyRelease> for the SearchEntry widget, used to update the ListBox with query"""
 
         """Sets query variable as the input in SearchEntry widget"""
-        self.Query = self.SearchEntry.get()
-
-        """Creates a new array to store the results of the search attempt"""
-        self.Results = []
+        self.Query = self.SearchEntry.get().strip()
 
-        """Definite iteration checking each Order in Orders Data using query to search Order ID"""
-        for Order in self.Orders:
-            """If Query ID is in selected Order, append Order to results array"""
-            if str(self.Query) == str(Order.OrderID):
-                self.Results.append(Order)
-
-        """Load orders list with results if any were found, otherwise show all orders"""
-        if self.Results:
-            self.LoadOrdersList(self.Results)
+        """Looks up the Order whose ID matches the query on a worker thread, as it may not have been read yet"""
+        if self.Query.isdigit():
+            Query = self.Query
+            self.Worker.Submit(lambda: self.ReadOrder(Query), lambda Result: self.Found(Query, Result), Key='Search')
         else:
+            self.Found(self.Query, None)
+
+    @staticmethod
+    def ReadOrder(OrderID):
+        """Returns the Order with the ID in parameter without its lines, or None if there is none, run on a worker
+        thread"""
+
+        Records = database.Connect('Orders').SelectRecord('Orders', int(OrderID))
+        return Order(Records[0][0], Records[0][1], Records[0][2]) if Records else None
+
+    def Found(self, Query, Result):
+        """Called with the Order found by the search for Query, loads it if found, otherwise shows the pages read"""
+
+        """A search which has since been replaced by typing is ignored"""
+        if Query != self.SearchEntry.get().strip():
+            return
+        if Result is not None and int(Result.OrderID) in self.Deleted:
+            Result = None
+        if Result is not None:
+
+            """The order is shown using the one already read if there is one, which may have its lines"""
+            if self.Orders.Get(Result.OrderID) is not None:
+                Result = self.Orders.Get(Result.OrderID)
+            self.Results = database.Records([Result])
+            self.LoadOrdersList(self.Results)
+        elif self.Results is not None:
+            self.Results = None
             self.LoadOrdersList(self.Orders)
+
+
+class ExportOrders(Toplevel):
+    """Creates an instance of the Export interface as a subclass of the Tkinter TopLevel widget with Orders as root"""
+
+    def __init__(self, *args, **kwargs):
+        """Parameters are passed onto the Tkinter parent Frame class"""
+        super().__init__(**kwargs)
+
+        """Setting the master class as the argument passed when the class was called, will be Orders"""
+        self.master = args[0]
+
+        """Sets the window title of the new TopLevel instance"""
+        self.title('Export Orders')
+
+        """Names shown for each view of the orders which can be exported"""
+        self.Views = {'Orders': 'Orders', 'Order lines': 'OrderLines', 'Order items': 'OrdersItem'}
+
+        """Runs the export on a worker thread"""
+        self.Worker = workers.Worker(self)
+
+        """Calls class defined functions to set up interface"""
+        self.LoadInterface()
+
+    def LoadInterface(self):
+        """Creates and packs the MainFrame widget onto the root interface using the pack geometry manager"""
+        self.MainFrame = Frame(self)
+        self.MainFrame.pack()
+
+        """Creates and packs the Label widgets onto the MainFrame frame using the grid geometry manager"""
+        self.ViewLabel = Label(self.MainFrame, text='Export:')
+        self.ViewLabel.grid(row=0, column=0, sticky=W, padx=10)
+        self.StartLabel = Label(self.MainFrame, text='From (D/M/YYYY):')
+        self.StartLabel.grid(row=1, column=0, sticky=W, padx=10)
+        self.EndLabel = Label(self.MainFrame, text='To (D/M/YYYY):')
+        self.EndLabel.grid(row=2, column=0, sticky=W, padx=10)
+
+        """Creates and packs the Combobox and Entry widgets onto the MainFrame frame, empty dates are not limited"""
+        self.ViewCombobox = Combobox(self.MainFrame, values=list(self.Views), state='readonly', width=22)
+        self.ViewCombobox.current(1)
+        self.ViewCombobox.grid(row=0, column=1, padx=10, pady=5)
+        self.StartEntry = Entry(self.MainFrame, width=25)
+        self.StartEntry.grid(row=1, column=1, padx=10, pady=5)
+        self.EndEntry = Entry(self.MainFrame, width=25)
+        self.EndEntry.grid(row=2, column=1, padx=10, pady=5)
+
+        """Creates a new button and packs it onto the MainFrame frame using the grid geometry manager """
+        self.FinishedButton = Button(self.MainFrame, text='Export', command=self.Finished)
+        self.FinishedButton.grid(row=3, columnspan=2, pady=5)
+
+        """Binds the return key to call the Finished function"""
+        self.bind('<Return>', self.Finished)
+
+        """Used to place the window at the center of the screen"""
+        ConfigureInterface(self)
+
+    def ValidFields(self):
+        """Returns whether each date entered is empty or a valid date"""
+
+        for Field in (self.StartEntry, self.EndEntry):
+            if Field.get().strip() and export.Parse(Field.get()) is None:
+                message.showerror('Error', Field.get() + ' is not a valid D/M/YYYY date', parent=self)
+                return False
+        return True
+
+    def Finished(self, *Event):
+        """Called when the Export button is pressed, exports the chosen view within the dates then closes the window"""
+
+        if self.ValidFields():
+            View = self.Views[self.ViewCombobox.get()]
+            export.ExportView(self, View, View.lower(), self.StartEntry.get().strip() or None,
+                              self.EndEntry.get().strip() or None, self.destroy)
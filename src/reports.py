@@ -0,0 +1,224 @@
+import datetime
+import os
+
+from src import database
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+"""Ways the sales report can be grouped, the first four by an attribute and the last three by the order date"""
+Groups = ('Item', 'Brand', 'Type', 'Customer', 'Day', 'Week', 'Month')
+
+"""Expression grouped by in SQL for each group, dates are grouped by day then rolled up as they are stored as D/M/YYYY"""
+Expressions = {'Item': 'OrdersItem.ItemID', 'Brand': 'Inventory.Brand', 'Type': 'Inventory.Type',
+               'Customer': 'Orders.CustomerID', 'Day': 'Orders.Date', 'Week': 'Orders.Date', 'Month': 'Orders.Date'}
+
+
+def Valuation():
+    """Returns the total value of the stock held, the sum of each item's price multiplied by its stock"""
+
+    return round(float(database.Connect('Inventory').Sum('Inventory', 'Price * Stock') or 0), 2)
+
+
+def StockCount():
+    """Returns the number of units held across the whole inventory"""
+
+    return int(database.Connect('Inventory').Sum('Inventory', 'Stock') or 0)
+
+
+def OrderCount():
+    """Returns the number of orders which have been made"""
+
+    return int(database.Connect('Orders').Count('Orders'))
+
+
+def Revenue():
+    """Returns the total value of every order line, priced at the current inventory price as prices are not stored
+    with each order. As with Sales, lines of deleted orders are not counted"""
+
+    Connection = database.Connect('OrdersItem')
+
+    """The text database has no server, so the join is made while reading the files using only the prices needed"""
+    if Connection.Type == database.Type.Text:
+        Prices, Orders, Keys, ByItem = Lookups(Connection, 'Item')
+        Total = 0.0
+        for Record in Connection.Rows('OrdersItem'):
+            Record = database.Typed('OrdersItem', Record)
+            if Record[0] in Orders:
+                Total += Prices.get(Record[1], 0) * Record[2]
+        return round(Total, 2)
+
+    Total = Connection.Scalar('SELECT sum(OrdersItem.Quantity * Inventory.Price) FROM OrdersItem '
+                              'INNER JOIN Orders ON OrdersItem.OrderID = Orders.OrderID '
+                              'INNER JOIN Inventory ON OrdersItem.ItemID = Inventory.ItemID')
+    return round(float(Total or 0), 2)
+
+
+def Summary():
+    """Returns a dictionary of the headline figures of the business, each computed by the configured backend"""
+
+    Orders = OrderCount()
+    Total = Revenue()
+    return {'Valuation': Valuation(),
+            'Stock': StockCount(),
+            'Orders': Orders,
+            'Revenue': Total,
+            'Average Order': round(Total / Orders, 2) if Orders else 0.0}
+
+
+def Sales(Group):
+    """Returns the revenue, units sold and number of orders for each key of the group in parameter, such as each Brand
+
+    Each row is a tuple of (Key, Revenue, Units, Orders) sorted by key, lines of deleted orders are not counted"""
+
+    if Group not in Groups:
+        raise ValueError('Sales cannot be grouped by ' + str(Group))
+    Connection = database.Connect('OrdersItem')
+    if Connection.Type == database.Type.Text:
+        Rows = TextSales(Connection, Group) if numpy is None else VectorSales(Connection, Group)
+    else:
+        Rows = SQLSales(Connection, Group)
+    return sorted(Rows, key=lambda Row: (Row[0] is None, Row[0]))
+
+
+def SQLSales(Connection, Group):
+    """Returns the sales rows for the group in parameter with the join and GROUP BY carried out by the database"""
+
+    Expression = Expressions[Group]
+    Rows = Connection.Execute(
+        'SELECT ' + Expression + ', sum(OrdersItem.Quantity * coalesce(Inventory.Price, 0)), sum(OrdersItem.Quantity), '
+        'count(DISTINCT OrdersItem.OrderID) FROM OrdersItem '
+        'INNER JOIN Orders ON OrdersItem.OrderID = Orders.OrderID '
+        'LEFT JOIN Inventory ON OrdersItem.ItemID = Inventory.ItemID '
+        'GROUP BY ' + Expression).fetchall()
+
+    """Rows grouped by date are rolled up into each period, an order has one date so its count is never doubled"""
+    Totals = {}
+    for Key, Revenue, Units, Orders in Rows:
+        if Group in ('Day', 'Week', 'Month'):
+            Key = Period(Key, Group)
+        Total = Totals.setdefault(Key, [0.0, 0, 0])
+        Total[0] += float(Revenue or 0)
+        Total[1] += int(Units or 0)
+        Total[2] += int(Orders)
+    return [(Key, round(Total[0], 2), Total[1], Total[2]) for Key, Total in Totals.items()]
+
+
+def Period(Date, Group):
+    """Returns the label of the Day, Week or Month containing the D/M/YYYY date in parameter, sortable as text"""
+
+    try:
+        Date = datetime.datetime.strptime(str(Date).strip(), '%d/%m/%Y').date()
+    except ValueError:
+        return None
+    if Group == 'Week':
+        Year, Week, Day = Date.isocalendar()
+        return '{0}-W{1:02d}'.format(Year, Week)
+    if Group == 'Month':
+        return Date.strftime('%Y-%m')
+    return Date.isoformat()
+
+
+def Lookups(Connection, Group):
+    """Returns the prices of each item, the order IDs which exist and a dictionary giving the key of each ID
+
+    Keys of Item, Brand and Type are looked up by ItemID, the others by OrderID, as given by the returned flag"""
+
+    Prices = {}
+    Keys = {}
+    ByItem = Group in ('Item', 'Brand', 'Type')
+    for Record in Connection.Rows('Inventory'):
+        Record = database.Typed('Inventory', Record)
+        Prices[Record[0]] = Record[4]
+        if ByItem:
+            Keys[Record[0]] = Record[('Item', 'Brand', 'Type').index(Group)]
+
+    """Each distinct date is only turned into a period once"""
+    Orders = set()
+    Periods = {}
+    for Record in Connection.Rows('Orders'):
+        OrderID = int(Record[0])
+        Orders.add(OrderID)
+        if Group == 'Customer':
+            Keys[OrderID] = int(Record[2])
+        elif not ByItem:
+            if Record[1] not in Periods:
+                Periods[Record[1]] = Period(Record[1], Group)
+            Keys[OrderID] = Periods[Record[1]]
+    return Prices, Orders, Keys, ByItem
+
+
+def TextSales(Connection, Group):
+    """Returns the sales rows for the group in parameter, read from the text files one order line at a time"""
+
+    Prices, Orders, Keys, ByItem = Lookups(Connection, Group)
+    Totals = {}
+    for Record in Connection.Rows('OrdersItem'):
+        OrderID, ItemID, Quantity = int(Record[0]), int(Record[1]), int(Record[2])
+        if OrderID not in Orders:
+            continue
+        Key = ItemID if Group == 'Item' else Keys.get(ItemID if ByItem else OrderID)
+        Total = Totals.setdefault(Key, [0.0, 0, set()])
+        Total[0] += Prices.get(ItemID, 0) * Quantity
+        Total[1] += Quantity
+        Total[2].add(OrderID)
+    return [(Key, round(Total[0], 2), Total[1], len(Total[2])) for Key, Total in Totals.items()]
+
+
+def VectorSales(Connection, Group):
+    """Returns the sales rows for the group in parameter, totalled over arrays of every order line using NumPy"""
+
+    Prices, Orders, Keys, ByItem = Lookups(Connection, Group)
+
+    """Parses the order lines into columns of OrderID, ItemID and Quantity. Each line is split on its own so any
+    attributes after the first three are ignored, as when read by TextSales, rather than shifting every later line.
+    Changes still in the journal are replayed while reading rather than compacted, so the report writes nothing"""
+    Path = Connection.Path('OrdersItem')
+    if Connection.Journaled('OrdersItem'):
+        Lines = numpy.fromiter((int(Value) for Record in Connection.Rows('OrdersItem') for Value in Record[:3]),
+                               dtype=numpy.int64).reshape(-1, 3)
+    elif os.path.getsize(Path):
+        Lines = numpy.loadtxt(Path, delimiter=',', usecols=(0, 1, 2), dtype=numpy.int64, ndmin=2)
+    else:
+        Lines = numpy.zeros((0, 3), dtype=numpy.int64)
+    OrderIDs, ItemIDs, Quantities = Lines[:, 0], Lines[:, 1], Lines[:, 2]
+
+    """Arrays below are indexed by ID, so negative IDs, which would index from the end, or IDs so sparse the arrays
+    would be far larger than the data are totalled a line at a time instead"""
+    Smallest = min(min(Orders, default=0), min(Prices, default=0), int(Lines[:, :2].min(initial=0)))
+    Largest = max(max(Orders, default=0), max(Prices, default=0), int(Lines[:, :2].max(initial=0)))
+    if Smallest < 0 or Largest > 16 * (len(Lines) + len(Orders) + len(Prices)) + 65536:
+        return TextSales(Connection, Group)
+
+    """Lines of orders which no longer exist are dropped"""
+    Existing = numpy.zeros(max(max(Orders, default=0), int(OrderIDs.max(initial=0))) + 1, dtype=bool)
+    Existing[list(Orders)] = True
+    Valid = Existing[OrderIDs]
+    OrderIDs, ItemIDs, Quantities = OrderIDs[Valid], ItemIDs[Valid], Quantities[Valid]
+
+    """Arrays indexed by ID give the price of each item and the position of each key, missing items cost nothing"""
+    Size = max(max(Prices, default=0), int(ItemIDs.max(initial=0))) + 1
+    PriceOf = numpy.zeros(Size)
+    PriceOf[list(Prices)] = list(Prices.values())
+    if Group == 'Item':
+        Labels = list(range(Size))
+        Codes = ItemIDs
+    else:
+        IDs = ItemIDs if ByItem else OrderIDs
+        Labels = sorted(set(Keys.values()) - {None}) + [None]
+        Positions = {Key: Position for Position, Key in enumerate(Labels)}
+        CodeOf = numpy.full(max(max(Keys, default=0), int(IDs.max(initial=0))) + 1, len(Labels) - 1)
+        CodeOf[list(Keys)] = [Positions[Key] for Key in Keys.values()]
+        Codes = CodeOf[IDs]
+
+    """Totals each group with bincount, orders are counted once per group from the distinct pairs of group and order"""
+    Revenue = numpy.bincount(Codes, weights=Quantities * PriceOf[ItemIDs], minlength=len(Labels))
+    Units = numpy.bincount(Codes, weights=Quantities, minlength=len(Labels))
+    Width = int(OrderIDs.max(initial=0)) + 1
+    Pairs = numpy.sort(Codes * Width + OrderIDs)
+    Pairs = Pairs[numpy.concatenate(([True], Pairs[1:] != Pairs[:-1]))] if len(Pairs) else Pairs
+    Counts = numpy.bincount(Pairs // Width, minlength=len(Labels))
+    return [(Labels[Code], round(float(Revenue[Code]), 2), int(Units[Code]), int(Counts[Code]))
+            for Code in range(len(Labels)) if Units[Code] or Counts[Code]]
@@ -0,0 +1,93 @@
+import threading
+
+from src import database
+
+
+class Repository:
+    """Creates an application-wide store which reads each table once and shares its records with every interface"""
+
+    def __init__(self):
+        """Starts empty, each table is only read the first time it is requested"""
+
+        self.Tables = {}
+
+        """Identifies the backend the stored tables were read from and the Stamp of each table when it was read"""
+        self.Key = None
+        self.Versions = {}
+
+        """Held while tables are read or forgotten, as the interfaces' worker threads may request them at once"""
+        self.Lock = threading.RLock()
+
+    def Check(self):
+        """Forgets every stored table if the configured backend has changed since they were read"""
+
+        Key = database.Connections.Configuration()
+        with self.Lock:
+            if Key != self.Key:
+                self.Tables = {}
+                self.Versions = {}
+                self.Key = Key
+
+    def Current(self, Table):
+        """Returns whether the stored copy of the table in parameter is up to date, dropping it if it has been written
+
+        The Stamp of the table also changes when another terminal writes it, not only when this application does"""
+
+        Stamp = database.Connect(Table).Stamp(Table)
+        if self.Versions.get(Table) != Stamp:
+            self.Invalidate(Table)
+            self.Versions[Table] = Stamp
+            return False
+        return Table in self.Tables
+
+    def Load(self, Table, Factory):
+        """Returns the shared Records for the table in parameter, Factory creates each record object from a row"""
+
+        self.Check()
+        with self.Lock:
+            if not self.Current(Table) or Table not in self.Tables:
+                Records = database.Connect(Table).Read()
+                self.Tables[Table] = database.Records(Factory(Record) for Record in Records)
+            return self.Tables[Table]
+
+    def Get(self, Table, Factory, ID):
+        """Returns the record of the table in parameter with the matching ID, reading the table only if it has changed"""
+
+        return self.Load(Table, Factory).Get(ID)
+
+    def Changes(self, Table, Data=None):
+        """Takes the changes made to the Records in parameter, by default the stored records of the table, for Write
+
+        Called on the interface's thread so the changes can be written on a worker thread while editing carries on"""
+
+        Stored = self.Tables.get(Table)
+        if Data is None:
+            Data = Stored
+        if Data is None:
+            return None
+        return Data.Detach(), Data is Stored
+
+    def Write(self, Table, Changes):
+        """Writes the changes in parameter taken by Changes to the table in parameter"""
+
+        if Changes is None:
+            return
+        Detached, Stored = Changes
+        Stamp = database.Connect(Table).Flush(Detached)
+
+        """Writing the stored records leaves them up to date, so they do not need to be read again. The Stamp is the
+        one taken by Flush while it still held the table, so a write made since still has them read again"""
+        if Stored and Stamp is not None:
+            with self.Lock:
+                self.Versions[Table] = Stamp
+
+    def Invalidate(self, *Tables):
+        """Forgets the stored tables in parameter so they are read again when next requested"""
+
+        with self.Lock:
+            for Table in Tables:
+                self.Tables.pop(Table, None)
+
+
+"""Application-wide repository shared by every interface"""
+Shared = Repository()
@@ -0,0 +1,62 @@
+import logging
+import threading
+import time
+
+from src import database, settings
+
+"""Thread giving back the stock held by abandoned orders, started when stock is first held"""
+Sweeper = None
+Lock = threading.Lock()
+
+"""Reports sweeps which failed, as the thread has no window to show them in"""
+Log = logging.getLogger(__name__)
+
+
+def Lifetime():
+    """Returns the number of seconds stock stays held for an order which is no longer being made, set in the
+    configuration"""
+
+    return float(settings.Connect().GetValue('DATABASE', 'HOLD', '1800'))
+
+
+def Hold(OrderID, ItemID, Quantity):
+    """Takes Quantity of the stock of the item in parameter for the order being made, raises ValueError if not enough
+    stock remains. Every hold of the order lasts for the configured lifetime from now"""
+
+    Start()
+    database.Connect('Reservations').HoldStock(int(OrderID), int(ItemID), int(Quantity), time.time() + Lifetime())
+
+
+def Release(OrderID, ItemID=None):
+    """Gives back the stock held by the order for the item in parameter, or for every item if None, such as when the
+    item is removed from the order or the order is abandoned. Returns the quantity given back"""
+
+    return database.Connect('Reservations').ReleaseStock(int(OrderID), None if ItemID is None else int(ItemID))
+
+
+def Sweep():
+    """Gives back the stock of every expired hold, returns the number of holds expired"""
+
+    return database.Connect('Reservations').ExpireHolds(time.time())
+
+
+def Start(Interval=60):
+    """Starts the thread sweeping expired holds every Interval seconds, unless it is already running"""
+
+    global Sweeper
+    with Lock:
+        if Sweeper is None:
+            Sweeper = threading.Thread(target=Run, args=(Interval,), name='Sweeper', daemon=True)
+            Sweeper.start()
+
+
+def Run(Interval):
+    """Sweeps expired holds every Interval seconds for as long as the application runs"""
+
+    while True:
+        try:
+            Sweep()
+        except Exception:
+            """The database may be unavailable for now, the holds are swept again next time"""
+            Log.exception('Failed to sweep expired holds')
+        time.sleep(Interval)
@@ -0,0 +1,101 @@
+class SearchIndex:
+    """Creates a substring search index over the columns of a Records list, kept up to date as records change"""
+
+    def __init__(self, Data, Attributes=None):
+        """Data is the Records list to search, Attributes returns the column values of a record"""
+
+        self.Data = Data
+        self.Attributes = Attributes or (lambda Record: Record.GetAttributes())
+
+        """Dictionary for each indexed column mapping each ID to the lower case text of that column"""
+        self.Texts = {}
+
+        """Dictionary for each indexed column mapping every three letter sequence to the set of IDs containing it"""
+        self.Grams = {}
+
+        """The last query and its matching IDs, used to narrow the results while the user keeps typing"""
+        self.Last = None
+
+        """Registers with the Records list so edits, insertions and removals update the index"""
+        Data.Observers.append(self)
+
+    def Build(self, Column):
+        """Indexes the column in parameter, each column is only indexed the first time it is searched"""
+
+        self.Texts[Column] = {}
+        self.Grams[Column] = {}
+        for Record in self.Data:
+            self.Insert(Column, Record)
+
+    def Insert(self, Column, Record):
+        """Adds the text of the column in parameter for the record to the index"""
+
+        ID = Record.GetID()
+        Text = str(self.Attributes(Record)[Column]).lower()
+        self.Texts[Column][ID] = Text
+        for Gram in Trigrams(Text):
+            self.Grams[Column].setdefault(Gram, set()).add(ID)
+
+    def Add(self, Record):
+        """Called by the Records list when a record is added or modified"""
+
+        for Column in self.Texts:
+            self.Insert(Column, Record)
+        self.Last = None
+
+    def Remove(self, Record):
+        """Called by the Records list when a record is removed or about to be re-indexed after a modification"""
+
+        ID = Record.GetID()
+        for Column in self.Texts:
+            Text = self.Texts[Column].pop(ID, None)
+            if Text is None:
+                continue
+            for Gram in Trigrams(Text):
+                IDs = self.Grams[Column].get(Gram)
+                if IDs is not None:
+                    IDs.discard(ID)
+                    if not IDs:
+                        del self.Grams[Column][Gram]
+        self.Last = None
+
+    def Find(self, Column, Query):
+        """Returns the records whose column in parameter contains the query, ignoring case, ordered by ID"""
+
+        Query = str(Query).lower()
+        if not Query:
+            self.Last = None
+            return list(self.Data)
+        if Column not in self.Texts:
+            self.Build(Column)
+        Texts = self.Texts[Column]
+
+        if self.Last and self.Last[0] == Column and self.Last[1] in Query:
+            """The query extends the previous one, so only the previous matches need checking"""
+            Candidates = self.Last[2]
+        elif len(Query) >= 3:
+            """Only IDs containing every three letter sequence of the query can match, smallest sets are used first"""
+            Sets = sorted((self.Grams[Column].get(Gram, set()) for Gram in Trigrams(Query)), key=len)
+            Candidates = Sets[0].intersection(*Sets[1:])
+        else:
+            Candidates = Texts.keys()
+
+        """Candidates are confirmed against the stored text, which is already in lower case"""
+        IDs = [ID for ID in Candidates if Query in Texts[ID]]
+        self.Last = (Column, Query, IDs)
+        return [self.Data.Index[ID] for ID in sorted(IDs)]
+
+
+def Trigrams(Text):
+    """Returns the set of three letter sequences found in the text in parameter"""
+
+    return {Text[Index:Index + 3] for Index in range(len(Text) - 2)}
+
+
+def Shared(Data):
+    """Returns the search index of the Records list in parameter, creating it if it does not have one yet"""
+
+    for Observer in Data.Observers:
+        if isinstance(Observer, SearchIndex):
+            return Observer
+    return SearchIndex(Data)
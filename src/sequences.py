@@ -0,0 +1,61 @@
+import heapq
+
+from src import database, settings
+
+
+class Allocator:
+    """Creates an allocator giving out new IDs for one table, each taken from the stored high-water mark of the table"""
+
+    def __init__(self, Table, Reuse=False):
+        """Reuse decides whether IDs released by deleted records are given out again before new ones"""
+
+        self.Table = Table
+        self.Reuse = Reuse
+
+        """Heap of released IDs, smallest first, and the backend they were released on"""
+        self.Free = []
+        self.Key = None
+
+    def Next(self):
+        """Returns a new ID for the table, a released ID if there is one, otherwise the next above the high-water mark"""
+
+        Connection = database.Connect(self.Table)
+
+        """Released IDs only belong to the backend they were released on"""
+        if database.Connections.Key != self.Key:
+            self.Free = []
+            self.Key = database.Connections.Key
+        if self.Free:
+            return heapq.heappop(self.Free)
+        return Connection.Reserve(self.Table)
+
+    def Release(self, ID):
+        """Called when a record is deleted so its ID can be given out again, only kept when reuse is enabled"""
+
+        if self.Reuse and database.Connections.Key == self.Key:
+            heapq.heappush(self.Free, int(ID))
+
+
+"""Dictionary storing the allocator of each table, made the first time an ID is needed"""
+Allocators = {}
+
+
+def Get(Table):
+    """Returns the allocator for the table in parameter, reuse of released IDs is set in the configuration"""
+
+    if Table not in Allocators:
+        Reuse = settings.Connect().GetValue('DATABASE', 'REUSE', 'False') == 'True'
+        Allocators[Table] = Allocator(Table, Reuse)
+    return Allocators[Table]
+
+
+def Allocate(Table):
+    """Returns a new unique ID for the table in parameter"""
+
+    return Get(Table).Next()
+
+
+def Release(Table, ID):
+    """Called when the record of the table in parameter with the ID in parameter has been deleted"""
+
+    Get(Table).Release(ID)
@@ -1,4 +1,6 @@
 import configparser
+import copy
+import os
 from tkinter import *
 from tkinter import filedialog as dialog
 from tkinter import messagebox as message
@@ -14,30 +16,79 @@ except ImportError:
     remoteAvailable = False
 
 
+"""Process-wide cache of parsed configuration files, maps each file location to its stamp and parsed contents"""
+Cache = {}
+
+
+def Stamp(File):
+    """Returns the modification time and size of the file in parameter, used to detect when it has changed"""
+
+    try:
+        Status = os.stat(File)
+        return Status.st_mtime_ns, Status.st_size
+    except OSError:
+        return None
+
+
+def Load(File):
+    """Returns the parsed configuration for the file in parameter, only re-reading it when the file has changed"""
+
+    Current = Stamp(File)
+    Cached = Cache.get(File)
+    if Cached is None or Cached[0] != Current:
+        Config = configparser.ConfigParser()
+        Config.read(File)
+        Cache[File] = (Current, Config)
+    return Cache[File][1]
+
+
 class Connect():
     """Creates an connection to get and set application settings"""
 
     def __init__(self, File='../Data/Configuration.ini'):
-        """Establishes core configuration details and opens configuration file"""
+        """Establishes core configuration details using the shared cached copy of the configuration file"""
 
         self.File = File
-        self.Config = configparser.ConfigParser()
-        self.Config.read(self.File)
+        self.Config = Load(self.File)
+
+        """Values set but not yet saved, kept on this connection so other readers only see them once written"""
+        self.Pending = {}
+
+    def GetValue(self, Section, Field, Default=None):
+        """Returns a specific field from the configuration file using the parameters, or Default if it is missing"""
+
+        if (Section, Field) in self.Pending:
+            return self.Pending[(Section, Field)]
+        if Default is None:
+            return self.Config.get(Section, Field)
+        return self.Config.get(Section, Field, fallback=Default)
 
-    def GetValue(self, Section, Field):
-        """Returns a specific field from the configuration file using the parameters"""
+    def SetValue(self, Section, Field, Value, Save=True):
+        """Sets a specific field in the configuration file to a value specified in the parameter
 
-        return self.Config.get(Section, Field)
+        Several values can be set with Save as False and then written together with a single call to Save"""
 
-    def SetValue(self, Section, Field, Value):
-        """Sets a specific field in the configuration file to a value specified in the parameter"""
+        self.Pending[(Section, Field)] = Value
+        if Save:
+            self.Save()
 
-        self.Config.set(Section, Field, Value)
+    def Save(self):
+        """Writes the configuration to file with the values set since it was last saved, replacing its contents"""
+
+        """The pending values are set on a copy of the latest configuration, the cached copy is shared by every reader"""
+        Config = copy.deepcopy(Load(self.File))
+        for (Section, Field), Value in self.Pending.items():
+            Config.set(Section, Field, Value)
 
         """Opens the configuration file with the write setting to replace contents"""
         with open(self.File, 'w') as ConfigFile:
             """Will write all of the configuration into the opened file"""
-            self.Config.write(ConfigFile)
+            Config.write(ConfigFile)
+
+        """Records the new stamp of the file so the cached copy is not needlessly parsed again"""
+        Cache[self.File] = (Stamp(self.File), Config)
+        self.Config = Config
+        self.Pending = {}
 
 
 class Settings(Toplevel):
@@ -143,17 +194,19 @@ class Settings(Toplevel):
 
         try:
 
+            Configuration = Connect()
+
             """Asks user for the local file location using various parameter options"""
             File = dialog.askopenfile(mode='r+', title='Select database', defaultextension='.db', parent=self,
                                       filetypes=[('Local database', '.db')],
-                                      initialfile=Connect().GetValue('LOCAL', 'PATH'))
+                                      initialfile=Configuration.GetValue('LOCAL', 'PATH'))
 
             """Updates the configuration file setting to the local database"""
-            Connect().SetValue('LOCAL', 'PATH', File.name)
+            Configuration.SetValue('LOCAL', 'PATH', File.name)
 
             """Inserts the local database file name into the LocalEntry widget"""
             self.LocalEntry.delete(0, END)
-            self.LocalEntry.insert(END, Connect().GetValue('LOCAL', 'PATH'))
+            self.LocalEntry.insert(END, Configuration.GetValue('LOCAL', 'PATH'))
         except AttributeError as E:
 
             """If an error occurs, then set the OptionMenu choice as the previous option and give error message"""
@@ -166,9 +219,11 @@ class Settings(Toplevel):
 
         """If all of the entries have values, update the configuration file settings, otherwise give error message"""
         if self.HostEntry.get() and self.UserEntry.get() and self.PassEntry.get():
-            Connect().SetValue('REMOTE', 'HOST', self.HostEntry.get())
-            Connect().SetValue('REMOTE', 'USERNAME', self.UserEntry.get())
-            Connect().SetValue('REMOTE', 'PASSWORD', self.PassEntry.get())
+            Configuration = Connect()
+            Configuration.SetValue('REMOTE', 'HOST', self.HostEntry.get(), Save=False)
+            Configuration.SetValue('REMOTE', 'USERNAME', self.UserEntry.get(), Save=False)
+            Configuration.SetValue('REMOTE', 'PASSWORD', self.PassEntry.get(), Save=False)
+            Configuration.Save()
             message.showinfo('Success', 'Saved remote database configuration', parent=self)
         else:
             message.showerror('Error', 'Error whilst saving configuration, check entries', parent=self)
@@ -181,17 +236,18 @@ class Settings(Toplevel):
         self.Labels = [self.HostLabel, self.UserLabel, self.PassLabel]
 
         """Loads the database type and remote database information from the configuration file"""
-        self.Type = Connect().GetValue('DATABASE', 'TYPE')
-        self.Data = [Connect().GetValue('REMOTE', 'HOST'),
-                     Connect().GetValue('REMOTE', 'USERNAME'),
-                     Connect().GetValue('REMOTE', 'PASSWORD')]
+        Configuration = Connect()
+        self.Type = Configuration.GetValue('DATABASE', 'TYPE')
+        self.Data = [Configuration.GetValue('REMOTE', 'HOST'),
+                     Configuration.GetValue('REMOTE', 'USERNAME'),
+                     Configuration.GetValue('REMOTE', 'PASSWORD')]
 
         """Sets the selected database type for the Radio options to the configuration database type"""
         self.DatabaseChoice.set(self.Type)
 
         """Inserts the local database file name into the LocalEntry widget"""
         self.LocalEntry.delete(0, END)
-        self.LocalEntry.insert(END, Connect().GetValue('LOCAL', 'PATH'))
+        self.LocalEntry.insert(END, Configuration.GetValue('LOCAL', 'PATH'))
 
         """Loads entires with remote database details"""
         self.SaveButton['state'] = NORMAL
@@ -1,4 +1,7 @@
-from tkinter import PhotoImage
+from tkinter import END, PhotoImage, Toplevel
+from tkinter.ttk import Label, Progressbar, Treeview
+
+from src import database
 
 
 def ConfigureInterface(Root):
@@ -28,38 +31,289 @@ def ConfigureInterface(Root):
     Root.minsize(Root.winfo_width(), Root.winfo_height())
 
 
-def SortData(Data):
-    Sorted = False
-    while not Sorted:
-        Sorted = True
-        for Sort in range(0, len(Data) - 1):
-            if str(Data[Sort][1]) > str(Data[Sort + 1][1]):
-                Sorted = False
-                TempStore = Data[Sort + 1]
-                Data[Sort + 1] = Data[Sort]
-                Data[Sort] = TempStore
-    return Data
-
-
-def SortTree(Event, Treeview, Data):
-    """Called from each separate after establishing header has been clicked"""
-
-    """Checks which index needs sorting by checking the Treeview headers"""
-    Index = int(Treeview.identify_column(Event.x)[1:]) - 1
-
-    """Fills empty array with item ID's and item attributes to sort based on Index """
-    UnsortedData = []
-    for x in Treeview.get_children():
-        Values = Treeview.item(x)['values']
-        UnsortedData.append([int(Values[0]), Values[Index]])
-
-    """Calls SortData function to carry out relevant sort algorithm on data"""
-    UnsortedData = SortData(UnsortedData)
-
-    """Finalises sorting by returning the data in order with original attributes"""
-    SortedData = []
-    for Sort in UnsortedData:
-        for DataItem in Data:
-            if int(Sort[0]) == int(DataItem.GetID()):
-                SortedData.append(DataItem)
-    return SortedData
+def SortKey(Value):
+    """Returns a typed key for the value in parameter so numbers sort numerically and text sorts alphabetically"""
+
+    if isinstance(Value, (int, float)):
+        return 0, Value, ''
+    Text = str(Value).strip()
+    try:
+        return 0, float(Text), ''
+    except ValueError:
+        return 1, 0, Text.lower()
+
+
+def ColumnIndex(Event, Treeview):
+    """Returns the index of the Treeview column which was clicked using the Event parameter"""
+
+    return int(Treeview.identify_column(Event.x)[1:]) - 1
+
+
+class Sorter:
+    """Creates a sort engine for a Treeview which sorts model objects by the clicked column, then by earlier clicks"""
+
+    def __init__(self, Attributes=None, Depth=3):
+        """Attributes returns the column values of a model object, Depth is the number of columns remembered"""
+
+        self.Attributes = Attributes or (lambda Record: Record.GetAttributes())
+        self.Depth = Depth
+
+        """List of [Index, Descending] pairs, the most significant column first"""
+        self.Columns = []
+
+    def Click(self, Index):
+        """Called when a header is clicked, toggles the direction of the primary column or makes Index primary"""
+
+        if self.Columns and self.Columns[0][0] == Index:
+            self.Columns[0][1] = not self.Columns[0][1]
+        else:
+            """Earlier columns are kept as secondary sort columns"""
+            self.Columns = [[Index, False]] + [Column for Column in self.Columns if Column[0] != Index]
+            self.Columns = self.Columns[:self.Depth]
+
+    def Sort(self, Data):
+        """Returns a new list of the model objects in Data ordered by the chosen columns, leaving Data unchanged"""
+
+        if not self.Columns:
+            return list(Data)
+
+        """Typed keys for each chosen column are worked out once per object rather than once per comparison"""
+        Indexes = [Column[0] for Column in self.Columns]
+        Rows = []
+        for Record in Data:
+            Attributes = self.Attributes(Record)
+            Rows.append(([SortKey(Attributes[Index]) for Index in Indexes], Record))
+
+        """Stable sorts from the least to the most significant column give the multi-column order"""
+        for Position in reversed(range(len(self.Columns))):
+            Rows.sort(key=lambda Row: Row[0][Position], reverse=self.Columns[Position][1])
+        return [Row[1] for Row in Rows]
+
+    def Indicate(self, Treeview, Headers):
+        """Updates the Treeview headings to show the direction of the primary sort column"""
+
+        for Index in range(len(Headers)):
+            Text = Headers[Index]
+            if self.Columns and self.Columns[0][0] == Index:
+                Text += ' \u25bc' if self.Columns[0][1] else ' \u25b2'
+            Treeview.heading('#' + str(Index + 1), text=Text)
+
+
+class VirtualTreeview(Treeview):
+    """Creates a Treeview which only makes rows for the visible part of its data, swapping their values on scroll
+
+    The scrollbar stays proportional to all of the data, selecting a row generates the <<RecordSelect>> event"""
+
+    def __init__(self, Master, Values=None, Buffer=1, **Options):
+        """Values returns the column values of a record, Buffer is the number of rows made past the visible ones"""
+
+        """The scroll command is kept back so the scrollbar can be set using the position within all of the data"""
+        self.ScrollCommand = Options.pop('yscrollcommand', None)
+        super().__init__(Master, **Options)
+
+        self.Values = Values or (lambda Record: Record.GetAttributes())
+        self.Buffer = Buffer
+
+        """Data shown with the position of each record, index of the record in the first row, index of the selected
+        record and number of rows"""
+        self.Data = []
+        self.Positions = database.Positions(self.Data)
+        self.Offset = 0
+        self.Selected = None
+        self.Visible = int(self.cget('height'))
+        self.Rows = self.Visible + self.Buffer
+
+        """Binds scrolling, keyboard movement, selection and resizing to keep the rows in step with the data"""
+        self.bind('<<TreeviewSelect>>', self.SelectionChanged)
+        self.bind('<MouseWheel>', lambda Event: self.Scroll(self.Offset - int(Event.delta / 120) * 3))
+        self.bind('<Button-4>', lambda Event: self.Scroll(self.Offset - 3))
+        self.bind('<Button-5>', lambda Event: self.Scroll(self.Offset + 3))
+        self.bind('<Up>', lambda Event: self.Move(-1))
+        self.bind('<Down>', lambda Event: self.Move(1))
+        self.bind('<Prior>', lambda Event: self.Move(-self.Visible))
+        self.bind('<Next>', lambda Event: self.Move(self.Visible))
+        self.bind('<Configure>', self.Resize)
+
+    def configure(self, cnf=None, **Options):
+        """Keeps back any scroll command, passing all other options to the Treeview"""
+
+        if isinstance(cnf, dict) and 'yscrollcommand' in cnf:
+            cnf = dict(cnf)
+            self.ScrollCommand = cnf.pop('yscrollcommand')
+        if 'yscrollcommand' in Options:
+            self.ScrollCommand = Options.pop('yscrollcommand')
+        if cnf or Options or cnf is None and not Options:
+            return super().configure(cnf, **Options)
+
+    config = configure
+
+    def Load(self, Data):
+        """Shows the records in Data from the top with nothing selected, a copy of the list is kept"""
+
+        self.Data = list(Data)
+        self.Positions = database.Positions(self.Data)
+        self.Offset = 0
+        self.Selected = None
+        self.Render()
+
+    def Render(self):
+        """Makes or removes rows so there is one for each record in the window, then fills in their values"""
+
+        Count = max(0, min(self.Rows, len(self.Data) - self.Offset))
+        Children = self.get_children()
+        if len(Children) > Count:
+            self.delete(*Children[Count:])
+        for Row in range(Count):
+            ID = 'Row' + str(Row)
+            Values = self.Values(self.Data[self.Offset + Row])
+            if Row < len(Children):
+                self.item(ID, values=Values)
+            else:
+                self.insert('', END, iid=ID, values=Values)
+
+        """The selected record is highlighted only while it is inside the window"""
+        Row = -1 if self.Selected is None else self.Selected - self.Offset
+        if 0 <= Row < Count:
+            if self.selection() != ('Row' + str(Row),):
+                self.selection_set('Row' + str(Row))
+        elif self.selection():
+            self.selection_remove(*self.selection())
+
+        """The Treeview itself never scrolls, the scrollbar is set from the position of the window in the data"""
+        super().yview_moveto(0)
+        if self.ScrollCommand:
+            self.ScrollCommand(*self.yview())
+
+    def yview(self, *Arguments):
+        """Returns the visible fraction of the data, or scrolls the window when called by the scrollbar"""
+
+        if not Arguments:
+            if not self.Data:
+                return 0.0, 1.0
+            return self.Offset / len(self.Data), min(1.0, (self.Offset + self.Visible) / len(self.Data))
+        if Arguments[0] == 'moveto':
+            self.Scroll(int(float(Arguments[1]) * len(self.Data)))
+        elif Arguments[0] == 'scroll':
+            Amount = int(Arguments[1])
+            if Arguments[2] == 'pages':
+                Amount *= self.Visible
+            self.Scroll(self.Offset + Amount)
+
+    def Scroll(self, Offset):
+        """Moves the window so the record at index Offset is in the first row, kept within the data"""
+
+        self.Offset = max(0, min(Offset, len(self.Data) - self.Visible))
+        self.Render()
+        return 'break'
+
+    def Resize(self, Event):
+        """Called when the Treeview changes size to work out how many rows are visible"""
+
+        Box = self.bbox('Row0') if self.exists('Row0') else ''
+        if Box:
+            Visible = max(1, (Event.height - Box[1]) // Box[3])
+            if Visible != self.Visible:
+                self.Visible = Visible
+                self.Rows = Visible + self.Buffer
+                self.Scroll(self.Offset)
+
+    def Select(self, Index):
+        """Selects the record at Index, scrolling it into view, and generates the <<RecordSelect>> event"""
+
+        if not self.Data:
+            return
+        self.Selected = max(0, min(Index, len(self.Data) - 1))
+        if self.Selected < self.Offset:
+            self.Offset = self.Selected
+        elif self.Selected >= self.Offset + self.Visible:
+            self.Offset = self.Selected - self.Visible + 1
+        self.Scroll(self.Offset)
+        self.event_generate('<<RecordSelect>>')
+
+    def Move(self, Amount):
+        """Called by the arrow and page keys to move the selection by Amount records"""
+
+        self.Select(Amount if self.Selected is None else self.Selected + Amount)
+        return 'break'
+
+    def SelectionChanged(self, Event):
+        """Called when a row is clicked, records which record it shows and generates the <<RecordSelect>> event"""
+
+        Selection = self.selection()
+        if not Selection:
+            return
+        Index = self.Offset + self.index(Selection[0])
+        if Index != self.Selected and Index < len(self.Data):
+            self.Selected = Index
+            self.event_generate('<<RecordSelect>>')
+
+    def Current(self):
+        """Returns the selected record, or None if there is no selection"""
+
+        if self.Selected is None or self.Selected >= len(self.Data):
+            return None
+        return self.Data[self.Selected]
+
+    def SelectedValues(self):
+        """Returns the column values of the selected record as a list, or None if there is no selection"""
+
+        Record = self.Current()
+        return None if Record is None else list(self.Values(Record))
+
+    def Replace(self, Record):
+        """Replaces the selected record with the record in parameter, such as after it has been edited"""
+
+        if self.Current() is not None:
+            self.Positions.Changed(self.Selected)
+            self.Positions.Forget(self.Data[self.Selected])
+            self.Data[self.Selected] = Record
+            self.Render()
+
+    def Forget(self, Record):
+        """Removes the record in parameter from the rows shown, keeping the selection within the data"""
+
+        try:
+            Index = self.Positions.Find(Record)
+        except ValueError:
+            Index = None
+        if Index is not None:
+            self.Positions.Changed(Index)
+            del self.Data[Index]
+            self.Positions.Forget(Record)
+        if self.Selected is not None and self.Selected >= len(self.Data):
+            self.Selected = len(self.Data) - 1 if self.Data else None
+        self.Scroll(self.Offset)
+
+
+class ProgressWindow(Toplevel):
+    """Creates a small window showing the progress of a long running task such as an import"""
+
+    def __init__(self, Master, Title, Total):
+        """Total is the amount of work the task will do, such as the size of the file being read"""
+
+        """Parameters are passed onto the Tkinter parent Toplevel class"""
+        super().__init__(Master)
+        self.title(Title)
+        self.Total = max(Total, 1)
+
+        """Creates and packs the Progressbar and the Label describing the progress"""
+        self.Bar = Progressbar(self, length=300, maximum=self.Total)
+        self.Bar.pack(padx=10, pady=(10, 5))
+        self.Label = Label(self, text='')
+        self.Label.pack(padx=10, pady=(0, 10))
+
+        """Used to place the window at the center of the screen"""
+        ConfigureInterface(self)
+
+    def Expect(self, Total):
+        """Sets the amount of work the task will do once it is known, such as after it has been counted"""
+
+        self.Total = max(Total, 1)
+        self.Bar['maximum'] = self.Total
+
+    def Update(self, Done, Text):
+        """Moves the bar to Done out of Total and shows Text, redrawing straight away as the task is still running"""
+
+        self.Bar['value'] = min(Done, self.Total)
+        self.Label['text'] = Text
+        self.update_idletasks()
@@ -0,0 +1,129 @@
+import concurrent.futures
+import queue
+import threading
+from tkinter import TclError
+from tkinter import messagebox as message
+
+from src import settings
+
+"""Threads shared by every interface, made the first time work is submitted. Reads run on several Readers while
+writes run one at a time on the Writer so they reach the database in the order they were made"""
+Readers = None
+Writer = None
+Lock = threading.Lock()
+
+
+def Executors():
+    """Returns the pools of reading and writing threads, the number of readers is set in the configuration"""
+
+    global Readers, Writer
+    with Lock:
+        if Readers is None:
+            Count = int(settings.Connect().GetValue('DATABASE', 'WORKERS', '2'))
+            Readers = concurrent.futures.ThreadPoolExecutor(max(Count, 1), thread_name_prefix='Reader')
+            Writer = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix='Writer')
+    return Readers, Writer
+
+
+class Worker:
+    """Creates a runner for the interface in parameter which carries out database work on the shared threads and
+    hands each result back to the interface's thread, as Tkinter widgets may only be used from that thread"""
+
+    def __init__(self, Master, Interval=50):
+        """Master is the window the results are delivered to, checked for them every Interval milliseconds"""
+
+        self.Master = Master
+        self.Interval = Interval
+
+        """Callbacks waiting to be run on the interface's thread, put there by the worker threads"""
+        self.Results = queue.Queue()
+
+        """The latest work submitted under each key and all of the work not yet delivered"""
+        self.Pending = {}
+        self.Running = set()
+        self.Polling = False
+
+    def Submit(self, Work, Done=None, Failed=None, Key=None, Write=False):
+        """Calls Work on a worker thread then Done with its result on the interface's thread, or Failed with the
+        exception it raised, by default shown as an error message. Writes should set Write so they stay in order
+
+        Work submitted with the same Key as earlier work supersedes it, such as a search replacing the last one, the
+        earlier work is cancelled if it has not started and its result is dropped if it has"""
+
+        Readers, Writer = Executors()
+        if Key is not None and Key in self.Pending:
+            self.Pending[Key].cancel()
+        Future = (Writer if Write else Readers).submit(Work)
+        if Key is not None:
+            self.Pending[Key] = Future
+        self.Running.add(Future)
+        Future.add_done_callback(lambda Finished: self.Post(self.Deliver, Key, Finished, Done, Failed))
+
+        """Shows the interface is busy and starts checking for results if it is not already"""
+        self.Busy(True)
+        if not self.Polling:
+            self.Polling = True
+            self.Master.after(self.Interval, self.Poll)
+        return Future
+
+    def Post(self, Callback, *Arguments):
+        """Has Callback called with Arguments on the interface's thread, may be called from any thread such as to
+        show the progress of the work"""
+
+        self.Results.put((Callback, Arguments))
+
+    def Poll(self):
+        """Runs every callback posted since it last ran, then runs again after Interval while work is running"""
+
+        try:
+            if not self.Master.winfo_exists():
+                return
+            while True:
+                try:
+                    Callback, Arguments = self.Results.get_nowait()
+                except queue.Empty:
+                    break
+                Callback(*Arguments)
+        except TclError:
+            """The window has been closed so there is nothing left to deliver to"""
+            return
+        finally:
+            self.Schedule()
+
+    def Schedule(self):
+        """Checks for results again after Interval while work is running, otherwise shows the interface is idle"""
+
+        try:
+            if self.Running or not self.Results.empty():
+                self.Master.after(self.Interval, self.Poll)
+                return
+            self.Busy(False)
+        except TclError:
+            pass
+        self.Polling = False
+
+    def Deliver(self, Key, Future, Done, Failed):
+        """Called on the interface's thread once the work of Future is finished, unless it has been superseded"""
+
+        self.Running.discard(Future)
+        if Key is not None:
+            if self.Pending.get(Key) is not Future:
+                return
+            del self.Pending[Key]
+        if Future.cancelled():
+            return
+        Error = Future.exception()
+        if Error is not None:
+            (Failed or self.Failed)(Error)
+        elif Done:
+            Done(Future.result())
+
+    def Failed(self, Error):
+        """Called with the exception raised by work submitted without its own Failed callback"""
+
+        message.showerror('Error', 'Error whilst accessing the database: ' + str(Error), parent=self.Master)
+
+    def Busy(self, State):
+        """Shows the busy cursor over the interface while State is True"""
+
+        self.Master.configure(cursor='watch' if State else '')
@@ -0,0 +1,90 @@
+import csv
+import os
+
+import pytest
+
+from src import database, export, migrations
+
+
+class Record:
+    """Record of any table as made by the interfaces, holding its attributes in order"""
+
+    def __init__(self, *Attributes):
+        self.Attributes = Attributes
+
+    def GetAttributes(self):
+        return self.Attributes
+
+    def GetID(self):
+        return int(self.Attributes[0])
+
+
+"""Records of each table, the order lines list an order which does not exist and an item which does not exist"""
+Data = {'Inventory': [(1, 'Maxima', 'Treadmill', 'Energy', 199.99, 10), (2, 'Vigor', 'Rower', 'Glide', 350.0, 2)],
+        'Orders': [(1, '13/04/2017', 1), (2, '15/04/2017', 1), (3, '17/7/2019', 2)],
+        'OrdersItem': [(1, 1, 3), (1, 2, 1), (5, 2, 2), (2, 1, 1), (2, 7, 5), (3, 2, 4), (9, 1, 1)]}
+
+"""Lines of orders made from 13/04/2017 to 15/04/2017 joined with their order and item"""
+Expected = [['1', '13/04/2017', '1', '1', 'Energy', '199.99', '3', '599.97'],
+            ['1', '13/04/2017', '1', '2', 'Glide', '350.0', '1', '350.0'],
+            ['2', '15/04/2017', '1', '1', 'Energy', '199.99', '1', '199.99'],
+            ['2', '15/04/2017', '1', '7', '', '', '5', ''],
+            ['5', '14/04/2017', '3', '2', 'Glide', '350.0', '2', '700.0']]
+
+
+@pytest.fixture(params=['Local', 'Text'])
+def Connection(request, tmp_path, monkeypatch):
+    """Returns a migrated connection of each local backend holding the records of Data, order 5 being added last so
+    its lines are out of step with the orders on the text database"""
+
+    if request.param == 'Local':
+        Connection = database.Local(str(tmp_path / 'database.db'), 'Orders')
+    else:
+        Connection = database.Text(str(tmp_path) + os.sep, 'Orders')
+    migrations.Migrate(Connection)
+    for Table, Records in Data.items():
+        Connection.View(Table).Save([Record(*Attributes) for Attributes in Records])
+    Connection.View('Orders').Insert(Record(5, '14/04/2017', 3))
+    monkeypatch.setattr(database, 'Connect', lambda Table: Connection.View(Table))
+    return Connection
+
+
+def Exported(Path):
+    """Returns the rows of the exported csv file at the path in parameter"""
+
+    with open(Path, newline='') as File:
+        return list(csv.reader(File))
+
+
+def test_order_lines_are_joined_within_the_dates(Connection, tmp_path):
+    """Order lines of orders within the dates are joined with their order and item, the others are left out"""
+
+    Path = str(tmp_path / 'lines.csv')
+    assert export.Export('OrderLines', Path, '13/04/2017', '15/04/2017') == len(Expected)
+    Rows = Exported(Path)
+    assert Rows[0] == export.Headers['OrderLines']
+    assert sorted(Rows[1:]) == Expected
+
+    Path = str(tmp_path / 'items.csv')
+    assert export.Export('OrdersItem', Path, '14/04/2017') == 4
+    assert sorted(Exported(Path)) == [['2', '1', '1'], ['2', '7', '5'], ['3', '2', '4'], ['5', '2', '2']]
+
+
+def test_text_order_lines_are_joined_without_reading_whole_tables(Connection, tmp_path, monkeypatch):
+    """The text database looks up the items joined rather than reading the inventory, and holds a bounded number"""
+
+    if Connection.Type != database.Type.Text:
+        pytest.skip('SQL databases make the join themselves')
+    Rows = database.Text.Rows
+
+    def Streamed(self, Table=None):
+        """Reads the table in parameter, failing for the inventory which should only be looked up"""
+
+        assert Table != 'Inventory'
+        return Rows(self, Table)
+
+    monkeypatch.setattr(database.Text, 'Rows', Streamed)
+    monkeypatch.setattr(export, 'Items', 1)
+    Path = str(tmp_path / 'lines.csv')
+    export.Export('OrderLines', Path, '13/04/2017', '15/04/2017')
+    assert sorted(Exported(Path)[1:]) == Expected
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from src import database, migrations
+
+
+class Item:
+    """Record of the inventory as made by the interfaces, holding its attributes in order"""
+
+    def __init__(self, *Attributes):
+        self.Attributes = Attributes
+
+    def GetAttributes(self):
+        return self.Attributes
+
+    def GetID(self):
+        return int(self.Attributes[0])
+
+
+@pytest.fixture(params=['Local', 'Text'])
+def Connection(request, tmp_path):
+    """Returns a migrated connection of each local backend holding one item with 10 in stock"""
+
+    if request.param == 'Local':
+        Connection = database.Local(str(tmp_path / 'database.db'), 'Inventory')
+    else:
+        Connection = database.Text(str(tmp_path) + os.sep, 'Inventory')
+    migrations.Migrate(Connection)
+    Connection = Connection.View('Inventory')
+    Inventory = database.Records()
+    Inventory.append(Item(1, 'Maxima', 'Treadmill', 'Energy', 201.99, 10))
+    Connection.Flush(Inventory)
+    return Connection
+
+
+def test_editing_an_item_keeps_stock_taken_since(Connection):
+    """Stock taken by another terminal after the inventory was read is kept when another attribute is saved"""
+
+    Inventory = database.Records(Item(*Record) for Record in Connection.SelectAll('Inventory'))
+    Connection.PlaceOrder((1, '1/1/2020', 1), [(1, 1, 3)])
+    Inventory[0] = Item(1, 'Maxima', 'Treadmill', 'Energy Plus', 199.99, 10)
+    Connection.Flush(Inventory.Detach())
+    assert Connection.SelectRecord('Inventory', 1) == [(1, 'Maxima', 'Treadmill', 'Energy Plus', 199.99, 7)]
+
+    """Stock edited by hand is still written"""
+    Inventory[0] = Item(1, 'Maxima', 'Treadmill', 'Energy Plus', 199.99, 20)
+    Connection.Flush(Inventory.Detach())
+    assert Connection.SelectRecord('Inventory', 1)[0][5] == 20
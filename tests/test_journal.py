@@ -0,0 +1,105 @@
+import os
+import time
+
+from src import database, migrations
+
+
+def Fresh(Connection, Table):
+    """Returns the changes of the journal parsed from its start, without the cached parse"""
+
+    database.Journals.clear()
+    return Connection.Changes(Table)
+
+
+def test_cached_changes_match_a_fresh_parse(tmp_path):
+    """Changes read after each append, compaction and unfinished line agree with parsing the whole journal"""
+
+    Connection = database.Text(str(tmp_path) + os.sep, 'Orders')
+    migrations.Migrate(Connection)
+    Connection.Ratio = 1000
+    Connection.Journal([['I', ID, '1/1/2020', 1] for ID in range(1, 51)])
+    for ID in range(51, 61):
+        Connection.Journal([['U', ID - 50, '2/1/2020', 2], ['D', ID - 40], ['I', ID, '3/1/2020', 3]])
+        Cached = Connection.Changes(), Connection.Lookup('Orders', ID - 45, ID)
+        assert Cached == (Fresh(Connection, 'Orders'), Connection.Lookup('Orders', ID - 45, ID))
+
+    """A line still being written is left until it is finished"""
+    with open(Connection.JournalPath(), 'ab') as File:
+        File.write(b'B\nI,99,4/1/2020')
+    Cached = Connection.Changes()
+    assert Cached == Fresh(Connection, 'Orders')
+    assert ('99',) not in Cached[1]
+
+    Connection.Journal([['D', 1]])
+    Connection.Compact()
+    Connection.Journal([['I', 70, '5/1/2020', 4]], Clear=True)
+    Cached = Connection.Changes()
+    assert Cached == Fresh(Connection, 'Orders')
+    assert Cached[0] and list(Cached[1]) == [('70',)]
+    assert [Record[0] for Record in Connection.Rows()] == ['70']
+
+
+def test_appends_update_the_parse_in_place(tmp_path):
+    """Entries appended are parsed into the kept Replay, its IDs staying sorted whether added singly or in bulk"""
+
+    Connection = database.Text(str(tmp_path) + os.sep, 'Orders')
+    migrations.Migrate(Connection)
+    Connection.Ratio = 1000
+    Connection.Journal([['I', ID, '1/1/2020', 1] for ID in range(100, 0, -3)])
+    Replayed = Connection.Replayed()
+    for ID in (50, 2, 300, 77):
+        Connection.Journal([['I', ID, '2/1/2020', 2], ['D', ID + 1]])
+        assert Connection.Replayed() is Replayed
+    Connection.Journal([['U', ID, '3/1/2020', 3] for ID in range(400, 350, -1)])
+
+    assert Connection.Replayed() is Replayed
+    assert list(Replayed.IDs) == sorted(int(Key[0]) for Key in Replayed.Changes)
+    assert [int(Key[0]) for Key in Replayed.Keys] == list(Replayed.IDs)
+    assert (Replayed.Cleared, Replayed.Changes) == Fresh(Connection, 'Orders')
+
+
+def test_journal_is_compacted_past_its_limit(tmp_path):
+    """A journal growing past Limit bytes is compacted however small a part of the file it is"""
+
+    Connection = database.Text(str(tmp_path) + os.sep, 'Orders')
+    migrations.Migrate(Connection)
+    Connection.Ratio = 1000
+    Connection.Limit = 2048
+    for ID in range(1, 200):
+        Connection.Journal([['I', ID, '1/1/2020', 1]])
+    Deadline = time.monotonic() + 10
+    while database.Compacting and time.monotonic() < Deadline:
+        time.sleep(0.01)
+
+    assert os.path.getsize(Connection.Path())
+    assert [int(Record[0]) for Record in Connection.Rows()] == list(range(1, 200))
+
+
+def test_page_reads_stay_flat_as_the_journal_grows(tmp_path):
+    """Reading a page costs about the same with a journal a hundred times longer, as only its IDs are looked up"""
+
+    Connection = database.Text(str(tmp_path) + os.sep, 'Orders')
+    migrations.Migrate(Connection)
+    Connection.Ratio = 1000
+    Connection.Limit = 2 ** 40
+    Connection.Journal([['I', ID, '1/1/2020', 1] for ID in range(1, 1001)])
+    Connection.Compact()
+
+    def Timed():
+        """Returns the quickest of several reads of the page below ID 500, once the journal has been parsed"""
+
+        Connection.Page('Orders', 500, 50)
+        Times = []
+        for Attempt in range(20):
+            Start = time.perf_counter()
+            Page = Connection.Page('Orders', 500, 50)
+            Times.append(time.perf_counter() - Start)
+        assert [Row[0] for Row in Page] == list(range(499, 449, -1))
+        return min(Times)
+
+    Connection.Journal([['U', ID, '2/1/2020', 2] for ID in range(1, 101)])
+    Short = Timed()
+    Connection.Journal([['I', ID, '3/1/2020', 3] for ID in range(2000, 12000)])
+    Long = Timed()
+
+    assert Long < Short * 5 + 0.001
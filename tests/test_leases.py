@@ -0,0 +1,184 @@
+import sqlite3
+import threading
+
+import pytest
+
+from src import database
+
+
+class Dropped(Exception):
+    """Raised by the stand-in server for a connection it has dropped, as the driver raises OperationalError"""
+
+
+class StandInServer:
+    """Stand-in for a remote database server keeping its tables in a SQLite file, which can refuse connections and
+    drop those already made"""
+
+    def __init__(self, Path, Refusals=0):
+        self.Path = Path
+        self.Refusals = Refusals
+        self.Connections = []
+        self.Pings = 0
+
+    def Connect(self, **Arguments):
+        """Made in place of pymysql.connect, refusing the first Refusals attempts"""
+
+        if self.Refusals:
+            self.Refusals -= 1
+            raise Dropped('Connection refused')
+        Connection = StandIn(self, Arguments)
+        self.Connections.append(Connection)
+        return Connection
+
+    def Drop(self):
+        """Drops every connection made so far, as a server restart or network outage would"""
+
+        for Connection in self.Connections:
+            Connection.Open = False
+
+
+class StandIn:
+    """Connection to the stand-in server, taking the placeholders of the pymysql driver"""
+
+    def __init__(self, Server, Arguments):
+        self.Server = Server
+        self.Arguments = Arguments
+        self.Open = True
+        self.Connection = sqlite3.connect(Server.Path, check_same_thread=False, isolation_level=None)
+
+    def Check(self):
+        if not self.Open:
+            raise Dropped('Lost connection to server during query')
+
+    def ping(self, reconnect=True):
+        self.Server.Pings += 1
+        self.Check()
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        self.Check()
+
+    def rollback(self):
+        self.Check()
+
+    def close(self):
+        self.Open = False
+        self.Connection.close()
+
+
+class Cursor:
+    """Cursor of a stand-in connection, failing once the connection has been dropped"""
+
+    def __init__(self, Connection):
+        self.Connection = Connection
+        self.Rows = None
+
+    def execute(self, Statement, Parameters=()):
+        self.Connection.Check()
+        self.Rows = self.Connection.Connection.execute(Statement.replace('%s', '?'), Parameters or ())
+
+    def fetchone(self):
+        return self.Rows.fetchone()
+
+    def fetchall(self):
+        return self.Rows.fetchall()
+
+    def fetchmany(self, Size):
+        return self.Rows.fetchmany(Size)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def Server(tmp_path, monkeypatch):
+    """Returns a stand-in server holding one order, sleeping between attempts is recorded rather than waited"""
+
+    Path = str(tmp_path / 'remote.db')
+    with sqlite3.connect(Path) as Connection:
+        Connection.execute('CREATE TABLE Orders (OrderID integer, Date text, CustomerID integer)')
+        Connection.execute("INSERT INTO Orders VALUES (1, '2024-01-01', 7)")
+    Instance = StandInServer(Path)
+    Instance.Sleeps = []
+    monkeypatch.setattr(database.time, 'sleep', Instance.Sleeps.append)
+    return Instance
+
+
+def Connect(Server):
+    """Returns a remote connection to the stand-in server in parameter"""
+
+    return database.Remote('stand-in', 'user', 'password', 'Sales', 'Orders', Connector=Server.Connect,
+                           Lost=(Dropped,))
+
+
+def test_connecting_is_retried_with_growing_delay(Server):
+    """A refused connection is tried again after waiting half a second then twice as long"""
+
+    Server.Refusals = 2
+    assert Connect(Server).SelectAll() == [(1, '2024-01-01', 7)]
+    assert Server.Sleeps == [0.5, 1.0]
+    assert len(Server.Connections) == 1
+    assert Server.Connections[0].Arguments['database'] == 'Sales'
+
+
+def test_connecting_fails_once_every_attempt_is_refused(Server):
+    """ConnectionError is raised once the configured number of attempts have been refused"""
+
+    Server.Refusals = 3
+    with pytest.raises(ConnectionError):
+        Connect(Server).SelectAll()
+    assert Server.Sleeps == [0.5, 1.0]
+
+
+def test_query_on_a_lost_connection_is_retried_on_a_new_one(Server):
+    """A query on a dropped connection is run again on a new connection, a write fails and is not repeated"""
+
+    Connection = Connect(Server)
+    assert Connection.SelectAll() == [(1, '2024-01-01', 7)]
+    Server.Drop()
+    assert Connection.SelectAll() == [(1, '2024-01-01', 7)]
+    assert len(Server.Connections) == 2
+
+    Server.Drop()
+    with pytest.raises(Dropped):
+        Connection.Execute("INSERT INTO Orders VALUES (2, '2024-01-02', 7)")
+    assert Connection.Count('Orders') == 1
+    assert len(Server.Connections) == 3
+
+
+def test_connection_is_returned_after_each_statement(Server):
+    """A thread holds its connection only while using the database, so one connection serves every thread in turn"""
+
+    Connection = database.Remote('stand-in', 'user', 'password', 'Sales', 'Orders', Connector=Server.Connect,
+                                 Lost=(Dropped,))
+    Connection.Guard = database.Leases(Connection.Guard.Factory, Size=1, Timeout=1, Lost=(Dropped,))
+    assert Connection.SelectAll() == [(1, '2024-01-01', 7)]
+
+    Results = []
+    Other = threading.Thread(target=lambda: Results.append(Connection.SelectAll()))
+    Other.start()
+    Other.join(10)
+    assert Results == [[(1, '2024-01-01', 7)]]
+    assert len(Server.Connections) == 1
+
+
+def test_missing_driver_is_reported(monkeypatch):
+    """Without the pymysql package a remote connection raises ConnectionError saying so"""
+
+    monkeypatch.setattr(database, 'pymysql', None)
+    with pytest.raises(ConnectionError, match='pymysql'):
+        database.Remote('stand-in', 'user', 'password', 'Sales', 'Orders')
+
+
+def test_idle_connection_is_pinged_and_replaced(Server):
+    """A connection unused for a while is pinged first, one that was dropped is replaced without failing"""
+
+    Connection = Connect(Server)
+    Connection.SelectAll()
+    Connection.Guard.Idle = 0
+    Server.Drop()
+    assert list(Connection.Stream('SELECT OrderID FROM Orders WHERE CustomerID = %s', (7,))) == [(1,)]
+    assert Server.Pings == 1
+    assert len(Server.Connections) == 2
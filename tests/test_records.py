@@ -0,0 +1,66 @@
+import random
+import time
+
+import pytest
+
+from src import database
+
+
+class Item:
+    """Record of the inventory as made by the interfaces, holding its attributes in order"""
+
+    def __init__(self, *Attributes):
+        self.Attributes = Attributes
+
+    def GetAttributes(self):
+        return self.Attributes
+
+    def GetID(self):
+        return int(self.Attributes[0])
+
+
+def test_positions_follow_every_change_to_the_list():
+    """Positions found through the index agree with searching the list after inserts, removals and replacements"""
+
+    Chance = random.Random(7)
+    Data = database.Records(Item(ID, 'Brand') for ID in range(200))
+    Next = 200
+    for Step in range(2000):
+        Choice = Chance.randrange(7)
+        if Choice == 0:
+            Data.append(Item(Next, 'Brand'))
+        elif Choice == 1:
+            Data.insert(Chance.randrange(-len(Data), len(Data) + 1), Item(Next, 'Brand'))
+        elif Choice == 2 and Data:
+            Data.remove(Data[Chance.randrange(len(Data))])
+        elif Choice == 3 and Data:
+            Data.pop(Chance.randrange(-len(Data), len(Data)))
+        elif Choice == 4 and Data:
+            Data[Chance.randrange(len(Data))] = Item(Next, 'Brand')
+        elif Choice == 5 and len(Data) > 4:
+            Start = Chance.randrange(len(Data) - 4)
+            del Data[Start:Start + 2]
+        else:
+            Data.extend([Item(Next, 'Brand'), Item(Next + 1, 'Brand')])
+            Next += 1
+        Next += 1
+        if not Data:
+            continue
+        Record = Data[Chance.randrange(len(Data))]
+        assert Data.Position(Record) == next(Index for Index, Existing in enumerate(Data) if Existing is Record)
+
+    Data.reverse()
+    assert all(Data.Position(Record) == Index for Index, Record in enumerate(Data))
+    with pytest.raises(ValueError):
+        Data.Position(Item(0, 'Brand'))
+
+
+def test_removing_records_does_not_search_the_list():
+    """Removing every record of a large list by identity takes about as long as building it"""
+
+    Data = database.Records(Item(ID, 'Brand') for ID in range(20000))
+    Start = time.perf_counter()
+    for Record in list(reversed(Data))[::2]:
+        Data.remove(Record)
+    assert time.perf_counter() - Start < 1
+    assert [Record.GetID() for Record in Data] == list(range(0, 20000, 2))
@@ -0,0 +1,66 @@
+import os
+import shutil
+
+import pytest
+
+from src import database, migrations, reports
+
+"""Files of the shipped text database and the table each one stores"""
+Files = {'Orders': 'orders.csv', 'OrdersItem': 'ordersItem.csv', 'Inventory': 'inventory.csv',
+         'Customers': 'customers.csv'}
+
+
+@pytest.fixture
+def Connection(tmp_path, monkeypatch):
+    """Returns a text database holding a copy of the shipped data, used by every report"""
+
+    Data = os.path.join(os.path.dirname(__file__), '..', 'data', 'text')
+    for Table, Name in Files.items():
+        shutil.copy(os.path.join(Data, Name), str(tmp_path / (Table + '.csv')))
+    Connection = database.Text(str(tmp_path) + os.sep)
+    migrations.Migrate(Connection)
+    monkeypatch.setattr(database, 'Connect', lambda Table: Connection.View(Table))
+    return Connection
+
+
+@pytest.mark.parametrize('Group', reports.Groups)
+def test_vector_sales_match_text_sales(Connection, Group):
+    """The NumPy totals agree with those read a line at a time, including lines with extra attributes"""
+
+    pytest.importorskip('numpy')
+    Key = lambda Row: (Row[0] is None, Row[0])
+    assert sorted(reports.VectorSales(Connection, Group), key=Key) == \
+        sorted(reports.TextSales(Connection, Group), key=Key)
+
+
+def test_revenue_matches_sales(Connection):
+    """Revenue leaves out lines of deleted orders in the same way as Sales"""
+
+    Total = sum(Row[1] for Row in reports.TextSales(Connection, 'Item'))
+    assert reports.Revenue() == round(Total, 2)
+
+
+def test_vector_sales_read_the_journal_without_writing(Connection):
+    """Order lines still in the journal are counted without the report compacting or rewriting any file"""
+
+    pytest.importorskip('numpy')
+    OrderID, ItemID = next(Connection.Rows('OrdersItem'))[:2]
+    Connection.Journal([['I', OrderID.strip(), '1', '3'], ['U', OrderID.strip(), ItemID.strip(), '9']], 'OrdersItem')
+    Stamp = Connection.Stamp('OrdersItem')
+
+    assert sorted(reports.VectorSales(Connection, 'Item')) == sorted(reports.TextSales(Connection, 'Item'))
+    assert Connection.Stamp('OrdersItem') == Stamp
+    assert Connection.Journaled('OrdersItem')
+
+
+def test_vector_sales_fall_back_for_negative_ids(Connection):
+    """Lines with negative IDs, which would index NumPy arrays from the end, are totalled as TextSales does"""
+
+    pytest.importorskip('numpy')
+    OrderID = next(Connection.Rows('OrdersItem'))[0].strip()
+    Connection.Journal([['I', OrderID, '-1', '4'], ['I', '-2', '1', '6']], 'OrdersItem')
+
+    for Group in ('Item', 'Customer'):
+        Key = lambda Row: (Row[0] is None, Row[0])
+        assert sorted(reports.VectorSales(Connection, Group), key=Key) == \
+            sorted(reports.TextSales(Connection, Group), key=Key)
@@ -0,0 +1,76 @@
+import os
+import sqlite3
+
+import pytest
+
+from src import database, migrations, repository
+
+
+class Item:
+    """Record of the inventory as made by the interfaces, holding its attributes in order"""
+
+    def __init__(self, *Attributes):
+        self.Attributes = list(Attributes)
+
+    def GetAttributes(self):
+        return self.Attributes
+
+    def GetID(self):
+        return int(self.Attributes[0])
+
+
+@pytest.fixture(params=['Local', 'Text'])
+def Connection(request, tmp_path, monkeypatch):
+    """Returns a migrated connection of each local backend holding one item, used by the repository in parameter"""
+
+    if request.param == 'Local':
+        Connection = database.Local(str(tmp_path / 'database.db'), 'Inventory')
+    else:
+        Connection = database.Text(str(tmp_path) + os.sep, 'Inventory')
+    migrations.Migrate(Connection)
+    Connection = Connection.View('Inventory')
+    Connection.Save([Item(1, 'Maxima', 'Treadmill', 'Energy', 199.99, 10)])
+    monkeypatch.setattr(database, 'Connect', lambda Table: Connection.View(Table))
+    monkeypatch.setattr(database.Connections, 'Configuration', lambda: Connection.Type)
+    return Connection
+
+
+def test_write_made_after_a_flush_is_read_again(Connection, monkeypatch):
+    """Writing the stored records leaves them current, unless another thread writes the table once Flush has released
+    it, when they are read again"""
+
+    Shared = repository.Repository()
+    Records = Shared.Load('Inventory', lambda Record: Item(*Record))
+    Records[0] = Item(1, 'Maxima', 'Treadmill', 'Energy Plus', 199.99, 10)
+    Shared.Write('Inventory', Shared.Changes('Inventory'))
+    assert Shared.Current('Inventory')
+    Records[0] = Item(1, 'Maxima', 'Treadmill', 'Energy Max', 199.99, 10)
+
+    Flush = Connection.Flush
+
+    def Interrupted(Data):
+        """Flushes, then writes the table as ExpireHolds could on another thread before Write records the stamp"""
+
+        Stamp = Flush(Data)
+        database.Changed('Inventory')
+        return Stamp
+
+    monkeypatch.setattr(Connection, 'Flush', Interrupted)
+    monkeypatch.setattr(database, 'Connect', lambda Table: Connection)
+    Shared.Write('Inventory', Shared.Changes('Inventory'))
+    assert not Shared.Current('Inventory')
+
+
+def test_write_made_by_another_terminal_is_read_again(Connection, tmp_path):
+    """Records written to a local database by another connection, as another terminal would, are read again"""
+
+    if Connection.Type != database.Type.Local:
+        pytest.skip('Text tables already stamp the size and modification time of their files')
+
+    Shared = repository.Repository()
+    assert Shared.Load('Inventory', lambda Record: Item(*Record))[0].GetAttributes()[5] == 10
+    with sqlite3.connect(str(tmp_path / 'database.db')) as Other:
+        Other.execute('UPDATE Inventory SET Stock = 4 WHERE ItemID = 1')
+
+    assert not Shared.Current('Inventory')
+    assert Shared.Load('Inventory', lambda Record: Item(*Record))[0].GetAttributes()[5] == 4
@@ -0,0 +1,67 @@
+import os
+import tracemalloc
+
+from src import database, migrations
+
+
+class Item:
+    """Record of the inventory as made by the interfaces, holding its attributes in order"""
+
+    def __init__(self, *Attributes):
+        self.Attributes = Attributes
+
+    def GetAttributes(self):
+        return self.Attributes
+
+    def GetID(self):
+        return int(self.Attributes[0])
+
+
+def Connect(Folder):
+    """Returns a text connection to the inventory in the folder in parameter"""
+
+    Connection = database.Text(str(Folder) + os.sep, 'Inventory')
+    migrations.Migrate(Connection)
+    return Connection
+
+
+def test_large_save_is_streamed_to_the_table_file(tmp_path):
+    """Saving many records holds only a batch of them in memory and leaves no journal to replay"""
+
+    Connection = Connect(tmp_path)
+    Count = 100000
+    Written = []
+    tracemalloc.start()
+    try:
+        assert Connection.Save((Item(ID, 'Maxima', 'Treadmill', 'Energy', 199.99, ID % 50)
+                                for ID in range(1, Count + 1)), Progress=Written.append) == Count
+        assert Connection.Lookup('Inventory', 50000) == [['50000', 'Maxima', 'Treadmill', 'Energy', '199.99', '0']]
+        Peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert Peak < 8 * 1024 * 1024
+    assert Written[-1] == Count and len(Written) > 1
+    assert not Connection.Journaled('Inventory')
+    assert sum(1 for Record in Connection.Rows('Inventory')) == Count
+    assert [Name for Name in os.listdir(tmp_path) if Name.startswith('Inventory.csv.')] == []
+
+
+def test_save_cut_short_is_finished_or_undone_when_opened(tmp_path):
+    """A file whose Save was journaled replaces the table's file, one written by a Save never journaled is removed"""
+
+    Connection = Connect(tmp_path)
+    Connection.Save([Item(1, 'Maxima', 'Treadmill', 'Energy', 199.99, 7)])
+    Path = Connection.Path('Inventory')
+    with open(Path + '.0123456789abcdef', 'w') as File:
+        File.write('2,Vigor,Rower,Glide,350.0,2\n')
+    with open(Path + '.fedcba9876543210', 'w') as File:
+        File.write('3,Vigor,Bike,Spin,99.5,4\n')
+    database.Replace(Connection.JournalPath('Inventory'), b'B\nS,0123456789abcdef\nC\n')
+    assert Connection.Lookup('Inventory', 1, 3) == [['2', 'Vigor', 'Rower', 'Glide', '350.0', '2']]
+
+    Connection = Connect(tmp_path)
+    assert [Name for Name in os.listdir(tmp_path) if Name.startswith('Inventory.csv.')] == []
+    assert Connection.SelectAll('Inventory') == [(2, 'Vigor', 'Rower', 'Glide', 350.0, 2)]
+    assert Connection.Compact('Inventory')
+    assert list(Connection.Rows('Inventory')) == [['2', 'Vigor', 'Rower', 'Glide', '350.0', '2']]
@@ -0,0 +1,20 @@
+from src import settings
+
+
+def test_unsaved_values_are_only_seen_once_saved(tmp_path):
+    """Values set without saving are kept by the connection setting them, other readers see them once written"""
+
+    File = str(tmp_path / 'Configuration.ini')
+    with open(File, 'w') as ConfigFile:
+        ConfigFile.write('[REMOTE]\nhost = old\npassword = old\n')
+
+    Writer = settings.Connect(File)
+    Writer.SetValue('REMOTE', 'HOST', 'new', Save=False)
+    Writer.SetValue('REMOTE', 'PASSWORD', 'secret', Save=False)
+    assert Writer.GetValue('REMOTE', 'PASSWORD') == 'secret'
+    assert settings.Connect(File).GetValue('REMOTE', 'PASSWORD') == 'old'
+
+    Writer.Save()
+    Reader = settings.Connect(File)
+    assert Reader.GetValue('REMOTE', 'HOST') == 'new'
+    assert Reader.GetValue('REMOTE', 'PASSWORD') == 'secret'
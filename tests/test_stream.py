@@ -0,0 +1,49 @@
+import threading
+
+from src import database, migrations
+
+
+class Item:
+    """Record of the inventory as made by the interfaces, holding its attributes in order"""
+
+    def __init__(self, *Attributes):
+        self.Attributes = Attributes
+
+    def GetAttributes(self):
+        return self.Attributes
+
+    def GetID(self):
+        return int(self.Attributes[0])
+
+
+def test_stream_reads_committed_records_while_a_save_is_open(tmp_path):
+    """Rows streamed on another thread while a Save is part way through its transaction are those last committed"""
+
+    Connection = database.Local(str(tmp_path / 'database.db'), 'Inventory')
+    migrations.Migrate(Connection)
+    Connection = Connection.View('Inventory')
+    Connection.Save([Item(1, 'Maxima', 'Treadmill', 'Energy', 201.99, 10),
+                     Item(2, 'Maxima', 'Bike', 'Spin', 99.5, 4)])
+
+    Paused, Resume = threading.Event(), threading.Event()
+
+    def Replacement():
+        """Yields the records saved, pausing after the table has been emptied and the first record read"""
+
+        yield Item(3, 'Vigor', 'Rower', 'Glide', 350.0, 2)
+        Paused.set()
+        assert Resume.wait(10)
+
+    Saved = []
+    Writer = threading.Thread(target=lambda: Saved.append(Connection.Save(Replacement())))
+    Writer.start()
+    try:
+        assert Paused.wait(10)
+        assert Connection.Connection.in_transaction
+        assert list(Connection.Stream('SELECT ItemID FROM Inventory ORDER BY ItemID')) == [(1,), (2,)]
+    finally:
+        Resume.set()
+        Writer.join(10)
+
+    assert Saved == [1]
+    assert list(Connection.Stream('SELECT ItemID FROM Inventory ORDER BY ItemID')) == [(3,)]